@@ -0,0 +1,76 @@
+import asyncio
+from datetime import date, timedelta
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.api.deps import get_current_admin
+from app.core.cache import user_cache, catalog_cache
+from app.core.database import db, get_database
+from app.core.stats import LOW_STOCK_ITEMS, LOW_STOCK_THRESHOLD, RECENT_ORDERS, get_rollup
+from app.core import analytics
+from app.models.stats import DashboardStats
+from app.models.analytics import SalesSeries, ProductSales, CategorySales
+from app.api.orders import ORDER_SHAPE
+from app.api.products import PRODUCT_SUMMARIES, SUMMARY_PROJECTION
+from app.utils.fast_json import json_response
+from app.core.security import hash_pool
+from app.api.upload import image_pool
+from app.core.google_auth import google_verifier
+from app.core.order_intake import order_intake
+
+router = APIRouter()
+
+@router.get("/metrics", dependencies=[Depends(get_current_admin)])
+async def get_metrics():
+    # In-process counters: each Lambda container / worker reports its own numbers
+    return {
+        "user_cache": user_cache.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "password_hashing": hash_pool.stats(),
+        "image_processing": image_pool.stats(),
+        "google_jwks": google_verifier.stats(),
+        "mongo": db.stats(),
+        "order_intake": order_intake.stats(),
+    }
+
+@router.get("/stats", response_model=DashboardStats, dependencies=[Depends(get_current_admin)])
+async def get_stats():
+    # Three bounded reads whatever the data size: the rollup document plus two index-backed top-N queries
+    database = get_database()
+    rollup, recent_orders, low_stock = await asyncio.gather(
+        get_rollup(),
+        database.orders.find({}, ORDER_SHAPE.projection()).sort("_id", -1).limit(RECENT_ORDERS).to_list(length=RECENT_ORDERS),
+        database.products.find({"countInStock": {"$lt": LOW_STOCK_THRESHOLD}}, SUMMARY_PROJECTION)
+            .sort([("countInStock", 1), ("_id", 1)]).limit(LOW_STOCK_ITEMS).to_list(length=LOW_STOCK_ITEMS),
+    )
+    return json_response({
+        **rollup,
+        "recentOrders": ORDER_SHAPE.shape_many(recent_orders),
+        "lowStockProducts": PRODUCT_SUMMARIES.dump_python(
+            PRODUCT_SUMMARIES.validate_python(low_stock), mode="json", by_alias=True,
+        ),
+    })
+
+DEFAULT_ANALYTICS_DAYS = 30
+
+def analytics_range(start: Optional[date] = None, end: Optional[date] = None):
+    # Inclusive date range, defaulting to the last 30 days
+    end = end or date.today()
+    start = start or end - timedelta(days=DEFAULT_ANALYTICS_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return start, end
+
+@router.get("/analytics/sales", response_model=SalesSeries, dependencies=[Depends(get_current_admin)])
+async def get_sales(
+    date_range: tuple = Depends(analytics_range),
+    interval: Literal["day", "week", "month"] = "day",
+):
+    return json_response(await analytics.sales_series(*date_range, interval))
+
+@router.get("/analytics/top-products", response_model=List[ProductSales], dependencies=[Depends(get_current_admin)])
+async def get_top_products(date_range: tuple = Depends(analytics_range), limit: int = Query(10, ge=1, le=50)):
+    return json_response(await analytics.top_products(*date_range, limit))
+
+@router.get("/analytics/top-categories", response_model=List[CategorySales], dependencies=[Depends(get_current_admin)])
+async def get_top_categories(date_range: tuple = Depends(analytics_range), limit: int = Query(10, ge=1, le=50)):
+    return json_response(await analytics.top_categories(*date_range, limit))
@@ -3,14 +3,17 @@ from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel, EmailStr
 import secrets
 from datetime import datetime, timedelta
-from google.oauth2 import id_token
-from google.auth.transport import requests
 from app.core.database import get_database
+from app.core.cache import invalidate_user
 from app.models.user import User, UserResponse
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.core.security import verify_and_update_password_async, get_password_hash_async, create_access_token, create_refresh_token
+from app.core.workers import PoolSaturated
 from app.core.config import settings
-from jose import jwt, JWTError
+from app.core.google_auth import google_verifier
+from app.core import stats
+from app.repositories import users as user_repo
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 router = APIRouter()
 
@@ -57,6 +60,7 @@ async def forgot_password(request: ForgotPasswordRequest):
             }
         }
     )
+    invalidate_user(user["_id"])
     
     return {
         "message": "If your email is registered, you will receive a reset link shortly.",
@@ -77,7 +81,7 @@ async def reset_password(request: ResetPasswordRequest):
             detail="Invalid or expired reset token"
         )
     
-    hashed_password = get_password_hash(request.new_password)
+    hashed_password = await get_password_hash_async(request.new_password)
     
     await db.users.update_one(
         {"_id": user["_id"]},
@@ -86,6 +90,7 @@ async def reset_password(request: ResetPasswordRequest):
             "$unset": {"reset_token": "", "reset_token_expiry": ""}
         }
     )
+    invalidate_user(user["_id"])
     
     return {
         "message": "Password reset successfully",
@@ -107,12 +112,17 @@ async def login(res: Response, form_data: OAuth2PasswordRequestForm = Depends())
     try:
         # Ensure password exists in DB and verify it
         db_password = user.get("password")
-        if not db_password or not verify_password(form_data.password, db_password):
+        valid, new_hash = (False, None)
+        if db_password:
+            valid, new_hash = await verify_and_update_password_async(form_data.password, db_password)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+    except PoolSaturated:
+        raise
     except Exception as e:
         # Catch bcrypt errors (like 72 char limit) or other passlib failures
         raise HTTPException(
@@ -120,6 +130,15 @@ async def login(res: Response, form_data: OAuth2PasswordRequestForm = Depends())
             detail=f"Authentication error: {str(e)}"
         )
 
+    if new_hash:
+        # Transparent upgrade (legacy bcrypt or outdated argon2 cost). Conditional on the old hash
+        # so a concurrent password change is never overwritten.
+        await db.users.update_one(
+            {"_id": user["_id"], "password": db_password},
+            {"$set": {"password": new_hash}}
+        )
+        invalidate_user(user["_id"])
+
     access_token = create_access_token(subject=str(user["_id"]))
     refresh_token = create_refresh_token(subject=str(user["_id"]))
     
@@ -140,12 +159,8 @@ async def login(res: Response, form_data: OAuth2PasswordRequestForm = Depends())
 @router.post("/google-login")
 async def google_login(res: Response, request: GoogleLoginRequest):
     try:
-        # Verify the Google token
-        idinfo = id_token.verify_oauth2_token(
-            request.token, 
-            requests.Request(), 
-            settings.GOOGLE_CLIENT_ID
-        )
+        # Verify the Google token (signature checked locally against cached Google keys)
+        idinfo = await google_verifier.verify(request.token)
 
         # ID token is valid. Get user's Google ID from the 'sub' claim.
         email = idinfo['email']
@@ -161,12 +176,17 @@ async def google_login(res: Response, request: GoogleLoginRequest):
             user_data = {
                 "name": name,
                 "email": email,
-                "password": get_password_hash(generated_password),
+                "password": await get_password_hash_async(generated_password),
                 "isAdmin": False,
                 "createdAt": datetime.utcnow()
             }
-            new_user = await db.users.insert_one(user_data)
-            user = await db.users.find_one({"_id": new_user.inserted_id})
+            try:
+                user = await user_repo.insert(user_data)
+                await stats.record_user_created()
+            except DuplicateKeyError:
+                # Signed up concurrently (users.email is unique): use the account that won
+                user = await db.users.find_one({"email": email})
+                generated_password = None
         
         access_token = create_access_token(subject=str(user["_id"]))
         refresh_token = create_refresh_token(subject=str(user["_id"]))
@@ -187,6 +207,8 @@ async def google_login(res: Response, request: GoogleLoginRequest):
             "user": UserResponse(**user),
             "generated_password": generated_password
         }
+    except PoolSaturated:
+        raise
     except ValueError:
         # Invalid token
         raise HTTPException(
@@ -209,13 +231,20 @@ async def register(res: Response, user: User):
             detail="User with this email already exists"
         )
     
-    user.password = get_password_hash(user.password)
+    user.password = await get_password_hash_async(user.password)
     user_data = user.model_dump(by_alias=True, exclude={"id"})
     if "_id" in user_data:
         del user_data["_id"]
         
-    new_user = await db.users.insert_one(user_data)
-    created_user = await db.users.find_one({"_id": new_user.inserted_id})
+    try:
+        created_user = await user_repo.insert(user_data)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent registration; users.email is unique
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists"
+        )
+    await stats.record_user_created()
     
     access_token = create_access_token(subject=str(created_user["_id"]))
     refresh_token = create_refresh_token(subject=str(created_user["_id"]))
@@ -246,6 +275,7 @@ async def refresh_token(request: Request, res: Response):
             detail="Refresh token missing"
         )
     
+    from jose import jwt, JWTError
     try:
         payload = jwt.decode(refresh_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         if not payload.get("refresh"):
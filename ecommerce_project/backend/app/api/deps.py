@@ -1,9 +1,7 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from bson import ObjectId
 from app.core.config import settings
-from app.core.database import get_database
+from app.core.cache import get_user_by_id
 from app.models.user import User
 from app.models.common import PyObjectId
 
@@ -19,6 +17,7 @@ async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from jose import jwt, JWTError
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         
@@ -32,9 +31,8 @@ async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)
     except JWTError:
         raise credentials_exception
         
-    db = get_database()
     try:
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        user = await get_user_by_id(user_id)
     except Exception:
         raise credentials_exception
     if user is None:
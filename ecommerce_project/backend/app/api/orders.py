@@ -1,49 +1,101 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import Optional
 from app.core.database import get_database
-from app.models.order import Order
+from app.models.order import Order, OrderPage, OrderSummary
 from app.models.user import User
 from app.api.deps import get_current_user, get_current_admin
+from app.utils.fast_json import DocumentShape, json_response
+from app.core import analytics, stats
+from app.core.checkout import CheckoutError, OutOfStock, place_order
+from app.repositories import orders as order_repo
+from app.utils.pagination import InvalidCursor, decode_cursor, keyset_filter, sort_spec, split_page
 from bson import ObjectId
+from datetime import date, datetime, time, timedelta
 
 router = APIRouter()
 
+ORDER_SHAPE = DocumentShape(Order)
+SUMMARY_SHAPE = DocumentShape(OrderSummary)
+
+# Order history is always newest first; ties on createdAt are broken on _id
+ORDER_SORT = ("newest", "createdAt", -1)
+
+def order_filters(
+    isPaid: Optional[bool] = None,
+    isDelivered: Optional[bool] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> dict:
+    # Inclusive date range on createdAt; either end may be open
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    query = {}
+    if isPaid is not None:
+        query["isPaid"] = isPaid
+    if isDelivered is not None:
+        query["isDelivered"] = isDelivered
+    if start or end:
+        query["createdAt"] = {}
+        if start:
+            query["createdAt"]["$gte"] = datetime.combine(start, time.min)
+        if end:
+            query["createdAt"]["$lt"] = datetime.combine(end + timedelta(days=1), time.min)
+    return query
+
+async def find_orders_page(query: dict, limit: int, cursor: Optional[str], summary: bool):
+    name, field, direction = ORDER_SORT
+    if cursor:
+        try:
+            value, last_id = decode_cursor(cursor, name)
+            # The cursor carries createdAt as text; compare against the stored datetime
+            value = datetime.fromisoformat(value)
+        except (InvalidCursor, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = {"$and": [query, keyset_filter(field, direction, value, last_id)]}
+
+    # Keyset pagination over the orders (..., createdAt, _id) indexes: every page is one range scan,
+    # however many orders exist in total
+    shape = SUMMARY_SHAPE if summary else ORDER_SHAPE
+    docs = await get_database().orders.find(query, shape.projection()).sort(sort_spec(field, direction)).limit(limit + 1).to_list(length=limit + 1)
+    items, next_cursor = split_page(name, field, docs, limit)
+    return json_response({"items": shape.shape_many(items), "limit": limit, "nextCursor": next_cursor})
+
 @router.post("/", response_model=Order)
 async def add_order_items(order: Order, current_user: User = Depends(get_current_user)):
     if current_user.isAdmin:
         raise HTTPException(status_code=400, detail="Admins cannot place orders")
         
-    db = get_database()
-    if not order.orderItems:
-         raise HTTPException(status_code=400, detail="No order items")
-    
-    order.user = current_user.id
-    order_data = order.model_dump(by_alias=True, exclude={"id"})
-    if "_id" in order_data:
-        del order_data["_id"]
-        
-    # Convert user ID to ObjectId for DB storage
-    if order_data.get("user") and isinstance(order_data["user"], str):
-        order_data["user"] = ObjectId(order_data["user"])
-        
-    new_order = await db.orders.insert_one(order_data)
-    created_order = await db.orders.find_one({"_id": new_order.inserted_id})
-    return created_order
+    # Prices, totals and stock come from the catalog; the client only chooses products and quantities
+    try:
+        order_data = await place_order(order, current_user.id)
+    except OutOfStock as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except CheckoutError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/myorders", response_model=List[Order])
-async def get_my_orders(current_user: User = Depends(get_current_user)):
+    await stats.record_order_created(order_data)
+    await analytics.record_order_created(order_data)
+    return order_data
+
+@router.get("/myorders", response_model=OrderPage)
+async def get_my_orders(
+    filters: dict = Depends(order_filters),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+    current_user: User = Depends(get_current_user),
+):
     if current_user.isAdmin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admins cannot have personal orders"
         )
-    db = get_database()
-    orders = await db.orders.find({
+    query = {
         "user": ObjectId(current_user.id),
-        "isUserDeleted": {"$ne": True}
-    }).to_list(length=100)
-    return orders
+        "isUserDeleted": {"$ne": True},
+        **filters,
+    }
+    return await find_orders_page(query, limit, cursor, summary)
 
 @router.get("/{id}", response_model=Order)
 async def get_order_by_id(id: str, current_user: User = Depends(get_current_user)):
@@ -62,62 +114,61 @@ async def get_order_by_id(id: str, current_user: User = Depends(get_current_user
 
 @router.put("/{id}/pay", response_model=Order)
 async def update_order_to_paid(id: str, current_user: User = Depends(get_current_user)):
-    db = get_database()
-    order = await db.orders.find_one({"_id": ObjectId(id)})
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=404, detail="Invalid ID")
+    # in real app update paymentResult here too
+    order = await order_repo.mark_paid(id, owner=None if current_user.isAdmin else current_user.id)
     if order:
-        if current_user.isAdmin or str(order["user"]) == str(current_user.id):
-            update_data = {
-                "isPaid": True,
-                "paidAt": datetime.utcnow()
-                # in real app update paymentResult here too
-            }
-            await db.orders.update_one({"_id": ObjectId(id)}, {"$set": update_data})
-            return await db.orders.find_one({"_id": ObjectId(id)})
-        else:
-             raise HTTPException(status_code=400, detail="Not authorized")
-    else:
+        # Only the unpaid -> paid transition counts towards revenue, so paying twice is a no-op
+        await stats.record_order_paid(order.get("totalPrice", 0))
+        await analytics.record_order_paid(order)
+        return order
+
+    # Nothing flipped: find out why (second read only on this path)
+    order = await order_repo.get(id)
+    if not order:
         raise HTTPException(status_code=404, detail="Order not found")
+    if not (current_user.isAdmin or str(order["user"]) == str(current_user.id)):
+        raise HTTPException(status_code=400, detail="Not authorized")
+    return order
 
-@router.get("/", response_model=List[Order], dependencies=[Depends(get_current_admin)])
-async def get_orders():
-    db = get_database()
-    orders = await db.orders.find({}).to_list(length=100)
-    return orders
+@router.get("/", response_model=OrderPage, dependencies=[Depends(get_current_admin)])
+async def get_orders(
+    filters: dict = Depends(order_filters),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    summary: bool = False,
+):
+    return await find_orders_page(filters, limit, cursor, summary)
 
 @router.put("/{id}/deliver", dependencies=[Depends(get_current_admin)], response_model=Order)
 async def update_order_to_delivered(id: str):
-    db = get_database()
-    order = await db.orders.find_one({"_id": ObjectId(id)})
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=404, detail="Invalid ID")
+    order = await order_repo.mark_delivered(id)
     if order:
-        update_data = {
-            "isDelivered": True,
-            "deliveredAt": datetime.utcnow()
-        }
-        await db.orders.update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        return await db.orders.find_one({"_id": ObjectId(id)})
+        return order
     else:
         raise HTTPException(status_code=404, detail="Order not found")
+
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_order(id: str, current_user: User = Depends(get_current_user)):
-    db = get_database()
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=404, detail="Invalid ID")
-        
-    order = await db.orders.find_one({"_id": ObjectId(id)})
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
+
     # If admin calls, we do a hard delete
     if current_user.isAdmin:
-        await db.orders.delete_one({"_id": ObjectId(id)})
+        order = await order_repo.delete(id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        await stats.record_order_deleted(order)
+        await analytics.record_order_deleted(order)
         return None
-        
+
     # If owner calls, we do a soft delete (hide from user)
-    if str(order["user"]) == str(current_user.id):
-        await db.orders.update_one(
-            {"_id": ObjectId(id)},
-            {"$set": {"isUserDeleted": True}}
-        )
+    if await order_repo.hide_from_owner(id, current_user.id):
         return None
-        
+
+    if not await order_repo.get(id):
+        raise HTTPException(status_code=404, detail="Order not found")
     raise HTTPException(status_code=403, detail="Not authorized to delete this order")
@@ -1,88 +1,342 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from app.utils.s3_utilities import upload_file_to_s3
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Request
+from app.utils.pagination import InvalidCursor, decode_cursor, keyset_filter, sort_spec, split_page
+from app.utils.search import normalize_search
+from app.utils.etag import make_etag, etag_response
+from app.utils.fast_json import projection
+from typing import List, Optional
+from app.core.config import settings
 from app.core.database import get_database
-from app.models.product import Product
+from app.core.cache import catalog_cache, product_count_cache, invalidate_catalog
+from app.core import stats
+from app.repositories import products as product_repo
+from app.models.product import Product, ProductPage, ProductSummary, ReviewPage, ReviewCreate, RatingSummary
 from app.models.user import User
 from app.api.deps import get_current_user, get_current_admin
 from bson import ObjectId
+from pydantic import TypeAdapter
+from pymongo import ReturnDocument
+from datetime import datetime
 import os
 import uuid
 from pathlib import Path
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Product])
-async def get_products(search: str = ""):
+# Sort options understood by the storefront -> (field, direction); ties are broken on _id
+PRODUCT_SORTS = {
+    "newest": ("_id", -1),
+    "price_low": ("price", 1),
+    "price_high": ("price", -1),
+    "popular": ("numReviews", -1),
+    "rating": ("rating", -1),
+    # Only valid with a search term: ranked by $text score
+    "relevance": ("score", -1),
+}
+
+# Responses are validated and dumped by pydantic-core, as response_model would, but rendered once
+# per cache fill instead of per request (DocumentShape measured no faster on products)
+PRODUCT_PAGE = TypeAdapter(ProductPage)
+PRODUCT = TypeAdapter(Product)
+REVIEW_PAGE = TypeAdapter(ReviewPage)
+PRODUCT_SUMMARIES = TypeAdapter(List[ProductSummary])
+
+# Listings never read reviews or the description, and only the first image: page size stays flat
+# however many reviews a product collects
+SUMMARY_PROJECTION = {**projection(ProductSummary), "images": {"$slice": 1}}
+SUMMARY_PIPELINE_PROJECTION = {**projection(ProductSummary), "images": {"$slice": ["$images", 1]}}
+
+async def count_products(db, query: dict) -> int:
+    if not query:
+        return await db.products.estimated_document_count()
+    key = repr(sorted(query.items()))
+    total = product_count_cache.get(key)
+    if total is None:
+        total = await db.products.count_documents(query)
+        product_count_cache.set(key, total)
+    return total
+
+def serialize(adapter: TypeAdapter, data) -> tuple:
+    # Same JSON FastAPI would produce for response_model, rendered once and cached with its ETag
+    body = adapter.dump_json(adapter.validate_python(data), by_alias=True)
+    return make_etag(body), body
+
+@router.get("/", response_model=ProductPage)
+async def get_products(
+    request: Request,
+    search: str = "",
+    category: str = "",
+    minPrice: Optional[float] = None,
+    maxPrice: Optional[float] = None,
+    sort: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+):
+    key = ("list", search, category, minPrice, maxPrice, sort, limit, cursor, include_total)
+
+    async def load():
+        page = await find_products_page(search, category, minPrice, maxPrice, sort, limit, cursor, include_total)
+        return serialize(PRODUCT_PAGE, page)
+
+    return etag_response(request, await catalog_cache.get_or_load(key, load))
+
+async def find_products_page(search, category, minPrice, maxPrice, sort, limit, cursor, include_total) -> dict:
     db = get_database()
+    terms = normalize_search(search)
+    if sort is None:
+        sort = "relevance" if terms else "newest"
+    if sort not in PRODUCT_SORTS or (sort == "relevance" and not terms):
+        raise HTTPException(status_code=400, detail=f"Invalid sort. Use one of: {', '.join(PRODUCT_SORTS)}")
+    field, direction = PRODUCT_SORTS[sort]
+
     query = {}
-    if search:
-        query["name"] = {"$regex": search, "$options": "i"}
-        
-    products = await db.products.find(query).to_list(length=100)
-    return products
+    if terms:
+        # Served by the products text index (name, brand, category, description)
+        query["$text"] = {"$search": terms}
+    if category:
+        query["category"] = category
+    if minPrice is not None or maxPrice is not None:
+        query["price"] = {}
+        if minPrice is not None:
+            query["price"]["$gte"] = minPrice
+        if maxPrice is not None:
+            query["price"]["$lte"] = maxPrice
+
+    after = {}
+    if cursor:
+        try:
+            value, last_id = decode_cursor(cursor, sort)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = keyset_filter(field, direction, value, last_id)
+
+    # Keyset pagination: no skip(), so deep pages cost the same as the first one
+    if terms:
+        # A $text match can't be read in any sort order, so every search sorts in memory. What it
+        # sorts is bounded before ranking: only the first SEARCH_MAX_CANDIDATES matches are fetched
+        # and scored-sorted, however common the term, and results come from within them.
+        pipeline = [{"$match": query}, {"$limit": settings.SEARCH_MAX_CANDIDATES}]
+        if sort == "relevance":
+            # Ranked as one bounded top-k sort; the score only exists inside the pipeline, so the
+            # cursor predicate is applied after ranking ($match keeps the ranked order)
+            pipeline += [
+                {"$sort": {"score": {"$meta": "textScore"}, "_id": -1}},
+                {"$limit": settings.SEARCH_MAX_RESULTS},
+                {"$addFields": {"score": {"$meta": "textScore"}}},
+                {"$match": after},
+                {"$limit": limit + 1},
+                {"$project": {**SUMMARY_PIPELINE_PROJECTION, "score": 1}},
+            ]
+        else:
+            pipeline += [
+                {"$match": after},
+                {"$sort": dict(sort_spec(field, direction))},
+                {"$limit": limit + 1},
+                {"$project": SUMMARY_PIPELINE_PROJECTION},
+            ]
+        docs = await db.products.aggregate(pipeline).to_list(length=limit + 1)
+    else:
+        page_query = {"$and": [query, after]} if after else query
+        docs = await db.products.find(page_query, SUMMARY_PROJECTION).sort(sort_spec(field, direction)).limit(limit + 1).to_list(length=limit + 1)
+    items, next_cursor = split_page(sort, field, docs, limit)
+
+    return {
+        "items": items,
+        "total": await count_products(db, query) if include_total else None,
+        "limit": limit,
+        "nextCursor": next_cursor,
+    }
 
 
 @router.get("/{id}", response_model=Product)
-async def get_product(id: str):
+async def get_product(id: str, request: Request):
     db = get_database()
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=404, detail="Invalid ID")
-        
-    product = await db.products.find_one({"_id":ObjectId(id)})
-    if product:
-        return product
+
+    async def load():
+        product = await db.products.find_one({"_id":ObjectId(id)}, projection(Product))
+        return serialize(PRODUCT, product) if product else None
+
+    cached = await catalog_cache.get_or_load(("product", id), load)
+    if cached:
+        return etag_response(request, cached)
+    raise HTTPException(status_code=404, detail="Product not found")
+
+@router.get("/{id}/reviews", response_model=ReviewPage)
+async def get_product_reviews(
+    id: str,
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+):
+    db = get_database()
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=404, detail="Invalid ID")
+
+    async def load():
+        # Reviews are embedded, so this pages with $slice: only the requested window leaves the server.
+        # Newest first: reviews are appended, so the array is read from the end.
+        pipeline = [
+            {"$match": {"_id": ObjectId(id)}},
+            {"$project": {
+                "_id": 0,
+                "total": {"$size": {"$ifNull": ["$reviews", []]}},
+                "items": {"$slice": [{"$reverseArray": {"$ifNull": ["$reviews", []]}}, offset, limit]},
+            }},
+        ]
+        docs = await db.products.aggregate(pipeline).to_list(length=1)
+        if not docs:
+            return None
+        return serialize(REVIEW_PAGE, {**docs[0], "offset": offset, "limit": limit})
+
+    cached = await catalog_cache.get_or_load(("reviews", id, offset, limit), load)
+    if cached:
+        return etag_response(request, cached)
     raise HTTPException(status_code=404, detail="Product not found")
 
+# Rating aggregates live on the product as a running sum and count, updated in the same pipeline
+# update that changes the reviews array, so reads never have to aggregate reviews.
+SEED_RATING_TOTALS = {"$set": {
+    "reviews": {"$ifNull": ["$reviews", []]},
+    # Products written before ratingSum existed carry placeholder counts: derive the totals from the array once
+    "ratingSum": {"$ifNull": ["$ratingSum", {"$sum": "$reviews.rating"}]},
+    "numReviews": {"$cond": [
+        {"$eq": [{"$ifNull": ["$ratingSum", None]}, None]},
+        {"$size": {"$ifNull": ["$reviews", []]}},
+        "$numReviews",
+    ]},
+}}
+DERIVE_RATING = {"$set": {
+    "rating": {"$cond": [
+        {"$gt": ["$numReviews", 0]},
+        {"$round": [{"$divide": ["$ratingSum", "$numReviews"]}, 1]},
+        0,
+    ]},
+}}
+RATING_PROJECTION = {"_id": 0, "rating": 1, "numReviews": 1}
+
+@router.post("/{id}/reviews", response_model=RatingSummary, status_code=status.HTTP_201_CREATED)
+async def create_product_review(id: str, review_in: ReviewCreate, current_user: User = Depends(get_current_user)):
+    db = get_database()
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=404, detail="Invalid ID")
+
+    user_id = ObjectId(str(current_user.id))
+    review = {
+        "name": current_user.name,
+        "rating": review_in.rating,
+        "comment": review_in.comment,
+        "user": user_id,
+        "createdAt": datetime.utcnow(),
+    }
+    # The filter enforces one review per user atomically: a second attempt matches nothing
+    updated = await db.products.find_one_and_update(
+        {"_id": ObjectId(id), "reviews.user": {"$ne": user_id}},
+        [
+            SEED_RATING_TOTALS,
+            {"$set": {
+                # $literal: user text must never be read as a field path or operator
+                "reviews": {"$concatArrays": ["$reviews", {"$literal": [review]}]},
+                "ratingSum": {"$add": ["$ratingSum", review_in.rating]},
+                "numReviews": {"$add": ["$numReviews", 1]},
+            }},
+            DERIVE_RATING,
+        ],
+        projection=RATING_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        if await db.products.count_documents({"_id": ObjectId(id)}, limit=1):
+            raise HTTPException(status_code=400, detail="Product already reviewed")
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    invalidate_catalog()
+    return updated
+
+@router.delete("/{id}/reviews", response_model=RatingSummary)
+async def delete_product_review(id: str, user: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    """Removes the caller's review; admins may remove anyone's by passing ?user=<id>."""
+    db = get_database()
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=404, detail="Invalid ID")
+    if user is not None and not current_user.isAdmin:
+        raise HTTPException(status_code=403, detail="Not authorized to delete this review")
+    if user is not None and not ObjectId.is_valid(user):
+        raise HTTPException(status_code=404, detail="Invalid user ID")
+
+    user_id = ObjectId(user or str(current_user.id))
+    is_author = {"$eq": ["$$review.user", user_id]}
+    not_author = {"$ne": ["$$review.user", user_id]}
+    updated = await db.products.find_one_and_update(
+        {"_id": ObjectId(id), "reviews.user": user_id},
+        [
+            SEED_RATING_TOTALS,
+            {"$set": {"_removed": {"$filter": {"input": "$reviews", "as": "review", "cond": is_author}}}},
+            {"$set": {
+                "reviews": {"$filter": {"input": "$reviews", "as": "review", "cond": not_author}},
+                "ratingSum": {"$subtract": ["$ratingSum", {"$sum": "$_removed.rating"}]},
+                "numReviews": {"$subtract": ["$numReviews", {"$size": "$_removed"}]},
+            }},
+            {"$unset": "_removed"},
+            DERIVE_RATING,
+        ],
+        projection=RATING_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    invalidate_catalog()
+    return updated
+
 @router.post("/", dependencies=[Depends(get_current_admin)], response_model=Product)
 async def create_product(product_in: Product):
-    db = get_database()
-    
-    product_data = product_in.model_dump(by_alias=True, exclude={"id", "_id", "image"})
+    product_data = product_in.model_dump(by_alias=True, exclude={"id", "_id", "image", "thumbnail"})
     if "_id" in product_data:
         del product_data["_id"]
+    # Reviews and their aggregates are only ever written by the review endpoints
+    product_data.update(reviews=[], rating=0, numReviews=0, ratingSum=0)
     
     # Convert user ID string to ObjectId for DB storage
     if product_data.get("user") and isinstance(product_data["user"], str):
         product_data["user"] = ObjectId(product_data["user"])
         
-    new_product = await db.products.insert_one(product_data)
-    created_product = await db.products.find_one({"_id": new_product.inserted_id})
+    created_product = await product_repo.insert(product_data)
+    await stats.record_product_created()
+    invalidate_catalog()
     return created_product
 
 @router.put("/{id}", dependencies=[Depends(get_current_admin)], response_model=Product)
 async def update_product(id: str, product_update: Product):
-    db = get_database()
     if not ObjectId.is_valid(id):
          raise HTTPException(status_code=404, detail="Invalid ID")
 
-    product = await db.products.find_one({"_id":ObjectId(id)})
-    if product:
-        update_data = product_update.model_dump(exclude_unset=True, exclude={"image"})
-        # Avoid updating _id
-        if "_id" in update_data:
-            del update_data["_id"]
-        
-        # Ensure 'user' is stored as ObjectId if present
-        if update_data.get("user") and isinstance(update_data["user"], str):
-            update_data["user"] = ObjectId(update_data["user"])
-            
-        await db.products.update_one({"_id": ObjectId(id)}, {"$set": update_data})
-        updated_product = await db.products.find_one({"_id": ObjectId(id)})
-        return updated_product
-    else:
+    update_data = product_update.model_dump(
+        exclude_unset=True, exclude={"image", "thumbnail", "reviews", "rating", "numReviews"}
+    )
+    # Avoid updating _id
+    update_data.pop("_id", None)
+    update_data.pop("id", None)
+
+    # Ensure 'user' is stored as ObjectId if present
+    if update_data.get("user") and isinstance(update_data["user"], str):
+        update_data["user"] = ObjectId(update_data["user"])
+
+    updated_product = await product_repo.update(id, update_data)
+    if updated_product is None:
         raise HTTPException(status_code=404, detail="Product not found")
+    invalidate_catalog()
+    return updated_product
 
 @router.delete("/{id}", dependencies=[Depends(get_current_admin)])
 async def delete_product(id: str):
-    db = get_database()
     if not ObjectId.is_valid(id):
          raise HTTPException(status_code=404, detail="Invalid ID")
          
-    product = await db.products.find_one({"_id":ObjectId(id)})
-    if product:
-        await db.products.delete_one({"_id": ObjectId(id)})
-        return {"message": "Product removed"}
-    else:
+    if not await product_repo.delete(id):
         raise HTTPException(status_code=404, detail="Product not found")
+    await stats.record_product_deleted()
+    invalidate_catalog()
+    return {"message": "Product removed"}
 
@@ -1,21 +1,139 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 import asyncio
-from app.utils.s3_utilities import upload_file_to_s3
-from typing import List
+from app.utils.s3_utilities import s3_uploader
+from app.core.config import settings
+from app.utils.images import SNIFF_BYTES, sniff_image_type, make_variants
+from app.utils.upload_index import find_upload, register_upload
 from fastapi.concurrency import run_in_threadpool
+from app.core.workers import WorkerPool, PoolSaturated
+from typing import List
+import base64
+import binascii
 import io
-import httpx
-from pydantic import BaseModel, HttpUrl
+import logging
+from pydantic import BaseModel, Field, HttpUrl
+from typing import Literal
+import uuid
 
 router = APIRouter()
 
+# Decoding and re-encoding images is CPU-bound; keep it off the event loop
+image_pool = WorkerPool(
+    "image-processing",
+    max_workers=settings.IMAGE_WORKERS,
+    max_queue=settings.IMAGE_MAX_QUEUE,
+    kind=settings.IMAGE_POOL,
+)
+
 class UrlUpload(BaseModel):
     url: HttpUrl
 
+class PresignRequest(BaseModel):
+    filename: str
+    contentType: str
+    size: int = Field(..., gt=0)
+    # Base64 of the file's SHA-256 digest, computed by the client (crypto.subtle.digest in a browser)
+    checksumSHA256: str
+    method: Literal["post", "put"] = "post"
+
+class CompleteUploadRequest(BaseModel):
+    key: str
+
+# Content types accepted for direct uploads, with the extension used for the object key
+DIRECT_UPLOAD_TYPES = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp"}
+
+# Multipart form files are read (and hashed, and streamed to S3) this much at a time
+UPLOAD_READ_CHUNK = 1024 * 1024
+
+async def upload_with_variants(file: UploadFile) -> tuple:
+    """
+    Streams the original to S3 while hashing it and, in parallel with committing it, renders its
+    resized WebP variants in the image worker pool, uploaded next to it as <key>_<width>w.webp.
+    Returns (original_url, {width: url}); variants are skipped if the image can't be decoded.
+    Objects are content-addressed: content that was uploaded before is answered from the
+    upload index and the staged body is dropped (bodies under one part never reach S3). If that
+    content was first stored by /url or /complete, which render no variants, they are rendered now
+    and added to its index entry.
+    """
+    from botocore.exceptions import ClientError
+    ext = file.filename.split(".")[-1].lower() if "." in file.filename else ""
+    upload = s3_uploader.streaming_upload(ext, file.content_type)
+    # The variants need the decoded image, so the body is kept as well as streamed
+    data = bytearray()
+    committed = False
+
+    def render():
+        return image_pool.run(
+            make_variants, bytes(data), settings.IMAGE_VARIANT_WIDTHS,
+            settings.IMAGE_WEBP_QUALITY, settings.IMAGE_MAX_PIXELS,
+        )
+
+    try:
+        async with s3_uploader.slots:
+            while chunk := await file.read(UPLOAD_READ_CHUNK):
+                data += chunk
+                await upload.write(chunk)
+
+            digest = upload.sha256.hexdigest()
+            existing = await find_upload(digest)
+            if existing:
+                await upload.abort()
+            else:
+                original, rendered = await asyncio.gather(
+                    upload.complete(final_key=f"{digest}.{ext}" if ext else digest),
+                    render(),
+                    return_exceptions=True,
+                )
+                if isinstance(original, BaseException):
+                    raise original
+                committed = True
+    except ClientError as e:
+        logging.error(f"S3 Upload Error for {file.filename}: {e}")
+        if not committed:
+            await upload.abort()
+        return None, {}
+    except BaseException:
+        if not committed:
+            await upload.abort()
+        raise
+
+    if existing:
+        if existing.get("variants") or not settings.IMAGE_VARIANT_WIDTHS:
+            return existing["url"], existing["variants"]
+        original = existing["url"]
+        try:
+            rendered = await render()
+        except Exception as e:
+            rendered = e
+
+    size = len(data)
+    del data
+    if isinstance(rendered, PoolSaturated):
+        raise rendered
+    if isinstance(rendered, BaseException):
+        logging.warning(f"Could not render variants for {file.filename}: {rendered}")
+        await register_upload(digest, original, file.content_type, size)
+        return original, {}
+
+    widths = list(rendered)
+    urls = await asyncio.gather(*[
+        s3_uploader.upload_async(io.BytesIO(rendered[w]), f"{digest}_{w}w.webp", "image/webp", key=f"{digest}_{w}w.webp")
+        for w in widths
+    ])
+    variant_urls = {str(w): url for w, url in zip(widths, urls) if url}
+    await register_upload(digest, original, file.content_type, size, variant_urls)
+    return original, variant_urls
+
 @router.post("/")
 async def upload_images(files: List[UploadFile] = File(...)):
     allowed_extensions = ["jpg", "jpeg", "png", "webp"]
     tasks = []
+    # Bound how many of this request's files are processed at once (the uploader also caps the whole process)
+    request_slots = asyncio.Semaphore(settings.S3_MAX_UPLOADS_PER_REQUEST)
+
+    async def upload_one(file: UploadFile):
+        async with request_slots:
+            return await upload_with_variants(file)
     
     for file in files:
         if not file.filename or "." not in file.filename:
@@ -25,52 +143,208 @@ async def upload_images(files: List[UploadFile] = File(...)):
         if file_ext not in allowed_extensions:
             continue
         
-        # Use threadpool for blocking I/O (S3 upload)
-        tasks.append(run_in_threadpool(upload_file_to_s3, file.file, file.filename, file.content_type))
+        tasks.append(upload_one(file))
     
     if not tasks:
         raise HTTPException(status_code=400, detail="No valid images provided.")
 
     # Run all uploads in parallel
     results = await asyncio.gather(*tasks)
-    uploaded_urls = [url for url in results if url]
+    uploaded_urls = [url for url, _ in results if url]
     
     if not uploaded_urls:
          raise HTTPException(status_code=500, detail="Failed to upload images to S3.")
-         
-    return {"images": uploaded_urls}
+
+    # Entries ready to be stored as Product.imageVariants
+    variants = [{"url": url, "variants": urls} for url, urls in results if url and urls]
+    return {"images": uploaded_urls, "variants": variants}
+
+_http_client = None
+
+def get_http_client():
+    # Shared across requests so remote fetches reuse connections; httpx is imported on first use
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.URL_UPLOAD_READ_TIMEOUT,
+                connect=settings.URL_UPLOAD_CONNECT_TIMEOUT,
+            ),
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+async def close_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+async def stream_url_to_s3(url_str: str) -> str:
+    """
+    Streams a remote image straight into S3 without holding the whole body in memory:
+    at most one S3 part is buffered, whatever the image size.
+    """
+    max_bytes = settings.URL_UPLOAD_MAX_BYTES
+    async with get_http_client().stream("GET", url_str) as response:
+        if response.status_code != 200:
+            raise HTTPException(status_code=400, detail=f"Failed to fetch image from URL. Status: {response.status_code}")
+
+        declared = response.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > max_bytes:
+            raise HTTPException(status_code=413, detail=f"Image exceeds the {max_bytes} byte limit.")
+
+        head = b""
+        upload = None
+        try:
+            async for chunk in response.aiter_bytes(64 * 1024):
+                if upload is None:
+                    # Identify the image from its magic bytes, not the remote content-type
+                    head += chunk
+                    if len(head) < SNIFF_BYTES:
+                        continue
+                    image_type = sniff_image_type(head)
+                    if image_type is None:
+                        raise HTTPException(status_code=400, detail="URL does not point to a valid image.")
+                    upload = s3_uploader.streaming_upload(*image_type)
+                    chunk, head = head, b""
+
+                if upload.size + len(chunk) > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Image exceeds the {max_bytes} byte limit.")
+                await upload.write(chunk)
+
+            if upload is None:
+                # Body shorter than the sniff window
+                image_type = sniff_image_type(head)
+                if image_type is None:
+                    raise HTTPException(status_code=400, detail="URL does not point to a valid image.")
+                upload = s3_uploader.streaming_upload(*image_type)
+                await upload.write(head)
+
+            # Same bytes imported before: drop the staged body and reuse the stored object
+            digest = upload.sha256.hexdigest()
+            existing = await find_upload(digest)
+            if existing:
+                await upload.abort()
+                return existing["url"]
+
+            ext = upload.key.rsplit(".", 1)[-1]
+            url = await upload.complete(final_key=f"{digest}.{ext}")
+        except BaseException:
+            # Only a staged body is discarded; once complete() succeeds the object is final
+            if upload is not None:
+                await upload.abort()
+            raise
+
+    # Content-addressed: if registering fails, the next import of these bytes rewrites the same
+    # key and registers it, so the committed object is never aborted or deleted here
+    await register_upload(digest, url, upload.content_type, upload.size)
+    return url
 
 @router.post("/url")
 async def upload_image_from_url(url_in: UrlUpload):
+    import httpx
     url_str = str(url_in.url)
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url_str)
-            if response.status_code != 200:
-                raise HTTPException(status_code=400, detail=f"Failed to fetch image from URL. Status: {response.status_code}")
-            
-            content_type = response.headers.get("content-type", "image/jpeg")
-            if not content_type.startswith("image/"):
-                raise HTTPException(status_code=400, detail="URL does not point to a valid image.")
-            
-            # Extract filename from URL or use a default
-            filename = url_str.split("/")[-1].split("?")[0] or "image.jpg"
-            if "." not in filename:
-                filename += ".jpg"
-            
-            # Wrap bytes in BytesIO for upload_file_to_s3
-            file_obj = io.BytesIO(response.content)
-            
-            s3_url = await run_in_threadpool(upload_file_to_s3, file_obj, filename, content_type)
-            
-            if not s3_url:
-                raise HTTPException(status_code=500, detail="Failed to upload image to S3.")
-                
-            return {"url": s3_url}
-            
+        async with s3_uploader.slots:
+            s3_url = await asyncio.wait_for(stream_url_to_s3(url_str), timeout=settings.URL_UPLOAD_TOTAL_TIMEOUT)
+        return {"url": s3_url}
+
+    except HTTPException:
+        raise
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=408, detail="Timed out fetching image from URL.")
     except httpx.RequestError as e:
         raise HTTPException(status_code=400, detail=f"Error fetching image: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
-    
\ No newline at end of file
+def sha256_hex(checksum: str):
+    # S3 reports checksums as base64; the upload index is keyed by hex. None if it isn't a SHA-256.
+    try:
+        digest = base64.b64decode(checksum, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return digest.hex() if len(digest) == 32 else None
+
+@router.post("/presign")
+async def presign_upload(request: PresignRequest):
+    """
+    Issues a short-lived grant to upload one image straight to S3, keeping the bytes off
+    the API/Lambda path. The grant is bound to a fresh key under DIRECT_UPLOAD_PREFIX,
+    the declared content type, the size limit and the body's SHA-256, which S3 verifies.
+    Call /complete once the upload is done.
+    """
+    ext = DIRECT_UPLOAD_TYPES.get(request.contentType)
+    if ext is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported content type. Use one of: {', '.join(DIRECT_UPLOAD_TYPES)}")
+    if request.size > settings.DIRECT_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image exceeds the {settings.DIRECT_UPLOAD_MAX_BYTES} byte limit.")
+    if sha256_hex(request.checksumSHA256) is None:
+        raise HTTPException(status_code=400, detail="checksumSHA256 must be the base64 SHA-256 digest of the file.")
+
+    key = f"{settings.DIRECT_UPLOAD_PREFIX}{uuid.uuid4()}.{ext}"
+    expires_in = settings.DIRECT_UPLOAD_EXPIRES_SECONDS
+    if request.method == "put":
+        url = await run_in_threadpool(
+            s3_uploader.presign_put, key, request.contentType, request.size, expires_in, request.checksumSHA256
+        )
+        headers = {
+            "Content-Type": request.contentType,
+            "x-amz-checksum-sha256": request.checksumSHA256,
+            "x-amz-sdk-checksum-algorithm": "SHA256",
+        }
+        return {"method": "put", "url": url, "headers": headers, "key": key, "expiresIn": expires_in}
+
+    grant = await run_in_threadpool(
+        s3_uploader.presign_post, key, request.contentType, settings.DIRECT_UPLOAD_MAX_BYTES, expires_in,
+        request.checksumSHA256,
+    )
+    return {"method": "post", "url": grant["url"], "fields": grant["fields"], "key": key, "expiresIn": expires_in}
+
+@router.post("/complete")
+async def complete_upload(request: CompleteUploadRequest):
+    """
+    Verifies a direct upload landed (existence, size, real image bytes) and registers it.
+    The body never comes back through here: its SHA-256 is the checksum S3 verified against
+    the grant, read from the object's metadata, and only SNIFF_BYTES are fetched to check the
+    image type. Direct uploads share the SHA-256 upload index with every other path: a repeat of
+    content already stored is deleted and the existing URL returned, new content moves out of
+    DIRECT_UPLOAD_PREFIX to its content-addressed key.
+    Grants that are never completed leave their object under the prefix, where the staging
+    lifecycle rule (python -m app.core.upload_lifecycle) expires it.
+    """
+    key = request.key
+    if not key.startswith(settings.DIRECT_UPLOAD_PREFIX) or ".." in key:
+        raise HTTPException(status_code=400, detail="Invalid upload key")
+
+    head = await run_in_threadpool(s3_uploader.head, key)
+    if head is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    size = head["ContentLength"]
+    content_type = head.get("ContentType", "")
+    # Grants always sign a SHA-256; an object without one wasn't uploaded through a grant
+    digest = sha256_hex(head.get("ChecksumSHA256") or "")
+    if size > settings.DIRECT_UPLOAD_MAX_BYTES or digest is None:
+        await run_in_threadpool(s3_uploader.delete, key)
+        raise HTTPException(status_code=400, detail="Uploaded object is not a valid image.")
+
+    head_bytes = await run_in_threadpool(s3_uploader.read_head, key, SNIFF_BYTES)
+    image_type = sniff_image_type(head_bytes)
+    if image_type is None or image_type[1] != content_type:
+        await run_in_threadpool(s3_uploader.delete, key)
+        raise HTTPException(status_code=400, detail="Uploaded object is not a valid image.")
+
+    existing = await find_upload(digest)
+    if existing:
+        await run_in_threadpool(s3_uploader.delete, key)
+        return {"url": existing["url"]}
+
+    final_key = f"{digest}.{image_type[0]}"
+    await run_in_threadpool(s3_uploader.move, key, final_key, content_type)
+    url = s3_uploader.object_url(final_key)
+    await register_upload(digest, url, content_type, size)
+    return {"url": url}
@@ -3,28 +3,33 @@ from typing import List
 from app.core.database import get_database
 from app.models.user import User, UserResponse
 from app.api.deps import get_current_user, get_current_admin
-from app.core.security import get_password_hash
-from bson import ObjectId
+from app.core.security import get_password_hash_async
+from app.core.cache import invalidate_user
+from app.utils.fast_json import DocumentShape, json_response
+from app.repositories import users as user_repo
 
 router = APIRouter()
 
+USER_SHAPE = DocumentShape(User)
+
 @router.get("/profile", response_model=UserResponse)
 async def read_user_profile(current_user: User = Depends(get_current_user)):
     return current_user
 
 @router.put("/profile", response_model=User)
 async def update_user_profile(user_update: User, current_user: User = Depends(get_current_user)):
-    db = get_database()
-    user = await db.users.find_one({"_id": ObjectId(str(current_user.id))})
-    
-    if user:
-        user["name"] = user_update.name or user["name"]
-        user["email"] = user_update.email or user["email"]
-        if user_update.password:
-            user["password"] = get_password_hash(user_update.password)
-        
-        await db.users.update_one({"_id": ObjectId(str(current_user.id))}, {"$set": user})
-        updated_user = await db.users.find_one({"_id": ObjectId(str(current_user.id))})
+    # Only the fields that were sent are changed; the updated document comes back from the same command
+    changes = {}
+    if user_update.name:
+        changes["name"] = user_update.name
+    if user_update.email:
+        changes["email"] = user_update.email
+    if user_update.password:
+        changes["password"] = await get_password_hash_async(user_update.password)
+
+    updated_user = await user_repo.update(str(current_user.id), changes)
+    if updated_user:
+        invalidate_user(current_user.id)
         return User(**updated_user)
     else:
         raise HTTPException(status_code=404, detail="User not found")
@@ -32,5 +37,5 @@ async def update_user_profile(user_update: User, current_user: User = Depends(ge
 @router.get("/", response_model=List[User], dependencies=[Depends(get_current_admin)])
 async def read_users():
     db = get_database()
-    users = await db.users.find({}).to_list(length=100)
-    return users
+    users = await db.users.find({}, USER_SHAPE.projection()).to_list(length=100)
+    return json_response(USER_SHAPE.shape_many(users))
@@ -0,0 +1,232 @@
+"""
+Sales analytics over materialized daily buckets.
+
+Every paid order is folded into `sales_daily`, one document per (day, product) holding the
+revenue, units and order count for that product on that day. Reports aggregate only these
+buckets, so their cost grows with the length of the range and the number of products sold,
+never with the number of orders.
+
+The buckets are seeded by rebuild(), which leaves a marker in the `stats` collection: at
+startup when the marker is missing, or on the first report. Buckets written by orders paid before
+that are replaced by the rebuild, so a database that already holds paid orders never reports only
+what was sold after deploy. Rebuild the buckets from the orders collection (after a migration,
+restore or suspected drift):
+
+    python -m app.core.analytics --rebuild
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.database import get_database
+
+INTERVALS = ("day", "week", "month")
+UNCATEGORIZED = "Uncategorized"
+REBUILD_BATCH = 1000
+# Marker document in the `stats` collection, written by rebuild()
+SEEDED_ID = "sales_daily"
+
+
+def _day(ts: datetime) -> datetime:
+    return datetime(ts.year, ts.month, ts.day)
+
+
+def _lines(order: dict) -> Dict[ObjectId, dict]:
+    """Per-product revenue and units for one order (a product can appear on several lines)."""
+    lines: Dict[ObjectId, dict] = {}
+    for item in order.get("orderItems", []):
+        product = ObjectId(item["product"])
+        line = lines.setdefault(product, {"name": item.get("name", ""), "revenue": 0.0, "units": 0})
+        line["revenue"] += item.get("price", 0) * item.get("qty", 0)
+        line["units"] += item.get("qty", 0)
+    return lines
+
+
+async def _categories(product_ids) -> Dict[ObjectId, str]:
+    products = await get_database().products.find(
+        {"_id": {"$in": list(product_ids)}}, {"category": 1}
+    ).to_list(length=None)
+    return {p["_id"]: p.get("category") or UNCATEGORIZED for p in products}
+
+
+async def _apply(order: dict, sign: int) -> None:
+    lines = _lines(order)
+    if not lines:
+        return
+    day = _day(order.get("paidAt") or order.get("createdAt") or datetime.utcnow())
+    # Category is captured at sale time so later re-categorisation doesn't rewrite history
+    categories = await _categories(lines)
+    await get_database().sales_daily.bulk_write([
+        UpdateOne(
+            {"day": day, "product": product},
+            {
+                "$inc": {"revenue": sign * line["revenue"], "units": sign * line["units"], "orders": sign},
+                "$setOnInsert": {"name": line["name"], "category": categories.get(product, UNCATEGORIZED)},
+            },
+            upsert=True,
+        )
+        for product, line in lines.items()
+    ], ordered=False)
+
+
+async def record_order_paid(order: dict) -> None:
+    # Callers must only report the unpaid -> paid transition once per order
+    await _apply(order, 1)
+
+
+async def record_order_created(order: dict) -> None:
+    if order.get("isPaid"):
+        await _apply(order, 1)
+
+
+async def record_order_deleted(order: dict) -> None:
+    if order.get("isPaid"):
+        await _apply(order, -1)
+
+
+async def rebuild() -> int:
+    """Recomputes every bucket from the paid orders; returns the number of buckets written."""
+    database = get_database()
+    buckets: Dict[Tuple[datetime, ObjectId], dict] = {}
+    cursor = database.orders.find({"isPaid": True}, {"paidAt": 1, "createdAt": 1, "orderItems": 1})
+    async for order in cursor:
+        day = _day(order.get("paidAt") or order.get("createdAt") or datetime.utcnow())
+        for product, line in _lines(order).items():
+            bucket = buckets.setdefault((day, product), {"name": line["name"], "revenue": 0.0, "units": 0, "orders": 0})
+            bucket["revenue"] += line["revenue"]
+            bucket["units"] += line["units"]
+            bucket["orders"] += 1
+
+    categories = await _categories({product for _, product in buckets})
+    docs = [
+        {"day": day, "product": product, "category": categories.get(product, UNCATEGORIZED), **bucket}
+        for (day, product), bucket in buckets.items()
+    ]
+    await database.sales_daily.delete_many({})
+    for start in range(0, len(docs), REBUILD_BATCH):
+        await database.sales_daily.insert_many(docs[start:start + REBUILD_BATCH], ordered=False)
+    await database.stats.replace_one(
+        {"_id": SEEDED_ID}, {"rebuiltAt": datetime.utcnow(), "buckets": len(docs)}, upsert=True
+    )
+    return len(docs)
+
+
+async def ensure_buckets() -> None:
+    """Seeds the buckets from the paid orders if they were never built on this database."""
+    if await get_database().stats.find_one({"_id": SEEDED_ID}) is None:
+        # First start (or first report) on a database that predates the buckets
+        await rebuild()
+
+
+def _range_match(start: date, end: date) -> dict:
+    # `end` is inclusive: the whole of that day is reported
+    return {"day": {"$gte": datetime(start.year, start.month, start.day),
+                    "$lt": datetime(end.year, end.month, end.day) + timedelta(days=1)}}
+
+
+def _period(day: date, interval: str) -> date:
+    if interval == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if interval == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _periods(start: date, end: date, interval: str) -> List[date]:
+    periods, current = [], _period(start, interval)
+    while current <= end:
+        periods.append(current)
+        if interval == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if interval == "week" else 1)
+    return periods
+
+
+async def sales_series(start: date, end: date, interval: str = "day") -> dict:
+    """Revenue and units per day, week or month; periods without sales are reported as zero."""
+    await ensure_buckets()
+    daily = await get_database().sales_daily.aggregate([
+        {"$match": _range_match(start, end)},
+        {"$group": {"_id": "$day", "revenue": {"$sum": "$revenue"}, "units": {"$sum": "$units"}}},
+    ]).to_list(length=None)
+
+    totals = defaultdict(lambda: {"revenue": 0.0, "units": 0})
+    for row in daily:
+        point = totals[_period(row["_id"].date(), interval)]
+        point["revenue"] += row["revenue"]
+        point["units"] += row["units"]
+
+    points = [
+        {"period": period, "revenue": round(totals[period]["revenue"], 2), "units": totals[period]["units"]}
+        for period in _periods(start, end, interval)
+    ]
+    return {
+        "start": start,
+        "end": end,
+        "interval": interval,
+        "revenue": round(sum(p["revenue"] for p in points), 2),
+        "units": sum(p["units"] for p in points),
+        "points": points,
+    }
+
+
+async def top_products(start: date, end: date, limit: int = 10) -> List[dict]:
+    await ensure_buckets()
+    rows = await get_database().sales_daily.aggregate([
+        {"$match": _range_match(start, end)},
+        {"$sort": {"day": -1}},  # so $first picks the most recent name/category
+        {"$group": {
+            "_id": "$product",
+            "name": {"$first": "$name"},
+            "category": {"$first": "$category"},
+            "revenue": {"$sum": "$revenue"},
+            "units": {"$sum": "$units"},
+            "orders": {"$sum": "$orders"},
+        }},
+        {"$sort": {"revenue": -1, "_id": 1}},
+        {"$limit": limit},
+    ]).to_list(length=limit)
+    return [
+        {"product": row["_id"], "name": row["name"], "category": row["category"],
+         "revenue": round(row["revenue"], 2), "units": row["units"], "orders": row["orders"]}
+        for row in rows
+    ]
+
+
+async def top_categories(start: date, end: date, limit: int = 10) -> List[dict]:
+    await ensure_buckets()
+    rows = await get_database().sales_daily.aggregate([
+        {"$match": _range_match(start, end)},
+        {"$group": {"_id": "$category", "revenue": {"$sum": "$revenue"}, "units": {"$sum": "$units"}}},
+        {"$sort": {"revenue": -1, "_id": 1}},
+        {"$limit": limit},
+    ]).to_list(length=limit)
+    return [{"category": row["_id"], "revenue": round(row["revenue"], 2), "units": row["units"]} for row in rows]
+
+
+async def _main(args) -> None:
+    if args.rebuild:
+        print(f"Rebuilt {await rebuild()} daily sales buckets")
+    end = date.today()
+    series = await sales_series(end - timedelta(days=args.days - 1), end, args.interval)
+    print(f"Last {args.days} days: revenue {series['revenue']}, units {series['units']}")
+    for point in series["points"]:
+        print(f"  {point['period']}  {point['revenue']:>12.2f}  {point['units']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or inspect the daily sales buckets.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute every bucket from the paid orders")
+    parser.add_argument("--days", type=int, default=30, help="Report window ending today")
+    parser.add_argument("--interval", choices=INTERVALS, default="week")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.database import get_database
+
+
+class TTLCache:
+    """
+    Small in-process LRU cache with per-entry expiry.
+    Not thread-safe: meant to be used from the event loop only.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Every waiter may have gone away; retrieve a failed load's exception so asyncio doesn't log it
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlightCache(TTLCache):
+    """
+    TTLCache whose misses are coalesced: concurrent lookups of the same missing key
+    share one loader call instead of each hitting the database.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        super().__init__(max_size, ttl_seconds)
+        self._inflight: "dict[Hashable, asyncio.Task]" = {}
+        self._generation = 0
+        self.coalesced = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            # The load runs as its own task: a caller that goes away (client disconnect, timeout)
+            # stops waiting for it, but never cancels it for the requests coalesced onto it
+            inflight = asyncio.ensure_future(self._load(key, loader, self._generation))
+            inflight.add_done_callback(_retrieve_exception)
+            self._inflight[key] = inflight
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(inflight)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        try:
+            value = await loader()
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+        # A write that invalidated the cache mid-load makes this result stale: serve it, don't keep it
+        if generation == self._generation and value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        self._generation += 1
+        self._inflight.pop(key, None)
+        super().invalidate(key)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._inflight.clear()
+        super().clear()
+
+    def stats(self) -> dict:
+        return {**super().stats(), "coalesced": self.coalesced, "inflight": len(self._inflight)}
+
+
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+async def get_user_by_id(user_id: str) -> Optional[dict]:
+    """
+    Returns the user document for an authenticated request, hitting Mongo only on a cache miss.
+    A shallow copy is returned so callers can't mutate the cached entry.
+    """
+    user = user_cache.get(user_id)
+    if user is None:
+        db = get_database()
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        if user is None:
+            return None
+        user_cache.set(user_id, user)
+    return dict(user)
+
+
+def invalidate_user(user_id: Any) -> None:
+    # Must be called after every write to a user document
+    user_cache.invalidate(str(user_id))
+
+
+catalog_cache = SingleFlightCache(
+    max_size=settings.CATALOG_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CATALOG_CACHE_TTL_SECONDS,
+)
+
+# Filtered product totals are approximate by design: cached briefly instead of counted per page
+product_count_cache = TTLCache(max_size=256, ttl_seconds=30)
+
+
+def invalidate_catalog() -> None:
+    # Product writes can change any listing page, so the whole catalog cache is dropped
+    catalog_cache.clear()
+    product_count_cache.clear()
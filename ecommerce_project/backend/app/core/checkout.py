@@ -0,0 +1,246 @@
+"""
+Checkout engine: turns a client cart into an order with server-side prices and reserved stock.
+
+    1. one `$in` query loads every referenced product (price, name, image, stock)
+    2. prices, tax, shipping and total are recomputed from the catalog, never taken from the client
+    3. one unordered `bulk_write` decrements stock with a `countInStock >= qty` guard per line,
+       tagging each decremented product with {order id, qty} (the reservation marker)
+    4. if any line did not match, only the tagged products are restored, so a failed checkout
+       leaves stock exactly as it found it; otherwise the order is inserted (see order_intake)
+       and the tags cleared
+
+Steps 3-4 run shielded from the request: a client that disconnects mid-checkout gets either its
+order written or its stock back, never a stranded reservation. A product carries at most
+CHECKOUT_MAX_PENDING_RESERVATIONS markers; checkouts beyond that are turned away with 503.
+
+A reservation whose order was never inserted (process killed between 3 and 4) is left tagged
+with the id of an order that doesn't exist and the quantity it took, which is what makes it
+findable and repairable:
+
+    python -m app.core.checkout --older-than-minutes 10
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.cache import invalidate_catalog
+from app.core.config import settings
+from app.core.database import db, get_database
+from app.core.order_intake import insert_order
+from app.core.workers import PoolSaturated
+from app.models.order import Order
+from app.models.product import primary_image
+
+PRODUCT_FIELDS = {"name": 1, "price": 1, "images": 1, "countInStock": 1}
+
+
+class CheckoutError(Exception):
+    """Raised for carts that can't become an order; surfaced to clients as 400."""
+
+
+class OutOfStock(CheckoutError):
+    """Raised when a line asks for more than is in stock; surfaced to clients as 409."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Not enough stock for {name}")
+        self.name = name
+
+
+def price_order(items_price: float) -> Dict[str, float]:
+    shipping = 0.0 if items_price > settings.FREE_SHIPPING_THRESHOLD else settings.SHIPPING_FEE
+    tax = round(items_price * settings.TAX_RATE, 2)
+    return {
+        "itemsPrice": round(items_price, 2),
+        "shippingPrice": shipping,
+        "taxPrice": tax,
+        "totalPrice": round(items_price + shipping + tax, 2),
+    }
+
+
+def _quantities(order: Order) -> Dict[ObjectId, int]:
+    # The same product on several cart lines is one reservation
+    quantities: Dict[ObjectId, int] = {}
+    for item in order.orderItems:
+        if not ObjectId.is_valid(item.product):
+            raise CheckoutError(f"Invalid product id: {item.product}")
+        if item.qty < 1:
+            raise CheckoutError("Quantity must be at least 1")
+        product = ObjectId(item.product)
+        quantities[product] = quantities.get(product, 0) + item.qty
+    return quantities
+
+
+async def _release(order_id: ObjectId, quantities: Dict[ObjectId, int]) -> None:
+    # Only products still carrying this order's marker were decremented, so this is exact and idempotent
+    result = await get_database().products.bulk_write([
+        UpdateOne(
+            {"_id": product, "reservations.order": order_id},
+            {"$inc": {"countInStock": qty}, "$pull": {"reservations": {"order": order_id}}},
+        )
+        for product, qty in quantities.items()
+    ], ordered=False)
+    if result.modified_count:
+        # A listing cached while the stock was held would otherwise keep showing it as taken
+        invalidate_catalog()
+
+
+async def _rejection(quantities: Dict[ObjectId, int], by_id: Dict[ObjectId, dict]) -> Exception:
+    # Tells the shopper why a line didn't reserve; stock may have moved since, so this is best effort
+    current = await get_database().products.find(
+        {"_id": {"$in": list(quantities)}}, {"countInStock": 1, "reservations": 1}
+    ).to_list(length=len(quantities))
+    for doc in current:
+        if doc.get("countInStock", 0) < quantities[doc["_id"]]:
+            return OutOfStock(by_id[doc["_id"]].get("name", str(doc["_id"])))
+    if any(len(doc.get("reservations", [])) >= settings.CHECKOUT_MAX_PENDING_RESERVATIONS for doc in current):
+        return PoolSaturated("checkout")
+    return OutOfStock("an item")
+
+
+async def _commit(order_data: dict, quantities: Dict[ObjectId, int], by_id: Dict[ObjectId, dict]) -> None:
+    order_id = order_data["_id"]
+    products = get_database().products
+    # Filtering on the last allowed slot keeps `reservations` bounded without dropping anyone's marker
+    last_slot = f"reservations.{settings.CHECKOUT_MAX_PENDING_RESERVATIONS - 1}"
+    inserting = committed = False
+    try:
+        result = await products.bulk_write([
+            UpdateOne(
+                {"_id": product, "countInStock": {"$gte": qty}, last_slot: {"$exists": False}},
+                {"$inc": {"countInStock": -qty}, "$push": {"reservations": {"order": order_id, "qty": qty}}},
+            )
+            for product, qty in quantities.items()
+        ], ordered=False)
+        if result.modified_count == len(quantities):
+            inserting = True
+            # Direct insert_one, or part of a group-commit batch when ORDER_GROUP_COMMIT is on
+            await insert_order(order_data)
+            committed = True
+    finally:
+        if inserting and not committed:
+            # An insert that raised (or was cancelled) may still have been written; its stock stays sold
+            committed = bool(await get_database().orders.count_documents({"_id": order_id}, limit=1))
+        if committed:
+            await products.update_many(
+                {"_id": {"$in": list(quantities)}}, {"$pull": {"reservations": {"order": order_id}}}
+            )
+            invalidate_catalog()
+        else:
+            # Also on errors and cancellation: some lines may have been applied before it
+            await _release(order_id, quantities)
+    if result.modified_count != len(quantities):
+        raise await _rejection(quantities, by_id)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # A checkout whose client went away still finishes; its outcome is nobody's to raise
+    if not task.cancelled():
+        task.exception()
+
+
+async def place_order(order: Order, user_id: str) -> dict:
+    """Validates, prices and reserves stock for `order`, then inserts it; returns the stored document."""
+    if not order.orderItems:
+        raise CheckoutError("No order items")
+    database = get_database()
+    quantities = _quantities(order)
+
+    products = await database.products.find(
+        {"_id": {"$in": list(quantities)}}, PRODUCT_FIELDS
+    ).to_list(length=len(quantities))
+    by_id = {product["_id"]: product for product in products}
+    missing = [str(product) for product in quantities if product not in by_id]
+    if missing:
+        raise CheckoutError(f"Product not found: {', '.join(missing)}")
+    for product, qty in quantities.items():
+        # Cheap early exit; the conditional update in _commit is what actually guarantees no oversell
+        if by_id[product].get("countInStock", 0) < qty:
+            raise OutOfStock(by_id[product].get("name", str(product)))
+
+    order_items: List[dict] = []
+    for product, qty in quantities.items():
+        doc = by_id[product]
+        order_items.append({
+            "name": doc.get("name", ""),
+            "qty": qty,
+            "image": primary_image(doc.get("images", [])),
+            "price": float(doc.get("price", 0)),
+            "product": product,
+        })
+    prices = price_order(sum(item["price"] * item["qty"] for item in order_items))
+
+    order_data = {
+        "_id": ObjectId(),
+        "user": ObjectId(user_id),
+        "orderItems": order_items,
+        "shippingAddress": order.shippingAddress.model_dump() if order.shippingAddress else None,
+        "paymentMethod": order.paymentMethod,
+        "paymentResult": None,
+        "taxPrice": prices["taxPrice"],
+        "shippingPrice": prices["shippingPrice"],
+        "totalPrice": prices["totalPrice"],
+        # Payment and delivery state only ever change through their own endpoints
+        "isPaid": False,
+        "paidAt": None,
+        "isDelivered": False,
+        "deliveredAt": None,
+        "isUserDeleted": False,
+        "createdAt": datetime.utcnow(),
+    }
+    # Cancelling the request must not cut the reserve -> insert -> clear sequence short
+    commit = asyncio.ensure_future(_commit(order_data, quantities, by_id))
+    commit.add_done_callback(_retrieve_exception)
+    await asyncio.shield(commit)
+    return order_data
+
+
+async def release_stale_reservations(older_than: timedelta) -> Dict[str, int]:
+    """
+    Repairs markers left by checkouts that died between reserving and clearing: stock comes back
+    for orders that were never written, markers of written orders are just dropped.
+    """
+    database = get_database()
+    # Markers carry the order id, and an ObjectId starts with its creation time
+    cutoff = ObjectId.from_datetime(datetime.utcnow() - older_than)
+    counts = {"released": 0, "cleared": 0}
+    async for product in database.products.find(
+        {"reservations.order": {"$lt": cutoff}}, {"reservations": 1}
+    ):
+        for marker in product["reservations"]:
+            if marker["order"] >= cutoff:
+                continue
+            written = await database.orders.count_documents({"_id": marker["order"]}, limit=1)
+            update = {"$pull": {"reservations": {"order": marker["order"]}}}
+            if not written:
+                update["$inc"] = {"countInStock": marker["qty"]}
+            result = await database.products.update_one(
+                {"_id": product["_id"], "reservations.order": marker["order"]}, update
+            )
+            counts["cleared" if written else "released"] += result.modified_count
+    if counts["released"]:
+        invalidate_catalog()
+    return counts
+
+
+async def _repair(older_than: timedelta) -> Dict[str, int]:
+    try:
+        return await release_stale_reservations(older_than)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Release stock held by checkouts that never finished.")
+    parser.add_argument("--older-than-minutes", type=float, default=10,
+                        help="Only markers at least this old; live checkouts take well under a second")
+    args = parser.parse_args()
+    counts = asyncio.run(_repair(timedelta(minutes=args.older_than_minutes)))
+    print(f"Released {counts['released']} abandoned reservations, cleared {counts['cleared']} markers of written orders")
+
+
+if __name__ == "__main__":
+    main()
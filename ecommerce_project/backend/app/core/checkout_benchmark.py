@@ -0,0 +1,120 @@
+"""
+Checkout throughput and latency under contention: many simultaneous checkouts on one hot SKU.
+
+    python -m app.core.checkout_benchmark --checkouts 500 --stock 100
+
+Every cart holds the hot SKU plus a plentiful one, so a checkout that loses the race on the hot
+SKU must also give back the plentiful one. Each run goes through `place_order`, the function
+POST /api/orders calls, in a scratch database that is dropped afterwards, once with
+ORDER_GROUP_COMMIT off and once with it on. Reports checkouts/s and latency p50/p95, and exits 1
+if stock was oversold or a failed checkout leaked a reservation. Checkouts beyond
+CHECKOUT_MAX_PENDING_RESERVATIONS are turned away with 503 as in production and counted as shed.
+Needs a real MongoDB server at MONGO_URL.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from bson import ObjectId
+
+from app.core.checkout import OutOfStock, place_order
+from app.core.config import settings
+from app.core.database import db, get_database
+from app.core.order_intake import order_intake
+from app.core.workers import PoolSaturated
+from app.models.order import Order
+
+
+async def _checkout(order: Order, user_id: str, latencies: list):
+    started = time.perf_counter()
+    try:
+        return await place_order(order, user_id)
+    finally:
+        latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def _run_mode(group_commit: bool, args) -> bool:
+    settings.ORDER_GROUP_COMMIT = group_commit
+    database = get_database()
+    await database.products.delete_many({})
+    await database.orders.delete_many({})
+    hot = (await database.products.insert_one({"name": "Hot SKU", "price": 499.0, "countInStock": args.stock})).inserted_id
+    cold_stock = args.checkouts * args.qty
+    cold = (await database.products.insert_one({"name": "Cold SKU", "price": 49.0, "countInStock": cold_stock})).inserted_id
+    cart = Order(
+        orderItems=[
+            {"name": "Hot SKU", "qty": args.qty, "image": "", "price": 0, "product": str(hot)},
+            {"name": "Cold SKU", "qty": args.qty, "image": "", "price": 0, "product": str(cold)},
+        ],
+        shippingAddress={"address": "1 Load St", "city": "Test", "postalCode": "000000", "country": "India"},
+        paymentMethod="COD",
+    )
+
+    latencies = []
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(_checkout(cart, str(ObjectId()), latencies) for _ in range(args.checkouts)),
+        return_exceptions=True,
+    )
+    await order_intake.close()
+    elapsed = time.perf_counter() - started
+
+    placed = sum(1 for r in results if isinstance(r, dict))
+    rejected = sum(1 for r in results if isinstance(r, OutOfStock))
+    shed = sum(1 for r in results if isinstance(r, PoolSaturated))
+    errors = [r for r in results if isinstance(r, Exception) and not isinstance(r, (OutOfStock, PoolSaturated))]
+    hot_doc = await database.products.find_one({"_id": hot})
+    cold_doc = await database.products.find_one({"_id": cold})
+    orders = await database.orders.count_documents({})
+
+    checks = {
+        "no oversell": hot_doc["countInStock"] >= 0 and placed * args.qty <= args.stock,
+        "hot stock matches orders": hot_doc["countInStock"] == args.stock - placed * args.qty,
+        "failed carts rolled back": cold_doc["countInStock"] == cold_stock - placed * args.qty,
+        "no leftover reservations": not hot_doc.get("reservations") and not cold_doc.get("reservations"),
+        "one order per success": orders == placed,
+    }
+
+    latencies.sort()
+    print(f"group commit {'on' if group_commit else 'off'}: placed {placed}, out of stock {rejected}, "
+          f"shed {shed}, errors {len(errors)}")
+    if errors:
+        print(f"  first error: {errors[0]!r}")
+    print(f"  elapsed {elapsed * 1000:.0f} ms, throughput {args.checkouts / elapsed:.0f} checkouts/s")
+    print(f"  latency p50 {statistics.median(latencies):.1f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms, max {latencies[-1]:.1f} ms")
+    for name, ok in checks.items():
+        print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    return all(checks.values()) and not errors
+
+
+async def _main(args) -> bool:
+    try:
+        await get_database().command("ping")
+        print(f"{args.checkouts} concurrent checkouts, hot SKU stock {args.stock}, qty {args.qty}, "
+              f"reservation cap {settings.CHECKOUT_MAX_PENDING_RESERVATIONS}")
+        results = [await _run_mode(mode, args) for mode in (False, True)]
+        return all(results)
+    finally:
+        await db.get_client().drop_database(args.database)
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkout throughput on one hot SKU; fails on oversell or leaks.")
+    parser.add_argument("--checkouts", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=100, help="Initial stock of the hot SKU")
+    parser.add_argument("--qty", type=int, default=1, help="Units of each SKU per cart")
+    parser.add_argument("--database", default="checkout_benchmark", help="Scratch database (dropped afterwards)")
+    args = parser.parse_args()
+    if args.database == settings.DATABASE_NAME:
+        raise SystemExit("Refusing to run against the application database; pick a scratch --database")
+    # Everything under test goes through get_database(), so point it at the scratch database
+    settings.DATABASE_NAME = args.database
+    if not asyncio.run(_main(args)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
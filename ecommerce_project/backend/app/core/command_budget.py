@@ -0,0 +1,139 @@
+"""
+Counts the Mongo commands each write route issues and fails when one exceeds its budget.
+
+    python -m app.core.command_budget
+
+Drives the real app (TestClient) against MONGO_URL in a scratch database that is dropped
+afterwards. Commands are counted by the CommandMonitor registered on the app's client; users are
+warmed into the auth cache first so only the route's own work is measured. The budgets include
+the dashboard rollup and analytics writes that some routes make after their main write.
+tests/test_command_budget.py runs the same measurement under pytest.
+"""
+import argparse
+from datetime import datetime
+from typing import List
+
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from pymongo import MongoClient
+
+from app.core.config import settings
+from app.core.database import db
+from app.core.security import create_access_token
+from app.main import app
+
+PRODUCT = {
+    "name": "Budget Phone", "brand": "Acme", "category": "Electronics", "description": "Round trips only",
+    "price": 499.0, "countInStock": 10, "images": [],
+}
+SHIPPING = {"address": "1 Main St", "city": "Pune", "postalCode": "411001", "country": "India"}
+
+# Most commands each route may issue, keyed by the labels _steps yields
+BUDGETS = {
+    "POST /api/products": 2,               # insert + rollup
+    "PUT /api/products/{id}": 1,           # findAndModify
+    "POST /api/orders": 5,                 # find products + reserve + insert + clear markers + rollup
+    "PUT /api/orders/{id}/pay": 4,         # findAndModify + rollup + analytics (categories, buckets)
+    "PUT /api/orders/{id}/deliver": 1,     # findAndModify
+    "DELETE /api/orders/{id}": 4,          # findAndModify + rollup + analytics (categories, buckets)
+    "DELETE /api/products/{id}": 2,        # findAndModify + rollup
+    "PUT /api/users/profile": 1,           # findAndModify
+    "POST /api/auth/register": 3,          # duplicate check + insert + rollup
+}
+
+
+def _steps(client, admin: dict, customer: dict):
+    """Yields (label, headers, send) for each measured request; `send` returns the response."""
+    ids = {}
+
+    def create_product():
+        response = client.post("/api/products/", headers=admin, json=PRODUCT)
+        ids["product"] = response.json()["_id"]
+        return response
+
+    def place_order():
+        response = client.post("/api/orders/", headers=customer, json={
+            "orderItems": [{"name": "", "qty": 1, "image": "", "price": 0, "product": ids["product"]}],
+            "shippingAddress": SHIPPING, "paymentMethod": "COD",
+        })
+        ids["order"] = response.json()["_id"]
+        return response
+
+    yield "POST /api/products", admin, create_product
+    yield "PUT /api/products/{id}", admin, lambda: client.put(f"/api/products/{ids['product']}", headers=admin, json={**PRODUCT, "price": 449.0})
+    yield "POST /api/orders", customer, place_order
+    yield "PUT /api/orders/{id}/pay", customer, lambda: client.put(f"/api/orders/{ids['order']}/pay", headers=customer)
+    yield "PUT /api/orders/{id}/deliver", admin, lambda: client.put(f"/api/orders/{ids['order']}/deliver", headers=admin)
+    yield "DELETE /api/orders/{id}", admin, lambda: client.delete(f"/api/orders/{ids['order']}", headers=admin)
+    yield "DELETE /api/products/{id}", admin, lambda: client.delete(f"/api/products/{ids['product']}", headers=admin)
+    yield "PUT /api/users/profile", customer, lambda: client.put("/api/users/profile", headers=customer, json={"name": "Renamed", "email": "budget-customer@example.com", "password": ""})
+    yield "POST /api/auth/register", None, lambda: client.post("/api/auth/register", json={
+        "name": "New", "email": f"budget-{ObjectId()}@example.com", "password": "correct horse battery",
+    })
+
+
+def measure(database) -> List[dict]:
+    """
+    Seeds an admin and a customer into `database` (a pymongo handle on the app's database), then
+    drives every write route once; returns one row per route with the commands it issued.
+    """
+    now = datetime.utcnow()
+    admin_id = database.users.insert_one({"name": "Admin", "email": "budget-admin@example.com", "password": "", "isAdmin": True, "createdAt": now}).inserted_id
+    customer_id = database.users.insert_one({"name": "Customer", "email": "budget-customer@example.com", "password": "", "isAdmin": False, "createdAt": now}).inserted_id
+    admin = {"Authorization": f"Bearer {create_access_token(str(admin_id))}"}
+    customer = {"Authorization": f"Bearer {create_access_token(str(customer_id))}"}
+
+    rows = []
+    with TestClient(app) as client:
+        for label, headers, send in _steps(client, admin, customer):
+            if headers:
+                client.get("/api/users/profile", headers=headers)  # load the user into the auth cache
+            before = db.commands.stats()
+            response = send()
+            after = db.commands.stats()
+            rows.append({
+                "label": label,
+                "status": response.status_code,
+                "commands": after["total"] - before["total"],
+                "budget": BUDGETS[label],
+                "by_name": {
+                    name: count - before["by_name"].get(name, 0)
+                    for name, count in after["by_name"].items() if count != before["by_name"].get(name, 0)
+                },
+            })
+    return rows
+
+
+def within_budget(row: dict) -> bool:
+    return row["status"] < 400 and row["commands"] <= row["budget"]
+
+
+def run() -> bool:
+    seed = MongoClient(settings.MONGO_URL)
+    try:
+        rows = measure(seed[settings.DATABASE_NAME])
+    finally:
+        seed.drop_database(settings.DATABASE_NAME)
+        seed.close()
+
+    print(f"{'route':<30} {'commands':>8} {'budget':>7}  by command")
+    for row in rows:
+        detail = ", ".join(f"{name} {count}" for name, count in sorted(row["by_name"].items()))
+        status = "" if row["status"] < 400 else f"  HTTP {row['status']}"
+        print(f"{'  ' if within_budget(row) else '! '}{row['label']:<28} {row['commands']:>8} {row['budget']:>7}  {detail}{status}")
+    return all(within_budget(row) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a write route issues more Mongo commands than its budget.")
+    parser.add_argument("--database", default="command_budget", help="Scratch database (dropped afterwards)")
+    args = parser.parse_args()
+    if args.database == settings.DATABASE_NAME:
+        raise SystemExit("Refusing to run against the application database; pick a scratch --database")
+    settings.DATABASE_NAME = args.database
+    if not run():
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
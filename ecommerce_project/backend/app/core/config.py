@@ -9,6 +9,16 @@ class Settings:
     
     MONGO_URL: str = os.getenv("MONGO_URL")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME")
+    # Mongo client pool; one client per process, reused across warm Lambda invocations
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "10"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "60000"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+    # Ping during startup (Lambda init) so the first request doesn't pay server discovery + TLS
+    MONGO_PREWARM: bool = os.getenv("MONGO_PREWARM", "true").lower() == "true"
     
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = "HS256"
@@ -23,6 +33,80 @@ class Settings:
     AWS_SECRET_ACCESS_KEY: str = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_S3_REGION: str = os.getenv("AWS_REGION", "ap-south-1")
     AWS_STORAGE_BUCKET_NAME: str = os.getenv("AWS_BUCKET_NAME")
+    # Optional: point at a local S3 stand-in (MinIO, moto server) for development and tests
+    AWS_S3_ENDPOINT_URL: str = os.getenv("AWS_S3_ENDPOINT_URL") or None
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+    S3_MULTIPART_THRESHOLD_MB: int = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "8"))
+    S3_MULTIPART_CHUNKSIZE_MB: int = int(os.getenv("S3_MULTIPART_CHUNKSIZE_MB", "8"))
+    S3_TRANSFER_CONCURRENCY: int = int(os.getenv("S3_TRANSFER_CONCURRENCY", "4"))  # threads per multipart upload
+    S3_MAX_UPLOADS_PER_REQUEST: int = int(os.getenv("S3_MAX_UPLOADS_PER_REQUEST", "4"))
+    S3_MAX_UPLOADS_PER_PROCESS: int = int(os.getenv("S3_MAX_UPLOADS_PER_PROCESS", "16"))
+
+    # Remote image import (/api/upload/url)
+    URL_UPLOAD_MAX_BYTES: int = int(os.getenv("URL_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+    URL_UPLOAD_CONNECT_TIMEOUT: float = float(os.getenv("URL_UPLOAD_CONNECT_TIMEOUT", "5"))
+    URL_UPLOAD_READ_TIMEOUT: float = float(os.getenv("URL_UPLOAD_READ_TIMEOUT", "10"))
+    URL_UPLOAD_TOTAL_TIMEOUT: float = float(os.getenv("URL_UPLOAD_TOTAL_TIMEOUT", "30"))
+
+    # Presigned direct-to-S3 uploads (/api/upload/presign + /api/upload/complete)
+    DIRECT_UPLOAD_PREFIX: str = os.getenv("DIRECT_UPLOAD_PREFIX", "direct/")
+    DIRECT_UPLOAD_MAX_BYTES: int = int(os.getenv("DIRECT_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+    DIRECT_UPLOAD_EXPIRES_SECONDS: int = int(os.getenv("DIRECT_UPLOAD_EXPIRES_SECONDS", "300"))
+    # Unclaimed direct uploads and abandoned staged bodies are deleted after this many days
+    UPLOAD_STAGING_EXPIRE_DAYS: int = int(os.getenv("UPLOAD_STAGING_EXPIRE_DAYS", "1"))
+
+    # Upload-time image derivatives (resized WebP variants of every uploaded image)
+    IMAGE_VARIANT_WIDTHS: list = [int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "200,600,1200").split(",") if w.strip()]
+    # Width product grid cards render at; thumbnails use the narrowest stored variant at least this wide
+    IMAGE_GRID_WIDTH: int = int(os.getenv("IMAGE_GRID_WIDTH", "600"))
+    IMAGE_WEBP_QUALITY: int = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+    IMAGE_MAX_PIXELS: int = int(os.getenv("IMAGE_MAX_PIXELS", str(40_000_000)))
+    IMAGE_POOL: str = os.getenv("IMAGE_POOL", "process")
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", str(os.cpu_count() or 1)))
+    IMAGE_MAX_QUEUE: int = int(os.getenv("IMAGE_MAX_QUEUE", "32"))
     GOOGLE_CLIENT_ID: str = os.getenv("GOOGLE_CLIENT_ID")
+    # Google ID tokens are verified locally against a cached copy of Google's signing keys
+    GOOGLE_JWKS_URL: str = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs")
+    GOOGLE_JWKS_TIMEOUT: float = float(os.getenv("GOOGLE_JWKS_TIMEOUT", "5"))
+    GOOGLE_JWKS_DEFAULT_TTL: int = int(os.getenv("GOOGLE_JWKS_DEFAULT_TTL", "3600"))  # when no max-age is sent
+    GOOGLE_JWKS_REFRESH_MARGIN: int = int(os.getenv("GOOGLE_JWKS_REFRESH_MARGIN", "300"))
+    GOOGLE_JWKS_MIN_REFRESH_INTERVAL: int = int(os.getenv("GOOGLE_JWKS_MIN_REFRESH_INTERVAL", "60"))
+
+    # Authenticated-user cache (JWTMiddleware / get_current_user)
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+
+    # Public catalog read cache (GET /api/products, GET /api/products/{id})
+    CATALOG_CACHE_TTL_SECONDS: int = int(os.getenv("CATALOG_CACHE_TTL_SECONDS", "30"))
+    CATALOG_CACHE_MAX_SIZE: int = int(os.getenv("CATALOG_CACHE_MAX_SIZE", "512"))
+    # Relevance-ranked search pages through at most this many best matches (bounds the sort per page)
+    SEARCH_MAX_RESULTS: int = int(os.getenv("SEARCH_MAX_RESULTS", "1000"))
+    # Searches fetch and sort at most this many $text matches, whatever the sort (bounds the sort per search)
+    SEARCH_MAX_CANDIDATES: int = int(os.getenv("SEARCH_MAX_CANDIDATES", "10000"))
+
+    # Password hashing worker pool ("process" or "thread"); requests beyond workers + queue get 503
+    PASSWORD_HASH_POOL: str = os.getenv("PASSWORD_HASH_POOL", "process")
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+    # Argon2 cost parameters (unset = passlib defaults); pick them with `python -m app.core.hash_calibration`
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST")) if os.getenv("ARGON2_TIME_COST") else None
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST")) if os.getenv("ARGON2_MEMORY_COST") else None  # KiB
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM")) if os.getenv("ARGON2_PARALLELISM") else None
+
+    # Checkout pricing (server-side; must match what the cart page shows)
+    TAX_RATE: float = float(os.getenv("TAX_RATE", "0.18"))
+    FREE_SHIPPING_THRESHOLD: float = float(os.getenv("FREE_SHIPPING_THRESHOLD", "999"))
+    SHIPPING_FEE: float = float(os.getenv("SHIPPING_FEE", "99"))
+    # In-flight checkouts one product may carry at once; beyond this checkout answers 503
+    CHECKOUT_MAX_PENDING_RESERVATIONS: int = int(os.getenv("CHECKOUT_MAX_PENDING_RESERVATIONS", "256"))
+
+    # Group-commit order intake: batch order inserts into one insert_many. Off by default: every order
+    # waits up to one interval, and any gain is unmeasured until `app.core.order_intake_benchmark`
+    # has been run against the real cluster
+    ORDER_GROUP_COMMIT: bool = os.getenv("ORDER_GROUP_COMMIT", "false").lower() == "true"
+    ORDER_GROUP_COMMIT_MAX_BATCH: int = int(os.getenv("ORDER_GROUP_COMMIT_MAX_BATCH", "64"))
+    ORDER_GROUP_COMMIT_INTERVAL_MS: float = float(os.getenv("ORDER_GROUP_COMMIT_INTERVAL_MS", "5"))
+    ORDER_GROUP_COMMIT_MAX_QUEUE: int = int(os.getenv("ORDER_GROUP_COMMIT_MAX_QUEUE", "1024"))  # beyond this: 503
 
 settings = Settings()
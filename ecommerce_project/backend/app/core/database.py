@@ -1,20 +1,206 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
-from os import getenv
+from pymongo import monitoring
 
 from app.core.config import settings
 
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Counts connection pool events for /api/admin/metrics.
+    Callbacks run on driver threads, so counters are updated under a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self._waits_ms: "deque[float]" = deque(maxlen=512)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.created += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.closed += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            # Time spent waiting for a free connection (or dialing a new one), reported in seconds
+            if event.duration is not None:
+                self._waits_ms.append(event.duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            return {
+                "open_connections": self.created - self.closed,
+                "in_use": self.checked_out,
+                "created": self.created,
+                "closed": self.closed,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+                "checkout_wait_ms_avg": round(sum(waits) / len(waits), 2) if waits else 0.0,
+                "checkout_wait_ms_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 2) if waits else 0.0,
+                "checkout_wait_ms_max": round(waits[-1], 2) if waits else 0.0,
+            }
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Counts database commands by name (find, insert, findAndModify, ...).
+    Sampling `total` before and after a request gives its round trips; `python -m app.core.command_budget`
+    does exactly that to catch routes that regress into write-then-read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_name = {}
+        self.total = 0
+        self.failures = 0
+
+    def started(self, event):
+        with self._lock:
+            self.total += 1
+            self.by_name[event.command_name] = self.by_name.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        with self._lock:
+            self.failures += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"total": self.total, "failed": self.failures, "by_name": dict(self.by_name)}
+
+
 class Database:
-    client: AsyncIOMotorClient = None
+    """
+    Process-wide Mongo client, created on first use.
+    Under Lambda the process (and its event loop) outlives a single invocation, so the client and
+    its pooled connections are reused by every warm request. Motor clients are bound to the loop
+    they were first used on; if a different loop shows up (asyncio.run per call), a fresh client is built.
+    """
+
+    def __init__(self):
+        self.client = None
+        self._owned = None  # the client built here (a client assigned from outside is left alone)
+        self._loop = None
+        self.monitor = PoolMonitor()
+        self.commands = CommandMonitor()
+
+    def _create_client(self) -> AsyncIOMotorClient:
+        return AsyncIOMotorClient(
+            settings.MONGO_URL,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+            socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            event_listeners=[self.monitor, self.commands],
+        )
+
+    def get_client(self) -> AsyncIOMotorClient:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if self.client is None or (self.client is self._owned and loop is not None and self._loop is not loop):
+            if self.client is not None:
+                self.client.close()
+            self.client = self._owned = self._create_client()
+            self._loop = loop
+        elif self._loop is None:
+            self._loop = loop
+        return self.client
+
+    async def prewarm(self) -> Optional[float]:
+        """Pings the server so discovery and the first connection happen now; returns the latency in ms."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await self.get_client().admin.command("ping")
+        except Exception as e:
+            # Not fatal: requests will retry server selection on their own
+            logging.warning(f"MongoDB pre-warm failed: {e}")
+            return None
+        return round((loop.time() - started) * 1000, 2)
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+        self.client = self._owned = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "max_pool_size": settings.MONGO_MAX_POOL_SIZE,
+            "min_pool_size": settings.MONGO_MIN_POOL_SIZE,
+            **self.monitor.stats(),
+            "commands": self.commands.stats(),
+        }
+
 
 db = Database()
 
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.MONGO_URL)
-    print("Connected to MongoDB")
+    # Idempotent: reuses the existing client when the process is already warm
+    db.get_client()
+    if not settings.MONGO_PREWARM:
+        print("Connected to MongoDB")
+        return
+    latency_ms = await db.prewarm()
+    if latency_ms is not None:
+        print(f"Connected to MongoDB (ping {latency_ms} ms)")
 
 async def close_mongo_connection():
-    db.client.close()
+    db.close()
     print("Closed MongoDB connection")
 
 def get_database():
-    return db.client[settings.DATABASE_NAME]
+    return db.get_client()[settings.DATABASE_NAME]
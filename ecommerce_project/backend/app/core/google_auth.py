@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import re
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenVerifier:
+    """
+    Verifies Google ID tokens locally against an in-memory copy of Google's JWKS.
+    The key set is cached for as long as Google's Cache-Control allows and refreshed in
+    the background shortly before it expires, so a steady-state login makes no outbound call.
+    Refreshes are single-flight: concurrent logins share one fetch.
+    """
+
+    def __init__(self, jwks_url: str, client_id: str):
+        self.jwks_url = jwks_url
+        self.client_id = client_id
+        self._keys: dict = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self.fetches = 0
+
+    def _max_age(self, response) -> float:
+        match = _MAX_AGE.search(response.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else settings.GOOGLE_JWKS_DEFAULT_TTL
+        age = response.headers.get("age", "0")
+        return max(0, max_age - (int(age) if age.isdigit() else 0))
+
+    async def _fetch(self) -> None:
+        import httpx
+        async with httpx.AsyncClient(timeout=settings.GOOGLE_JWKS_TIMEOUT) as client:
+            response = await client.get(self.jwks_url)
+            response.raise_for_status()
+        keys = {key["kid"]: key for key in response.json().get("keys", []) if "kid" in key}
+        self._keys = keys
+        self._last_fetch = time.monotonic()
+        self._expires_at = self._last_fetch + self._max_age(response)
+        self.fetches += 1
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._fetch())
+            self._refresh.add_done_callback(self._log_refresh_failure)
+        return self._refresh
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Google JWKS refresh failed: {task.exception()}")
+
+    async def _get_key(self, kid: str) -> dict:
+        now = time.monotonic()
+        expired = now >= self._expires_at
+        # Unknown kid usually means Google rotated keys; allow a forced refresh at most once a minute
+        unknown = kid not in self._keys and now - self._last_fetch > settings.GOOGLE_JWKS_MIN_REFRESH_INTERVAL
+
+        if expired or unknown or not self._keys:
+            try:
+                await asyncio.shield(self._start_refresh())
+            except Exception:
+                # Keep serving the previous keys if Google is briefly unreachable
+                if not self._keys:
+                    raise
+        elif self._expires_at - now < settings.GOOGLE_JWKS_REFRESH_MARGIN:
+            # Still valid but close to expiry: refresh without making this login wait
+            self._start_refresh()
+
+        key = self._keys.get(kid)
+        if key is None:
+            raise ValueError("Unknown Google signing key")
+        return key
+
+    async def verify(self, token: str) -> dict:
+        """
+        Returns the token's claims, raising ValueError for any invalid token
+        (same contract as google.oauth2.id_token.verify_oauth2_token).
+        """
+        from jose import jwt, JWTError
+        try:
+            header = jwt.get_unverified_header(token)
+            key = await self._get_key(header.get("kid", ""))
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                audience=self.client_id,
+                options={"verify_at_hash": False},
+            )
+        except JWTError as e:
+            raise ValueError(f"Invalid Google token: {e}")
+
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError("Wrong issuer")
+        return claims
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "fetches": self.fetches,
+            "expires_in_seconds": max(0, round(self._expires_at - time.monotonic())),
+        }
+
+
+google_verifier = GoogleTokenVerifier(settings.GOOGLE_JWKS_URL, settings.GOOGLE_CLIENT_ID)
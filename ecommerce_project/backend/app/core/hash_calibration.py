@@ -0,0 +1,83 @@
+"""
+Benchmarks argon2 cost parameters on this host and suggests the strongest setting whose
+verify latency stays under a target.
+
+    python -m app.core.hash_calibration --target-ms 250 --max-memory-mib 128
+
+Run it on the same instance type (or Lambda memory size) that serves logins; the printed
+ARGON2_* values go into the environment. Existing hashes are upgraded on the next login.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from argon2 import PasswordHasher
+
+SAMPLE_PASSWORD = "calibration-Password-123!"
+
+
+def measure_verify_ms(time_cost: int, memory_cost: int, parallelism: int, rounds: int) -> float:
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hashed = hasher.hash(SAMPLE_PASSWORD)
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.verify(hashed, SAMPLE_PASSWORD)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(target_ms: float, max_memory_mib: int, parallelism: int, max_time_cost: int, rounds: int) -> list:
+    """
+    Walks memory costs upward (19 MiB, the OWASP minimum, doubling to the cap) and for each
+    raises time_cost until verification exceeds the target. Returns every measured candidate.
+    """
+    candidates = []
+    memory_kib = 19 * 1024
+    while memory_kib <= max_memory_mib * 1024:
+        for time_cost in range(1, max_time_cost + 1):
+            verify_ms = measure_verify_ms(time_cost, memory_kib, parallelism, rounds)
+            candidates.append({
+                "time_cost": time_cost,
+                "memory_cost": memory_kib,
+                "parallelism": parallelism,
+                "verify_ms": verify_ms,
+                "within_target": verify_ms <= target_ms,
+            })
+            print(f"  m={memory_kib // 1024:>4} MiB  t={time_cost:<2} p={parallelism}  verify={verify_ms:8.1f} ms")
+            if verify_ms > target_ms:
+                break
+        memory_kib *= 2
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate argon2 cost parameters for a target verify latency.")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Maximum acceptable verify latency per login")
+    parser.add_argument("--max-memory-mib", type=int, default=128, help="Upper bound for argon2 memory_cost")
+    parser.add_argument("--parallelism", type=int, default=1, help="argon2 lanes (keep 1 on single-vCPU Lambdas)")
+    parser.add_argument("--max-time-cost", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5, help="Verifications per candidate (median is used)")
+    args = parser.parse_args()
+
+    print(f"Calibrating argon2 on {os.cpu_count()} CPU(s), target verify <= {args.target_ms} ms")
+    candidates = calibrate(args.target_ms, args.max_memory_mib, args.parallelism, args.max_time_cost, args.rounds)
+
+    passing = [c for c in candidates if c["within_target"]]
+    if not passing:
+        print("No setting meets the target on this host; raise --target-ms or add CPU.")
+        raise SystemExit(1)
+
+    # Prefer memory hardness, then iterations
+    best = max(passing, key=lambda c: (c["memory_cost"], c["time_cost"]))
+    per_core = 1000 / best["verify_ms"]
+    print()
+    print(f"Selected: verify {best['verify_ms']:.1f} ms -> ~{per_core:.1f} logins/s per core")
+    print(f"ARGON2_TIME_COST={best['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={best['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={best['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Profiles the cold import of the Lambda handler module and checks the heavy packages stay deferred.
+
+    python -m app.core.import_profile --runs 5
+
+Each run imports app.main in a fresh interpreter under `-X importtime`, so the numbers match
+what a new Lambda container pays before it can serve its first request. Timings vary by host and
+are only reported; the gate is structural: exits non-zero when any of DEFERRED_PACKAGES is
+imported at module load (tests/test_import_profile.py asserts the same).
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TARGET = "app.main"
+
+# Only imported where first used (S3 upload, URL import / JWKS fetch, JWT, password hashing, images)
+DEFERRED_PACKAGES = ("boto3", "botocore", "s3transfer", "httpx", "jose", "passlib", "argon2", "bcrypt", "PIL")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_once(module: str) -> list:
+    """Returns (self_us, cumulative_us, depth, name) for every module imported by `module`."""
+    env = dict(os.environ, PYTHONPATH=BACKEND_ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+
+def eager_imports(rows: list) -> list:
+    """DEFERRED_PACKAGES that were imported anyway, by whichever module pulled them in."""
+    return sorted({name.split(".")[0] for _, _, _, name in rows} & set(DEFERRED_PACKAGES))
+
+
+def summarize(rows: list) -> dict:
+    total_ms = next((cum for _, cum, _, name in rows if name == TARGET), 0) / 1000
+    # Routers are imported directly by app.main, so their cumulative time is what each one adds
+    routers = {name: cum / 1000 for _, cum, _, name in rows if name.startswith("app.api.")}
+    packages = defaultdict(float)
+    for self_us, _, _, name in rows:
+        top = name.split(".")[0]
+        if top != "app":
+            packages[top] += self_us / 1000
+    return {"total_ms": total_ms, "routers": routers, "packages": dict(packages)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold import time of the Lambda handler.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample (median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Third-party packages to list")
+    args = parser.parse_args()
+
+    profiles = [profile_once(TARGET) for _ in range(max(1, args.runs))]
+    runs = [summarize(rows) for rows in profiles]
+    median_ms = statistics.median(run["total_ms"] for run in runs)
+    last = runs[-1]
+    eager = eager_imports(profiles[-1])
+
+    print(f"import {TARGET}: median {median_ms:.1f} ms over {len(runs)} run(s)")
+    print()
+    print("Routers (cumulative, includes their first-time dependencies):")
+    for name, ms in sorted(last["routers"].items(), key=lambda item: -item[1]):
+        print(f"  {ms:8.1f} ms  {name}")
+    print()
+    print(f"Top {args.top} third-party packages (self time):")
+    for name, ms in sorted(last["packages"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if eager:
+        print()
+        print(f"Imported at cold start but meant to be deferred: {', '.join(eager)}")
+        print(f"Find the top-level import with: python -X importtime -c 'import {TARGET}' 2>&1 | grep -E '{'|'.join(eager)}'")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Index registry: every index the app relies on, declared in one place and applied idempotently.
+
+Applied at startup (and Lambda init); creating an index that already exists with the same
+definition is a no-op on the server. Run by hand to apply or check a deployment:
+
+    python -m app.core.indexes            # apply and list what each collection has; exit 1 if any failed
+    python -m app.core.indexes --verify   # ...then check every registered index exists as declared and
+                                          # explain() every hot query; exit 1 on a missing index or a COLLSCAN
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.core.database import get_database
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        # Login, registration and Google sign-in all look users up by email
+        IndexModel([("email", ASCENDING)], unique=True),
+        # Only users in the middle of a password reset carry these fields, so both stay tiny
+        IndexModel([("reset_token", ASCENDING)], partialFilterExpression={"reset_token": {"$exists": True}}),
+        IndexModel([("reset_token_expiry", ASCENDING)], partialFilterExpression={"reset_token_expiry": {"$exists": True}}),
+    ],
+    "orders": [
+        # Order history is keyset-paginated newest first on (createdAt, _id): each listing gets an
+        # index whose equality prefix matches its filter, so a page is one range scan
+        # "My orders": a user's orders (status filters are applied to that user's few entries)
+        IndexModel([("user", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        # Admin order list, unfiltered or by date range
+        IndexModel([("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        # Admin order list by payment / delivery status
+        IndexModel([("isPaid", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("isDelivered", ASCENDING), ("createdAt", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "products": [
+        # Keyset pagination: every product sort order is (sort key, _id)
+        IndexModel([("price", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("rating", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("numReviews", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("category", ASCENDING), ("_id", DESCENDING)]),
+        # Admin dashboard low-stock list
+        IndexModel([("countInStock", ASCENDING), ("_id", ASCENDING)]),
+        # Full-text product search, ranked by textScore
+        IndexModel(
+            [("name", TEXT), ("brand", TEXT), ("category", TEXT), ("description", TEXT)],
+            weights={"name": 10, "brand": 5, "category": 3, "description": 1},
+            name="product_text_search",
+        ),
+    ],
+    "sales_daily": [
+        # Sales analytics: one bucket per (day, product); reports range-scan on day
+        IndexModel([("day", ASCENDING), ("product", ASCENDING)], unique=True),
+    ],
+}
+
+
+def _hot_queries() -> list:
+    """(label, collection, filter, sort) for every query a request path runs; none may scan a collection."""
+    now = datetime.utcnow()
+    some_id = ObjectId()
+    return [
+        ("login / register by email", "users", {"email": "someone@example.com"}, None),
+        ("reset password by token", "users", {"reset_token": "token", "reset_token_expiry": {"$gt": now}}, None),
+        ("prune expired reset tokens", "users", {"reset_token_expiry": {"$lte": now}}, None),
+        ("user by id (auth cache miss)", "users", {"_id": some_id}, None),
+        ("my orders", "orders", {"user": some_id, "isUserDeleted": {"$ne": True}}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ("my orders, next page", "orders", {"$and": [{"user": some_id, "isUserDeleted": {"$ne": True}}, {"$or": [{"createdAt": {"$lt": now}}, {"createdAt": now, "_id": {"$lt": some_id}}]}]}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ("admin orders", "orders", {}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ("admin orders, next page", "orders", {"$or": [{"createdAt": {"$lt": now}}, {"createdAt": now, "_id": {"$lt": some_id}}]}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ("admin orders by date", "orders", {"createdAt": {"$gte": now, "$lt": now}}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ("admin unpaid orders", "orders", {"isPaid": False}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ("admin delivered orders", "orders", {"isDelivered": True}, [("createdAt", DESCENDING), ("_id", DESCENDING)]),
+        ("order by id", "orders", {"_id": some_id}, None),
+        ("dashboard recent orders", "orders", {}, [("_id", DESCENDING)]),
+        ("product by id", "products", {"_id": some_id}, None),
+        ("checkout product batch", "products", {"_id": {"$in": [some_id, ObjectId()]}}, None),
+        ("products by price", "products", {"price": {"$gt": 10}}, [("price", ASCENDING), ("_id", ASCENDING)]),
+        ("products by rating", "products", {}, [("rating", DESCENDING), ("_id", DESCENDING)]),
+        ("products by popularity", "products", {}, [("numReviews", DESCENDING), ("_id", DESCENDING)]),
+        ("products in category", "products", {"category": "Electronics"}, [("_id", DESCENDING)]),
+        ("product search", "products", {"$text": {"$search": "phone"}}, None),
+        ("dashboard low stock", "products", {"countInStock": {"$lt": 10}}, [("countInStock", ASCENDING), ("_id", ASCENDING)]),
+        ("sales report range", "sales_daily", {"day": {"$gte": now, "$lt": now}}, None),
+    ]
+
+
+async def ensure_indexes() -> List[str]:
+    """
+    Creates every registered index; returns the ones that could not be applied ("collection.name").
+    A failure is logged as an error but never stops startup: the app still serves without it.
+    """
+    database = get_database()
+    failed = []
+    for collection, models in INDEXES.items():
+        try:
+            await database[collection].create_indexes(models)
+        except OperationFailure:
+            # One bad index fails the whole batch; retry one by one to apply the rest and name the culprit
+            for model in models:
+                try:
+                    await database[collection].create_indexes([model])
+                except OperationFailure as e:
+                    # e.g. duplicate emails blocking the unique index, or an index redefined under the same name
+                    logging.error(f"Index {collection}.{model.document['name']} not applied: {e}")
+                    failed.append(f"{collection}.{model.document['name']}")
+    return failed
+
+
+async def missing_indexes() -> List[str]:
+    """Registered indexes the server doesn't have as declared (absent, or without unique / partial filter)."""
+    database = get_database()
+    missing = []
+    for collection, models in INDEXES.items():
+        existing = {index["name"]: index async for index in database[collection].list_indexes()}
+        for model in models:
+            wanted = model.document
+            have = existing.get(wanted["name"])
+            if (
+                have is None
+                or bool(have.get("unique")) != bool(wanted.get("unique"))
+                or have.get("partialFilterExpression") != wanted.get("partialFilterExpression")
+            ):
+                missing.append(f"{collection}.{wanted['name']}")
+    return missing
+
+
+async def prune_expired_reset_tokens() -> int:
+    """Clears expired password-reset tokens (TTL-style; a TTL index would delete the whole user)."""
+    result = await get_database().users.update_many(
+        {"reset_token_expiry": {"$lte": datetime.utcnow()}},
+        {"$unset": {"reset_token": "", "reset_token_expiry": ""}},
+    )
+    return result.modified_count
+
+
+def _stages(plan) -> List[str]:
+    # Every stage name anywhere in an explain plan (classic and slot-based engine layouts)
+    if isinstance(plan, dict):
+        found = [plan["stage"]] if isinstance(plan.get("stage"), str) else []
+        for value in plan.values():
+            found.extend(_stages(value))
+        return found
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in _stages(item)]
+    return []
+
+
+async def verify() -> bool:
+    """
+    True when every registered index exists as declared and no hot query's winning plan contains a
+    COLLSCAN (explain() alone would pass an empty collection that merely lacks a unique index).
+    """
+    database = get_database()
+    missing = await missing_indexes()
+    for name in missing:
+        print(f"FAIL index {name} is missing or differs from the registry")
+    ok = not missing
+    for label, collection, query, sort in _hot_queries():
+        cursor = database[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = (await cursor.explain())["queryPlanner"]["winningPlan"]
+        stages = _stages(plan)
+        scans = "COLLSCAN" in stages
+        ok = ok and not scans
+        print(f"{'FAIL' if scans else 'ok  '} {label:<30} {collection:<12} {' > '.join(dict.fromkeys(stages))}")
+    return ok
+
+
+async def _main(args) -> bool:
+    failed = await ensure_indexes()
+    database = get_database()
+    for collection in INDEXES:
+        names = [index["name"] async for index in database[collection].list_indexes()]
+        print(f"{collection}: {', '.join(names)}")
+    for name in failed:
+        print(f"FAIL index {name} could not be applied (see the error above)")
+    if args.prune:
+        print(f"Cleared {await prune_expired_reset_tokens()} expired reset tokens")
+    verified = await verify() if args.verify else True
+    return verified and not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the index registry and check hot queries use it.")
+    parser.add_argument("--verify", action="store_true", help="Check registered indexes exist and explain() every hot query; fail on a gap or a COLLSCAN")
+    parser.add_argument("--prune", action="store_true", help="Also clear expired password-reset tokens")
+    if not asyncio.run(_main(parser.parse_args())):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
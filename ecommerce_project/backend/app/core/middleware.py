@@ -1,88 +1,126 @@
-from fastapi import Request, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
-from jose import jwt, JWTError
+from starlette.types import ASGIApp, Receive, Scope, Send
 from app.core.config import settings
-from app.core.database import get_database
-from bson import ObjectId
-
-class JWTMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        # List of paths that do not require authentication
-        excluded_paths = [
-            "/api/auth/login",
-            "/api/auth/google/login",
-            "/api/auth/google/callback",
-            "/api/auth/google-login",
-            "/api/auth/register",
-            "/api/auth/refresh",
-            "/api/auth/logout",
-            "/api/auth/forgot-password",
-            "/api/auth/reset-password",
-            "/api/auth/verify-email",
-            "/api/auth/resend-verification-email",
-            "/api/login",
-            "/api/google/login",
-            "/api/google/callback",
-            "/api/register",
-            "/api/forgot-password",
-            "/api/reset-password",
-            "/api/verify-email",
-            "/api/resend-verification-email",
-            "/docs",
-            "/redoc",
-            "/openapi.json",
-            "/static",
-            "/",
-            
-        ]
-
-        # Check if the request path is in the excluded paths or is a GET request to public routes
-        path = request.url.path
-        if path in excluded_paths or path.startswith("/static"):
-             return await call_next(request)
-        
-        # Public product routes (GET requests)
-        if request.method == "GET" and path.startswith("/api/products"):
-            return await call_next(request)
+from app.core.cache import get_user_by_id
+
+# Paths that do not require authentication (exact match)
+PUBLIC_PATHS = frozenset([
+    "/api/auth/login",
+    "/api/auth/google/login",
+    "/api/auth/google/callback",
+    "/api/auth/google-login",
+    "/api/auth/register",
+    "/api/auth/refresh",
+    "/api/auth/logout",
+    "/api/auth/forgot-password",
+    "/api/auth/reset-password",
+    "/api/auth/verify-email",
+    "/api/auth/resend-verification-email",
+    "/api/login",
+    "/api/google/login",
+    "/api/google/callback",
+    "/api/register",
+    "/api/forgot-password",
+    "/api/reset-password",
+    "/api/verify-email",
+    "/api/resend-verification-email",
+    "/docs",
+    "/redoc",
+    "/openapi.json",
+    "/static",
+    "/",
+])
+
+# Paths that do not require authentication (prefix match, any method)
+PUBLIC_PREFIXES = ("/static",)
+
+# Public product routes (GET requests only)
+PUBLIC_GET_PREFIXES = ("/api/products",)
+
+
+class JWTMiddleware:
+    """
+    Pure ASGI authentication layer.
+    Avoids BaseHTTPMiddleware's extra task and response streaming wrapper on every request.
+    The public route table is compiled once when the middleware stack is built.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        public_paths=PUBLIC_PATHS,
+        public_prefixes=PUBLIC_PREFIXES,
+        public_get_prefixes=PUBLIC_GET_PREFIXES,
+    ):
+        self.app = app
+        self.public_paths = frozenset(public_paths)
+        self.public_prefixes = tuple(public_prefixes)
+        self.public_get_prefixes = tuple(public_get_prefixes)
+
+    def is_public(self, method: str, path: str) -> bool:
+        if path in self.public_paths or path.startswith(self.public_prefixes):
+            return True
+        return method == "GET" and path.startswith(self.public_get_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Only plain HTTP requests are authenticated here (lifespan/websocket pass through)
+        if scope["type"] != "http" or self.is_public(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
         # Extract the Authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+
         if not auth_header or not auth_header.startswith("Bearer "):
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "Missing or invalid Authorization header"}
             )
+            await response(scope, receive, send)
+            return
 
         token = auth_header.split(" ")[1]
 
+        # Imported here so public routes (and cold starts) never load jose
+        from jose import jwt, JWTError
         try:
             # Decode the token
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-            
+
             # Prevent Token Type Confusion: Refresh tokens should not be used for access
             if payload.get("refresh"):
-                return JSONResponse(status_code=401, content={"detail": "Refresh tokens cannot be used as access tokens"})
-                
+                response = JSONResponse(status_code=401, content={"detail": "Refresh tokens cannot be used as access tokens"})
+                await response(scope, receive, send)
+                return
+
             user_id = payload.get("sub")
             if user_id is None:
-                return JSONResponse(status_code=401, content={"detail": "Invalid token payload"})
-            
-            # Optionally fetch the user and attach to request state
-            db = get_database()
-            user = await db.users.find_one({"_id": ObjectId(user_id)})
+                response = JSONResponse(status_code=401, content={"detail": "Invalid token payload"})
+                await response(scope, receive, send)
+                return
+
+            # Fetch the user (served from the in-process cache on the hot path) and attach to request state
+            user = await get_user_by_id(user_id)
             if user is None:
-                 return JSONResponse(status_code=401, content={"detail": "User not found"})
-            
-            # Attach user ID to request state for use in dependencies or routes
-            request.state.user_id = user_id
-            request.state.user = user
+                response = JSONResponse(status_code=401, content={"detail": "User not found"})
+                await response(scope, receive, send)
+                return
 
         except (JWTError, Exception) as e:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": f"Could not validate credentials: {str(e)}"}
             )
+            await response(scope, receive, send)
+            return
+
+        # Attach user ID to request state for use in dependencies or routes (request.state reads scope["state"])
+        state = scope.setdefault("state", {})
+        state["user_id"] = user_id
+        state["user"] = user
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
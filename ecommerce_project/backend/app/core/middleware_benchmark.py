@@ -0,0 +1,112 @@
+"""
+Requests per second through the full app with JWTMiddleware as a pure ASGI middleware (current)
+and as the BaseHTTPMiddleware it replaced.
+
+    python -m app.core.middleware_benchmark --requests 3000 --concurrency 1
+
+Both variants run in-process over httpx's ASGITransport with the same routes, CORS middleware and
+auth logic; only the middleware plumbing differs. The authenticated user is preloaded into the user
+cache, so no request reaches Mongo and the numbers measure the request path itself.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+from bson import ObjectId
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+from app.core.cache import get_user_by_id, user_cache
+from app.core.config import settings
+from app.core.middleware import JWTMiddleware
+from app.core.security import create_access_token
+from app.main import app
+
+
+class BaseHTTPJWTMiddleware(BaseHTTPMiddleware):
+    """The previous implementation: the same checks, run through BaseHTTPMiddleware.dispatch."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.router = JWTMiddleware(app)  # reused only for its compiled public route table
+
+    async def dispatch(self, request, call_next):
+        if self.router.is_public(request.method, request.url.path):
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return JSONResponse(status_code=401, content={"detail": "Missing or invalid Authorization header"})
+
+        from jose import jwt
+        try:
+            payload = jwt.decode(auth_header.split(" ")[1], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            if payload.get("refresh"):
+                return JSONResponse(status_code=401, content={"detail": "Refresh tokens cannot be used as access tokens"})
+            user = await get_user_by_id(payload.get("sub"))
+            if user is None:
+                return JSONResponse(status_code=401, content={"detail": "User not found"})
+        except Exception as e:
+            return JSONResponse(status_code=401, content={"detail": f"Could not validate credentials: {str(e)}"})
+
+        request.state.user_id = payload.get("sub")
+        request.state.user = user
+        return await call_next(request)
+
+
+def _use_middleware(cls) -> None:
+    # Swap the auth layer in place and let Starlette rebuild the middleware stack on the next request
+    for middleware in app.user_middleware:
+        if middleware.cls in (JWTMiddleware, BaseHTTPJWTMiddleware):
+            middleware.cls = cls
+    app.middleware_stack = None
+
+
+async def _measure(path: str, headers: dict, args) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # warm-up (route compilation, jose import, ...)
+            (await client.get(path, headers=headers)).raise_for_status()
+        remaining = iter(range(args.requests))
+
+        async def worker():
+            for _ in remaining:
+                response = await client.get(path, headers=headers)
+                if response.status_code != 200:
+                    raise SystemExit(f"GET {path} returned HTTP {response.status_code}: {response.text}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return args.requests / (time.perf_counter() - started)
+
+
+async def _main(args) -> None:
+    user_id = ObjectId()
+    user_cache.set(str(user_id), {
+        "_id": user_id, "name": "Bench", "email": "bench@example.com", "password": "", "isAdmin": False,
+    })
+    authed = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+    cases = [("public GET /", "/", {}), ("authed GET /api/users/profile", "/api/users/profile", authed)]
+
+    print(f"{args.requests} requests per case, {args.concurrency} concurrent clients")
+    print(f"{'case':<32} {'BaseHTTP req/s':>15} {'ASGI req/s':>11} {'speedup':>8}")
+    for label, path, headers in cases:
+        rates = {}
+        for cls in (BaseHTTPJWTMiddleware, JWTMiddleware):
+            _use_middleware(cls)
+            rates[cls] = await _measure(path, headers, args)
+        before, after = rates[BaseHTTPJWTMiddleware], rates[JWTMiddleware]
+        print(f"{label:<32} {before:>15.0f} {after:>11.0f} {after / before:>7.2f}x")
+    _use_middleware(JWTMiddleware)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JWTMiddleware against its BaseHTTPMiddleware predecessor.")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from collections import deque
+from typing import List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError, WriteError
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.workers import PoolSaturated
+
+
+class OrderIntake:
+    """
+    Group commit for order inserts.
+    Callers enqueue a document and await their own future; one writer coroutine collects whatever
+    arrived within `interval_ms` (or `max_batch` orders, whichever comes first) and writes it with a
+    single unordered insert_many, then resolves each caller's future with its own outcome.
+    At most `max_queue` orders may wait; beyond that callers are rejected with PoolSaturated (503).
+    A caller cancelled before its batch is written withdraws its order; one cancelled while the batch
+    is being written waits for that write to settle before the cancellation propagates.
+    The queue and writer belong to the event loop they were started on and are rebuilt if it changes.
+    """
+
+    def __init__(self, max_batch: int, interval_ms: float, max_queue: int):
+        self.max_batch = max(1, max_batch)
+        self.interval = max(0.0, interval_ms) / 1000
+        self.max_queue = max(1, max_queue)
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._loop = None
+        self._flushing = False
+        self._writing: set = set()
+        self.batches = 0
+        self.written = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_batch_seen = 0
+        self._batch_sizes: "deque[int]" = deque(maxlen=512)
+
+    def _ensure_writer(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._writer is None or self._writer.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._writer = loop.create_task(self._run(self._queue))
+            self._loop = loop
+        return self._queue
+
+    async def submit(self, doc: dict) -> None:
+        """Inserts `doc` as part of the next batch; returns once it is written (or raises)."""
+        queue = self._ensure_writer()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            queue.put_nowait((doc, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise PoolSaturated("order intake")
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if future in self._writing:
+                # Too late to withdraw; once this returns the caller can look up whether the order landed
+                await asyncio.wait([future])
+            if future.done():
+                # Nobody awaits this future any more: consume a write error here rather than leave
+                # it to surface as "exception was never retrieved"
+                if not future.cancelled():
+                    future.exception()
+            else:
+                future.cancel()  # the writer skips withdrawn orders
+            raise
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            batch = [await queue.get()]
+            if queue.qsize() < self.max_batch - 1 and self.interval:
+                # Let concurrent checkouts catch up; a lone order pays at most one interval
+                await asyncio.sleep(self.interval)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            self._flushing = True
+            try:
+                await self._flush(batch)
+            except Exception as e:
+                # The writer must outlive any single batch
+                logging.exception(f"Order intake flush failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        self.failed += 1
+                        future.set_exception(e)
+            finally:
+                self._flushing = False
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]) -> None:
+        batch = [(doc, future) for doc, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+        self._batch_sizes.append(len(batch))
+        errors = {}
+        self._writing = {future for _, future in batch}
+        try:
+            await get_database().orders.insert_many([doc for doc, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            # Unordered: every document not listed here was written
+            errors = {error["index"]: error for error in e.details.get("writeErrors", [])}
+            if not errors:
+                raise
+        finally:
+            self._writing = set()
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            if index in errors:
+                self.failed += 1
+                future.set_exception(WriteError(errors[index].get("errmsg", "write failed"), errors[index].get("code")))
+            else:
+                self.written += 1
+                future.set_result(None)
+
+    async def close(self) -> None:
+        """Lets queued orders finish writing, then stops the writer."""
+        if self._writer is None or self._loop is not asyncio.get_running_loop():
+            self._writer = self._queue = self._loop = None
+            return
+        while not self._writer.done() and (not self._queue.empty() or self._flushing):
+            await asyncio.sleep(self.interval or 0.001)
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = self._queue = self._loop = None
+
+    def stats(self) -> dict:
+        sizes = list(self._batch_sizes)
+        return {
+            "enabled": settings.ORDER_GROUP_COMMIT,
+            "max_batch": self.max_batch,
+            "interval_ms": self.interval * 1000,
+            "max_queue": self.max_queue,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "written": self.written,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "batch_size_avg": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "batch_size_max": self.max_batch_seen,
+        }
+
+
+order_intake = OrderIntake(
+    max_batch=settings.ORDER_GROUP_COMMIT_MAX_BATCH,
+    interval_ms=settings.ORDER_GROUP_COMMIT_INTERVAL_MS,
+    max_queue=settings.ORDER_GROUP_COMMIT_MAX_QUEUE,
+)
+
+
+async def insert_order(doc: dict) -> None:
+    if settings.ORDER_GROUP_COMMIT:
+        await order_intake.submit(doc)
+    else:
+        await get_database().orders.insert_one(doc)
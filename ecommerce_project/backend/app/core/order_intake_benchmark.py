@@ -0,0 +1,113 @@
+"""
+Orders per second with and without group commit, at a given number of concurrent checkouts.
+
+    python -m app.core.order_intake_benchmark --orders 5000 --concurrency 200
+
+Each mode inserts the same number of realistic order documents into a scratch database
+(dropped afterwards) via `insert_order`, the call the checkout engine makes.
+Run it against a real MongoDB deployment (ideally the production tier): whether batching pays off
+depends on its round-trip time and write concern, which no mock reproduces.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.core import order_intake
+from app.core.config import settings
+from app.core.database import db, get_database
+
+
+def fake_order() -> dict:
+    return {
+        "_id": ObjectId(),
+        "user": ObjectId(),
+        "orderItems": [
+            {"name": "Item", "qty": 1, "image": "https://bucket/x.jpg", "price": 499.0, "product": ObjectId()}
+            for _ in range(3)
+        ],
+        "shippingAddress": {"address": "1 Main St", "city": "Pune", "postalCode": "411001", "country": "India"},
+        "paymentMethod": "UPI",
+        "paymentResult": None,
+        "taxPrice": 269.46,
+        "shippingPrice": 0.0,
+        "totalPrice": 1766.46,
+        "isPaid": False,
+        "paidAt": None,
+        "isDelivered": False,
+        "deliveredAt": None,
+        "isUserDeleted": False,
+        "createdAt": datetime.utcnow(),
+    }
+
+
+async def _run_mode(group_commit: bool, args) -> dict:
+    settings.ORDER_GROUP_COMMIT = group_commit
+    await get_database().orders.delete_many({})
+    latencies = []
+    remaining = iter(range(args.orders))
+
+    async def worker():
+        # Each worker is one client placing orders back to back
+        for _ in remaining:
+            started = time.perf_counter()
+            await order_intake.insert_order(fake_order())
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    intake = order_intake.order_intake
+    batches_before = intake.batches
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    written = await get_database().orders.count_documents({})
+    return {
+        "orders_per_s": args.orders / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "writes": intake.batches - batches_before if group_commit else args.orders,
+        "ok": written == args.orders,
+    }
+
+
+async def _main(args) -> bool:
+    try:
+        await get_database().command("ping")
+        results = {mode: await _run_mode(mode, args) for mode in (False, True)}
+    finally:
+        await order_intake.order_intake.close()
+        await db.get_client().drop_database(args.database)
+        db.close()
+
+    print(f"{args.orders} orders, {args.concurrency} concurrent clients, "
+          f"batch <= {args.max_batch}, interval {args.interval_ms} ms")
+    print(f"{'mode':<14} {'orders/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'writes':>7}  all written")
+    for mode, r in results.items():
+        name = "group commit" if mode else "insert_one"
+        print(f"{name:<14} {r['orders_per_s']:>9.0f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['writes']:>7}  {r['ok']}")
+    print(f"speedup {results[True]['orders_per_s'] / results[False]['orders_per_s']:.1f}x")
+    return all(r["ok"] for r in results.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark order inserts with and without group commit.")
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--max-batch", type=int, default=settings.ORDER_GROUP_COMMIT_MAX_BATCH)
+    parser.add_argument("--interval-ms", type=float, default=settings.ORDER_GROUP_COMMIT_INTERVAL_MS)
+    parser.add_argument("--database", default="order_intake_benchmark", help="Scratch database (dropped afterwards)")
+    args = parser.parse_args()
+    if args.database == settings.DATABASE_NAME:
+        raise SystemExit("Refusing to run against the application database; pick a scratch --database")
+    settings.DATABASE_NAME = args.database
+    order_intake.order_intake = order_intake.OrderIntake(args.max_batch, args.interval_ms, max(args.concurrency, 1))
+    if not asyncio.run(_main(args)):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Upload throughput with a boto3 client built per file (the previous code) vs the shared S3Uploader.
+
+    python -m app.core.s3_benchmark --batches 1,10,50 --size-kb 200
+    python -m app.core.s3_benchmark --endpoint http://localhost:9000   # MinIO instead of moto
+
+Both paths are driven the same way /api/upload drives them: one batch of files uploaded
+concurrently from the event loop, boto3 running in the threadpool. Only the client handling
+differs. Without --endpoint an in-process moto server is started (needs `moto[server]`), so
+every upload is a real HTTP request.
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import time
+import uuid
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.utils.s3_utilities import s3_uploader
+
+
+def upload_with_new_client(file_obj, filename, content_type):
+    # What upload_file_to_s3 did before the shared uploader: a fresh client (and connection) per file
+    import boto3
+    client = boto3.client(
+        "s3",
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_S3_REGION,
+        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+    )
+    key = s3_uploader.unique_key(filename)
+    client.upload_fileobj(file_obj, settings.AWS_STORAGE_BUCKET_NAME, key, ExtraArgs={"ContentType": content_type})
+    return s3_uploader.object_url(key)
+
+
+PATHS = {
+    "client per file": lambda body: run_in_threadpool(upload_with_new_client, io.BytesIO(body), "image.jpg", "image/jpeg"),
+    "shared uploader": lambda body: s3_uploader.upload_async(io.BytesIO(body), "image.jpg", "image/jpeg"),
+}
+
+
+async def _files_per_second(upload, batch: int, body: bytes, rounds: int) -> float:
+    await asyncio.gather(*(upload(body) for _ in range(batch)))  # warm-up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        urls = await asyncio.gather(*(upload(body) for _ in range(batch)))
+        if not all(urls):
+            raise SystemExit("An upload failed; check the endpoint and credentials")
+    return batch * rounds / (time.perf_counter() - started)
+
+
+async def _main(args) -> None:
+    body = os.urandom(args.size_kb * 1024)
+    print(f"{args.size_kb} KiB files against {settings.AWS_S3_ENDPOINT_URL}, "
+          f"process upload cap {settings.S3_MAX_UPLOADS_PER_PROCESS}")
+    print(f"{'batch':>5} " + " ".join(f"{name + ' files/s':>24}" for name in PATHS) + f" {'speedup':>8}")
+    for batch in args.batches:
+        rounds = max(1, args.files // batch)
+        rates = [await _files_per_second(upload, batch, body, rounds) for upload in PATHS.values()]
+        print(f"{batch:>5} " + " ".join(f"{rate:>24.1f}" for rate in rates) + f" {rates[1] / rates[0]:>7.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-file boto3 clients with the shared S3 uploader.")
+    parser.add_argument("--batches", type=lambda v: [int(b) for b in v.split(",")], default=[1, 10, 50])
+    parser.add_argument("--files", type=int, default=200, help="Files uploaded per batch size and path")
+    parser.add_argument("--size-kb", type=int, default=200)
+    parser.add_argument("--endpoint", help="S3-compatible endpoint (MinIO); default: start a local moto server")
+    parser.add_argument("--bucket", default=f"s3-benchmark-{uuid.uuid4().hex[:8]}")
+    args = parser.parse_args()
+
+    server = None
+    if args.endpoint is None:
+        from moto.server import ThreadedMotoServer
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)  # one access-log line per request otherwise
+        server = ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+        server.start()
+        host, port = server.get_host_and_port()
+        args.endpoint = f"http://{host}:{port}"
+        settings.AWS_ACCESS_KEY_ID = settings.AWS_SECRET_ACCESS_KEY = "testing"
+    settings.AWS_S3_ENDPOINT_URL = args.endpoint
+    settings.AWS_STORAGE_BUCKET_NAME = args.bucket
+    s3_uploader._client = None  # rebuild against the benchmark endpoint
+
+    client = s3_uploader.client
+    client.create_bucket(
+        Bucket=args.bucket, CreateBucketConfiguration={"LocationConstraint": settings.AWS_S3_REGION},
+    )
+    try:
+        asyncio.run(_main(args))
+    finally:
+        for page in client.get_paginator("list_objects_v2").paginate(Bucket=args.bucket):
+            for item in page.get("Contents", []):
+                client.delete_object(Bucket=args.bucket, Key=item["Key"])
+        client.delete_bucket(Bucket=args.bucket)
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+p95 latency of product listing pages as the catalog grows, first page vs a deep page.
+
+    python -m app.core.search_benchmark --sizes 1000,10000,100000,1000000 --rounds 50
+
+For each catalog size a scratch database (dropped afterwards) is filled with synthetic products
+and indexed from the registry. Pages are fetched through `find_products_page`, the function
+GET /api/products runs on a cache miss, for a ranked search and for a plain sorted listing.
+Needs a real MongoDB server at MONGO_URL ($text and the planner are what is being measured).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from bson import ObjectId
+
+from app.api.products import find_products_page
+from app.core.config import settings
+from app.core.database import db, get_database
+from app.core.indexes import ensure_indexes
+
+WORDS = ["phone", "case", "charger", "laptop", "cable", "lamp", "chair", "mug", "novel", "guitar",
+         "camera", "watch", "bottle", "speaker", "keyboard", "jacket", "shoe", "tent", "drill", "puzzle"]
+BRANDS = ["Acme", "Globex", "Initech", "Umbrella", "Hooli"]
+CATEGORIES = ["Electronics", "Books", "Home", "Toys", "Sports"]
+
+# (label, search, sort); "phone" is in about a tenth of names, so matches grow with the catalog
+CASES = [
+    ("search 'phone' by relevance", "phone", None),
+    ("search 'phone' by price", "phone", "price_low"),
+    ("all products by price", "", "price_low"),
+    ("all products newest", "", "newest"),
+]
+
+
+def fake_product(rng: random.Random) -> dict:
+    name = " ".join(rng.sample(WORDS, 3))
+    return {
+        "_id": ObjectId(),
+        "user": ObjectId(),
+        "name": name.title(),
+        "brand": rng.choice(BRANDS),
+        "category": rng.choice(CATEGORIES),
+        "description": f"A {name} that does what a {rng.choice(WORDS)} should.",
+        "images": [],
+        "reviews": [],
+        "rating": round(rng.uniform(1, 5), 1),
+        "numReviews": rng.randint(0, 500),
+        "price": round(rng.uniform(5, 2000), 2),
+        "countInStock": rng.randint(0, 50),
+    }
+
+
+async def _seed(size: int) -> None:
+    rng = random.Random(size)
+    products = get_database().products
+    await products.delete_many({})
+    for start in range(0, size, 10_000):
+        await products.insert_many([fake_product(rng) for _ in range(min(10_000, size - start))], ordered=False)
+    await ensure_indexes()
+
+
+async def _p95(search: str, sort, depth: int, args) -> float:
+    # Walk to the requested page once, then time fetching that page repeatedly
+    cursor = None
+    for _ in range(depth - 1):
+        cursor = (await find_products_page(search, "", None, None, sort, args.limit, cursor, False))["nextCursor"]
+        if cursor is None:
+            return float("nan")
+    timings = []
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        await find_products_page(search, "", None, None, sort, args.limit, cursor, False)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return timings[max(0, int(len(timings) * 0.95) - 1)]
+
+
+async def _main(args) -> None:
+    try:
+        await get_database().command("ping")
+        print(f"page size {args.limit}, deep page = page {args.depth}, "
+              f"{args.rounds} rounds, relevance cap {settings.SEARCH_MAX_RESULTS}, "
+              f"candidate cap {settings.SEARCH_MAX_CANDIDATES}")
+        print(f"{'products':>9}  {'case':<28} {'p95 page 1':>11} {'p95 deep':>9}  (ms)")
+        for size in args.sizes:
+            await _seed(size)
+            for label, search, sort in CASES:
+                first = await _p95(search, sort, 1, args)
+                deep = await _p95(search, sort, args.depth, args)
+                print(f"{size:>9}  {label:<28} {first:>11.1f} {deep:>9.1f}")
+    finally:
+        await db.get_client().drop_database(args.database)
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark product listing and search pages against catalog size.")
+    parser.add_argument("--sizes", type=lambda v: [int(s) for s in v.split(",")], default=[1000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=24)
+    parser.add_argument("--depth", type=int, default=20, help="Page number measured as the deep page")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--database", default="search_benchmark", help="Scratch database (dropped afterwards)")
+    args = parser.parse_args()
+    if args.database == settings.DATABASE_NAME:
+        raise SystemExit("Refusing to run against the application database; pick a scratch --database")
+    settings.DATABASE_NAME = args.database
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
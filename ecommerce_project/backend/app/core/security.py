@@ -1,16 +1,51 @@
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
-from jose import jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Optional, Tuple, Union, Any
 from app.core.config import settings
+from app.core.workers import WorkerPool
 
-pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
+def _argon2_settings() -> dict:
+    configured = {
+        "argon2__time_cost": settings.ARGON2_TIME_COST,
+        "argon2__memory_cost": settings.ARGON2_MEMORY_COST,
+        "argon2__parallelism": settings.ARGON2_PARALLELISM,
+    }
+    return {key: value for key, value in configured.items() if value is not None}
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    # Built on first use (and once per hashing worker process): passlib + argon2/bcrypt stay off the cold-start path.
+    # bcrypt is only kept to verify legacy hashes; needs_update() flags them (and argon2 hashes
+    # made with other cost parameters) so they are rehashed on the next successful login
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto", **_argon2_settings())
+
+# Argon2/bcrypt are deliberately CPU-heavy: never run them on the event loop
+hash_pool = WorkerPool(
+    "password-hashing",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    kind=settings.PASSWORD_HASH_POOL,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    # Returns (valid, new_hash); new_hash is set only when the stored hash is outdated
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await hash_pool.run(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await hash_pool.run(get_password_hash, password)
 
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
@@ -19,6 +54,7 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -26,5 +62,6 @@ def create_refresh_token(subject: Union[str, Any]) -> str:
     # 7 days expiry (settings.REFRESH_TOKEN_EXPIRE_MINUTES is 60 * 24 * 7)
     expire = datetime.utcnow() + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
     to_encode = {"exp": expire, "sub": str(subject), "refresh": True}
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
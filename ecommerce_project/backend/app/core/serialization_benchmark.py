@@ -0,0 +1,145 @@
+"""
+Compares how a list endpoint renders Mongo documents with what it would cost under response_model:
+
+  * response_model: FastAPI validates every document into the model, then dumps it
+  * route path:     what the route returns now - DocumentShape + orjson for orders and users,
+                    a pydantic TypeAdapter (validate + dump_json) for products
+
+DocumentShape skips validation, so it is only kept where this shows a clear, repeatable win.
+
+    python -m app.core.serialization_benchmark --items 100 --rounds 200
+
+Documents are synthetic but shaped like production ones (image variants, reviews,
+ObjectIds, datetimes). Each case also checks that both paths produce the same JSON.
+Timings are medians and vary run to run by ~20%; compare several runs before drawing conclusions.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+from fastapi.routing import APIRoute, serialize_response
+from fastapi.utils import create_model_field
+
+from app.api import orders, products, users
+from app.models.order import Order
+from app.models.product import ProductSummary
+from app.utils.fast_json import dumps
+
+random.seed(7)
+
+
+def fake_product() -> dict:
+    images = [f"https://bucket.s3.amazonaws.com/{ObjectId()}.jpg" for _ in range(random.randint(1, 4))]
+    return {
+        "_id": ObjectId(),
+        "user": ObjectId(),
+        "name": f"Product {random.randint(1, 10_000)}",
+        "images": images,
+        "imageVariants": [
+            {"url": url, "variants": {str(w): url.replace(".jpg", f"_{w}w.webp") for w in (200, 600, 1200)}}
+            for url in images
+        ],
+        "brand": random.choice(["Acme", "Globex", "Initech", "Umbrella"]),
+        "category": random.choice(["Electronics", "Books", "Home", "Toys"]),
+        "description": "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 4,
+        "reviews": [
+            {"name": "Reviewer", "rating": random.randint(1, 5), "comment": "Great value", "user": ObjectId()}
+            for _ in range(random.randint(0, 8))
+        ],
+        "rating": round(random.uniform(1, 5), 1),
+        "numReviews": random.randint(0, 500),
+        "price": random.choice([19, 49.99, 120, 999.5]),
+        "countInStock": random.randint(0, 50),
+    }
+
+
+def fake_order() -> dict:
+    created = datetime(2025, 1, 1) + timedelta(minutes=random.randint(0, 500_000), milliseconds=random.randint(0, 999))
+    items = [
+        {"name": "Item", "qty": random.randint(1, 3), "image": "https://bucket/x.jpg", "price": 25, "product": ObjectId()}
+        for _ in range(random.randint(1, 5))
+    ]
+    paid = random.random() < 0.7
+    return {
+        "_id": ObjectId(),
+        "user": ObjectId(),
+        "orderItems": items,
+        "shippingAddress": {"address": "1 Main St", "city": "Springfield", "postalCode": "12345", "country": "US"},
+        "paymentMethod": "PayPal",
+        "taxPrice": 3.75,
+        "shippingPrice": 0,
+        "totalPrice": 28.75,
+        "isPaid": paid,
+        "paidAt": created if paid else None,
+        "isDelivered": False,
+        "isUserDeleted": False,
+        "createdAt": created,
+    }
+
+
+def fake_user() -> dict:
+    return {
+        "_id": ObjectId(),
+        "name": "Jane Doe",
+        "email": f"user{random.randint(1, 10**6)}@example.com",
+        "password": "$argon2id$v=19$m=65536,t=3,p=4$c2FsdHNhbHQ$aGFzaGhhc2hoYXNo",
+        "isAdmin": False,
+    }
+
+
+def response_field(router, name):
+    return next(route.response_field for route in router.routes if isinstance(route, APIRoute) and route.name == name)
+
+
+def time_ms(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response_model vs each list route's serialization.")
+    parser.add_argument("--items", type=int, default=100, help="Documents per response")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    summaries = products.PRODUCT_SUMMARIES
+    cases = [
+        # The list routes' response_models are page envelopes; their cost is the List[...] inside
+        ("get_products", fake_product, create_model_field("response", List[ProductSummary], mode="serialization"),
+         lambda docs: summaries.dump_json(summaries.validate_python(docs), by_alias=True)),
+        ("get_orders", fake_order, create_model_field("response", List[Order], mode="serialization"),
+         lambda docs: dumps(orders.ORDER_SHAPE.shape_many(docs))),
+        ("read_users", fake_user, response_field(users.router, "read_users"),
+         lambda docs: dumps(users.USER_SHAPE.shape_many(docs))),
+    ]
+
+    print(f"{args.items} documents per response, median of {args.rounds} rounds")
+    print(f"{'endpoint':<14} {'response_model':>15} {'route path':>10} {'speedup':>8}  same JSON")
+    for name, make, field, render in cases:
+        docs = [make() for _ in range(args.items)]
+
+        def slow():
+            return loop.run_until_complete(serialize_response(field=field, response_content=docs, dump_json=True))
+
+        def fast():
+            return render(docs)
+
+        same = json.loads(slow()) == json.loads(fast())
+        slow_ms, fast_ms = time_ms(slow, args.rounds), time_ms(fast, args.rounds)
+        print(f"{name:<14} {slow_ms:>12.2f} ms {fast_ms:>7.2f} ms {slow_ms / fast_ms:>7.1f}x  {same}")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Dashboard rollup: running totals kept in a single document and updated with $inc by the
+write paths (orders, products, users), so the admin dashboard never scans a collection.
+
+The rollup is only ever created by rebuild(): at startup when it is missing, or on the first
+dashboard read. Until then the $inc writes are no-ops, so a database that already holds orders,
+products and users never ends up with a rollup that counts only what happened after deploy.
+Rebuild it from the source collections after a migration, restore or suspected drift:
+
+    python -m app.core.stats --rebuild
+"""
+import argparse
+import asyncio
+
+from app.core.database import get_database
+
+ROLLUP_ID = "dashboard"
+LOW_STOCK_THRESHOLD = 10
+RECENT_ORDERS = 5
+LOW_STOCK_ITEMS = 5
+
+COUNTERS = ("totalRevenue", "totalOrders", "paidOrders", "totalProducts", "totalUsers")
+
+
+async def _inc(**deltas) -> None:
+    # No upsert: a rollup holding only this delta would hide all earlier history from get_rollup
+    await get_database().stats.update_one({"_id": ROLLUP_ID}, {"$inc": deltas})
+
+
+async def record_order_created(order: dict) -> None:
+    deltas = {"totalOrders": 1}
+    if order.get("isPaid"):
+        deltas.update(paidOrders=1, totalRevenue=order.get("totalPrice", 0))
+    await _inc(**deltas)
+
+
+async def record_order_paid(total_price: float) -> None:
+    # Callers must only report the unpaid -> paid transition once per order
+    await _inc(paidOrders=1, totalRevenue=total_price)
+
+
+async def record_order_deleted(order: dict) -> None:
+    deltas = {"totalOrders": -1}
+    if order.get("isPaid"):
+        deltas.update(paidOrders=-1, totalRevenue=-order.get("totalPrice", 0))
+    await _inc(**deltas)
+
+
+async def record_product_created() -> None:
+    await _inc(totalProducts=1)
+
+
+async def record_product_deleted() -> None:
+    await _inc(totalProducts=-1)
+
+
+async def record_user_created() -> None:
+    await _inc(totalUsers=1)
+
+
+async def rebuild() -> dict:
+    """Recomputes every counter from the source collections and replaces the rollup."""
+    db = get_database()
+    revenue = await db.orders.aggregate([
+        {"$match": {"isPaid": True}},
+        {"$group": {"_id": None, "total": {"$sum": "$totalPrice"}, "count": {"$sum": 1}}},
+    ]).to_list(length=1)
+    rollup = {
+        "totalRevenue": revenue[0]["total"] if revenue else 0,
+        "paidOrders": revenue[0]["count"] if revenue else 0,
+        "totalOrders": await db.orders.count_documents({}),
+        "totalProducts": await db.products.count_documents({}),
+        "totalUsers": await db.users.count_documents({}),
+    }
+    await db.stats.replace_one({"_id": ROLLUP_ID}, rollup, upsert=True)
+    return rollup
+
+
+async def ensure_rollup() -> dict:
+    """Returns the rollup, building it from the source collections if it doesn't exist yet."""
+    rollup = await get_database().stats.find_one({"_id": ROLLUP_ID})
+    if rollup is None:
+        # First start (or first read) on a database that predates the rollup
+        rollup = await rebuild()
+    return rollup
+
+
+async def get_rollup() -> dict:
+    rollup = await ensure_rollup()
+    return {name: rollup.get(name, 0) for name in COUNTERS}
+
+
+async def _main(args) -> None:
+    if args.rebuild:
+        rollup = await rebuild()
+    else:
+        rollup = await get_rollup()
+    for name in COUNTERS:
+        print(f"{name:<14} {rollup[name]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or rebuild the admin dashboard rollup.")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute the rollup from the source collections")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
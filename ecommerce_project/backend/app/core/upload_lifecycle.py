@@ -0,0 +1,85 @@
+"""
+Cleanup for upload staging prefixes: presigned direct uploads that were never completed
+(DIRECT_UPLOAD_PREFIX) and streamed bodies that never reached their content-addressed key.
+Completed uploads always move out of these prefixes, so anything left there is unclaimed.
+
+    python -m app.core.upload_lifecycle            # install the bucket lifecycle rules
+    python -m app.core.upload_lifecycle --sweep    # ...and delete what is already past expiry now
+
+The rules are merged into the bucket's existing lifecycle configuration (other rules are kept).
+--sweep does the same cleanup by hand, for S3 stand-ins without lifecycle support.
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.utils.s3_utilities import STAGING_PREFIX, s3_uploader
+
+RULE_ID_PREFIX = "shopsmart-expire-"
+
+
+def staging_prefixes() -> list:
+    return [settings.DIRECT_UPLOAD_PREFIX, STAGING_PREFIX]
+
+
+def staging_rules() -> list:
+    return [
+        {
+            "ID": f"{RULE_ID_PREFIX}{prefix.strip('/')}",
+            "Filter": {"Prefix": prefix},
+            "Status": "Enabled",
+            "Expiration": {"Days": settings.UPLOAD_STAGING_EXPIRE_DAYS},
+            "AbortIncompleteMultipartUpload": {"DaysAfterInitiation": settings.UPLOAD_STAGING_EXPIRE_DAYS},
+        }
+        for prefix in staging_prefixes()
+    ]
+
+
+def apply_lifecycle() -> list:
+    """Installs (or updates) the staging rules; returns the bucket's resulting rule IDs."""
+    from botocore.exceptions import ClientError
+    client = s3_uploader.client
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+    try:
+        rules = client.get_bucket_lifecycle_configuration(Bucket=bucket)["Rules"]
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") != "NoSuchLifecycleConfiguration":
+            raise
+        rules = []
+    rules = [rule for rule in rules if not rule.get("ID", "").startswith(RULE_ID_PREFIX)] + staging_rules()
+    client.put_bucket_lifecycle_configuration(Bucket=bucket, LifecycleConfiguration={"Rules": rules})
+    return [rule.get("ID", "") for rule in rules]
+
+
+def sweep(now: datetime = None) -> dict:
+    """Deletes staged objects and aborts multipart uploads older than the expiry; returns counts."""
+    client = s3_uploader.client
+    bucket = settings.AWS_STORAGE_BUCKET_NAME
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.UPLOAD_STAGING_EXPIRE_DAYS)
+    counts = {"objects": 0, "multipart": 0}
+    for prefix in staging_prefixes():
+        for page in client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+            stale = [{"Key": item["Key"]} for item in page.get("Contents", []) if item["LastModified"] < cutoff]
+            if stale:
+                client.delete_objects(Bucket=bucket, Delete={"Objects": stale, "Quiet": True})
+                counts["objects"] += len(stale)
+        for page in client.get_paginator("list_multipart_uploads").paginate(Bucket=bucket, Prefix=prefix):
+            for item in page.get("Uploads", []):
+                if item["Initiated"] < cutoff:
+                    client.abort_multipart_upload(Bucket=bucket, Key=item["Key"], UploadId=item["UploadId"])
+                    counts["multipart"] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expire unclaimed uploads under the staging prefixes.")
+    parser.add_argument("--sweep", action="store_true", help="Also delete staged objects already past expiry")
+    args = parser.parse_args()
+    print(f"Lifecycle rules on {settings.AWS_STORAGE_BUCKET_NAME}: {', '.join(apply_lifecycle())}")
+    if args.sweep:
+        counts = sweep()
+        print(f"Deleted {counts['objects']} unclaimed objects, aborted {counts['multipart']} multipart uploads")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class PoolSaturated(Exception):
+    """Raised when a worker pool's queue is full; surfaced to clients as 503."""
+
+    def __init__(self, pool_name: str):
+        super().__init__(f"{pool_name} is saturated, try again shortly")
+        self.pool_name = pool_name
+
+
+class WorkerPool:
+    """
+    Runs CPU-heavy callables off the event loop with a bounded backlog.
+    At most `max_workers` jobs run at once and `max_queue` more may wait; anything beyond
+    that is rejected immediately instead of queueing unboundedly behind a burst.
+    The executor is created on first use so importing the app stays cheap.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int, kind: str = "process"):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._latencies_ms: "deque[float]" = deque(maxlen=512)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                except (OSError, NotImplementedError) as e:
+                    # e.g. AWS Lambda has no /dev/shm for multiprocessing primitives
+                    logging.warning(f"{self.name}: process pool unavailable ({e}), falling back to threads")
+                    self.kind = "thread"
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # fn and args must be picklable (module-level functions) when kind == "process"
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PoolSaturated(self.name)
+
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+            self._latencies_ms.append((time.perf_counter() - started) * 1000)
+        self.completed += 1
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies_ms)
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": min(self.pending, self.max_workers),
+            "queue_depth": max(0, self.pending - self.max_workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            # Latency includes time spent waiting in the queue
+            "latency_ms_avg": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "latency_ms_p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else 0.0,
+        }
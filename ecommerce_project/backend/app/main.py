@@ -1,9 +1,18 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+import os
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 # from fastapi.staticfiles import StaticFiles
 from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.indexes import ensure_indexes, prune_expired_reset_tokens
+from app.core import analytics, stats
 from app.core.middleware import JWTMiddleware
-from app.api import auth, products, orders, users, upload
+from app.core.workers import PoolSaturated
+from app.core.security import hash_pool
+from app.core.order_intake import order_intake
+from app.api import auth, products, orders, users, upload, admin
 # import os
 
 app = FastAPI()
@@ -31,24 +40,64 @@ app.add_middleware(
 # os.makedirs(upload_path, exist_ok=True)
 # app.mount("/static", StaticFiles(directory=static_path), name="static")
 
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    # Shed load instead of queueing CPU-bound work behind a burst
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.on_event("startup")
 async def startup_db_client():
     await connect_to_mongo()
+    await ensure_indexes()
+    await prune_expired_reset_tokens()
+    # Before any write path runs: increments only apply once the rollup exists
+    await stats.ensure_rollup()
+    await analytics.ensure_buckets()
+
+async def warm_up():
+    # Lambda init phase: same work as startup, done once per container instead of per invocation
+    try:
+        await startup_db_client()
+    except Exception as e:
+        # Never fail the container over this; the client reconnects on the first request
+        logging.warning(f"Warm-up failed: {e}")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    # Queued group-commit orders are written before the client goes away
+    await order_intake.close()
     await close_mongo_connection()
+    hash_pool.shutdown()
+    upload.image_pool.shutdown()
+    await upload.close_http_client()
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(products.router, prefix="/api/products", tags=["products"])
 app.include_router(orders.router, prefix="/api/orders", tags=["orders"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
 app.include_router(upload.router, prefix="/api/upload", tags=["upload"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
 async def read_root():
     return {"message": "Welcome to the ShopSmart API"}
 
 # AWS Lambda Handler
+# Lifespan is off: Mangum would otherwise run startup *and* shutdown around every invocation,
+# reconnecting to Mongo and tearing down the worker pools each time. The Mongo client and pools
+# are created lazily and live as long as the warm container.
 from mangum import Mangum
-handler = Mangum(app, api_gateway_base_path="/dev")
+handler = Mangum(app, lifespan="off", api_gateway_base_path="/dev")
+
+if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
+    # Mangum drives requests on this same loop, so the client bound here is reused by them
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    loop.run_until_complete(warm_up())
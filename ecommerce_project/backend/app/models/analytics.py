@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import List, Literal
+from datetime import date
+
+from app.models.common import PyObjectId
+
+
+class SalesPoint(BaseModel):
+    period: date  # first day of the day/week/month
+    revenue: float = 0.0
+    units: int = 0
+
+
+class SalesSeries(BaseModel):
+    start: date
+    end: date
+    interval: Literal["day", "week", "month"]
+    revenue: float = 0.0
+    units: int = 0
+    points: List[SalesPoint] = []
+
+
+class ProductSales(BaseModel):
+    product: PyObjectId
+    name: str = ""
+    category: str = ""
+    revenue: float = 0.0
+    units: int = 0
+    orders: int = 0
+
+
+class CategorySales(BaseModel):
+    category: str
+    revenue: float = 0.0
+    units: int = 0
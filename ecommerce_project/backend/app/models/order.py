@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
 
 from app.models.common import PyObjectId
@@ -47,3 +47,30 @@ class Order(BaseModel):
     model_config = ConfigDict(
         populate_by_name=True,
     )
+
+
+class OrderSummary(BaseModel):
+    """List-view representation: status, totals and shipping, without the line items."""
+    id: Optional[PyObjectId] = Field(default=None, alias="_id")
+    user: Optional[PyObjectId] = None
+    shippingAddress: Optional[ShippingAddress] = None
+    paymentMethod: str = ""
+    taxPrice: float = 0.0
+    shippingPrice: float = 0.0
+    totalPrice: float = 0.0
+    isPaid: bool = False
+    paidAt: Optional[datetime] = None
+    isDelivered: bool = False
+    deliveredAt: Optional[datetime] = None
+    createdAt: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+    )
+
+
+class OrderPage(BaseModel):
+    # Full orders, or OrderSummary items when the listing asked for summary=true
+    items: List[Union[Order, OrderSummary]]
+    limit: int
+    nextCursor: Optional[str] = None
@@ -1,14 +1,57 @@
-from pydantic import BaseModel, Field, computed_field
-from typing import List, Optional
+from pydantic import BaseModel, Field, computed_field, field_validator
+from typing import Dict, List, Optional
+from datetime import datetime
+from app.core.config import settings
 from app.models.common import PyObjectId
 from pydantic import ConfigDict
 
 
+def primary_image(images: List[str]) -> str:
+    return images[0] if images else ""
+
+
+class ImageVariants(BaseModel):
+    """Resized WebP variants of one original image: {"url": url, "variants": {"200": url, ...}}."""
+    url: str
+    variants: Dict[str, str] = Field(default_factory=dict)
+
+
+def image_variant_list(value):
+    # Products written before imageVariants became a list stored it keyed by image URL
+    if isinstance(value, dict):
+        return [{"url": url, "variants": by_width} for url, by_width in value.items()]
+    return value
+
+
+def grid_thumbnail(images: List[str], variants: List[ImageVariants]) -> str:
+    # Narrowest variant of the primary image that still fills a grid card (else the widest one),
+    # falling back to the original. Picked from what was stored, so changing
+    # IMAGE_VARIANT_WIDTHS never strands images uploaded under the old widths.
+    image = primary_image(images)
+    by_width = next((entry.variants for entry in variants if entry.url == image), {})
+    widths = sorted(int(width) for width in by_width if width.isdigit())
+    if not widths:
+        return image
+    width = next((w for w in widths if w >= settings.IMAGE_GRID_WIDTH), widths[-1])
+    return by_width[str(width)] or image
+
+
 class Review(BaseModel):
     name: Optional[str] = ""
     rating: float = 4.8
     comment: Optional[str] = ""
     user: Optional[PyObjectId] = None
+    createdAt: Optional[datetime] = None
+
+
+class ReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    comment: str = Field("", max_length=2000)
+
+
+class RatingSummary(BaseModel):
+    rating: float
+    numReviews: int
 
 
 class Product(BaseModel):
@@ -20,16 +63,26 @@ class Product(BaseModel):
     @computed_field
     @property
     def image(self) -> str:
-        return self.images[0] if self.images else ""
+        return primary_image(self.images)
 
     images: List[str] = Field(default_factory=list)  # New: support multiple images
+    # Resized WebP variants per original image. A list rather than a map keyed by URL:
+    # URLs contain "." and "$", which are not usable as Mongo field names
+    imageVariants: List[ImageVariants] = Field(default_factory=list)
+    _image_variant_list = field_validator("imageVariants", mode="before")(image_variant_list)
+
+    @computed_field
+    @property
+    def thumbnail(self) -> str:
+        return grid_thumbnail(self.images, self.imageVariants)
     brand: str = Field(...,)
     category: Optional[str] = ""
     description: str = Field(...,)
 
     reviews: List[Review] = Field(default_factory=list)
-    rating: float = 4.8
-    numReviews: int = 50
+    # Maintained by the review endpoints from a stored running sum (ratingSum) and count
+    rating: float = 0
+    numReviews: int = 0
     price: float
     countInStock: int
 
@@ -37,3 +90,45 @@ class Product(BaseModel):
         populate_by_name=True,
         arbitrary_types_allowed=True,
     )
+
+
+class ProductSummary(BaseModel):
+    """Listing/search representation: what a product card needs, without description or reviews."""
+    id: Optional[PyObjectId] = Field(default=None, alias="_id")
+    name: str
+    brand: str = ""
+    category: Optional[str] = ""
+    rating: float = 0
+    numReviews: int = 0
+    price: float
+    countInStock: int
+    # Only read to derive image/thumbnail; listings fetch just the first image
+    images: List[str] = Field(default_factory=list, exclude=True)
+    imageVariants: List[ImageVariants] = Field(default_factory=list, exclude=True)
+    _image_variant_list = field_validator("imageVariants", mode="before")(image_variant_list)
+
+    @computed_field
+    @property
+    def image(self) -> str:
+        return primary_image(self.images)
+
+    @computed_field
+    @property
+    def thumbnail(self) -> str:
+        return grid_thumbnail(self.images, self.imageVariants)
+
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class ProductPage(BaseModel):
+    items: List[ProductSummary]
+    total: Optional[int] = None
+    limit: int
+    nextCursor: Optional[str] = None
+
+
+class ReviewPage(BaseModel):
+    items: List[Review]
+    total: int
+    offset: int
+    limit: int
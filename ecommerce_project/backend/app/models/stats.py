@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.models.order import Order
+from app.models.product import ProductSummary
+
+
+class DashboardStats(BaseModel):
+    totalRevenue: float = 0.0
+    totalOrders: int = 0
+    paidOrders: int = 0
+    totalProducts: int = 0
+    totalUsers: int = 0
+    recentOrders: List[Order] = []
+    lowStockProducts: List[ProductSummary] = []
@@ -0,0 +1,52 @@
+"""
+Order writes, each a single Mongo round trip on the success path.
+Ownership and state preconditions are part of the filter; when nothing matches, callers look the
+order up once to tell "not found" from "not yours" or "already done".
+"""
+from datetime import datetime
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.database import get_database
+
+
+def _filter(id: str, owner: Optional[str]) -> dict:
+    query = {"_id": ObjectId(id)}
+    if owner is not None:
+        query["user"] = ObjectId(owner)
+    return query
+
+
+async def get(id: str) -> Optional[dict]:
+    return await get_database().orders.find_one({"_id": ObjectId(id)})
+
+
+async def mark_paid(id: str, owner: Optional[str] = None) -> Optional[dict]:
+    """Flips an unpaid order to paid and returns it; None if it was already paid, missing or not `owner`'s."""
+    return await get_database().orders.find_one_and_update(
+        {**_filter(id, owner), "isPaid": {"$ne": True}},
+        {"$set": {"isPaid": True, "paidAt": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def mark_delivered(id: str) -> Optional[dict]:
+    return await get_database().orders.find_one_and_update(
+        {"_id": ObjectId(id)},
+        {"$set": {"isDelivered": True, "deliveredAt": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def delete(id: str) -> Optional[dict]:
+    """Hard delete; returns the removed order so rollups can be adjusted."""
+    return await get_database().orders.find_one_and_delete({"_id": ObjectId(id)})
+
+
+async def hide_from_owner(id: str, owner: str) -> bool:
+    hidden = await get_database().orders.find_one_and_update(
+        _filter(id, owner), {"$set": {"isUserDeleted": True}}, projection={"_id": 1}
+    )
+    return hidden is not None
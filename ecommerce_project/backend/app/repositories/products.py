@@ -0,0 +1,27 @@
+"""Product writes, each a single Mongo round trip that yields the document the route returns."""
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.database import get_database
+
+
+async def insert(doc: dict) -> dict:
+    # insert_one sets doc["_id"], so the inserted document is the response; no read-back
+    await get_database().products.insert_one(doc)
+    return doc
+
+
+async def update(id: str, fields: dict) -> Optional[dict]:
+    """Applies `fields` with $set and returns the updated product, or None if it doesn't exist."""
+    if not fields:
+        return await get_database().products.find_one({"_id": ObjectId(id)})
+    return await get_database().products.find_one_and_update(
+        {"_id": ObjectId(id)}, {"$set": fields}, return_document=ReturnDocument.AFTER
+    )
+
+
+async def delete(id: str) -> bool:
+    deleted = await get_database().products.find_one_and_delete({"_id": ObjectId(id)}, projection={"_id": 1})
+    return deleted is not None
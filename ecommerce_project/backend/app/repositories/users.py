@@ -0,0 +1,21 @@
+"""User writes, each a single Mongo round trip that yields the document the route returns."""
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.core.database import get_database
+
+
+async def insert(doc: dict) -> dict:
+    # insert_one sets doc["_id"], so the inserted document is the response; no read-back
+    await get_database().users.insert_one(doc)
+    return doc
+
+
+async def update(id: str, fields: dict) -> Optional[dict]:
+    if not fields:
+        return await get_database().users.find_one({"_id": ObjectId(id)})
+    return await get_database().users.find_one_and_update(
+        {"_id": ObjectId(id)}, {"$set": fields}, return_document=ReturnDocument.AFTER
+    )
@@ -0,0 +1,28 @@
+import hashlib
+from fastapi import Request, Response
+
+
+def make_etag(body: bytes) -> str:
+    # Strong validator: derived from the exact response bytes
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def etag_response(request: Request, cached: tuple) -> Response:
+    """
+    Builds the response for a cached (etag, body) pair, answering 304 when the
+    client already holds the current representation.
+    """
+    etag, body = cached
+    # no-cache: clients may store it but must revalidate, so admins never keep a stale copy
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
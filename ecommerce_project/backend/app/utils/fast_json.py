@@ -0,0 +1,159 @@
+import typing
+from functools import partial
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticSerializationError, to_jsonable_python
+
+
+def _bson(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _default(value):
+    # orjson handles datetime natively; the rest is rendered the way pydantic would
+    try:
+        return _bson(value)
+    except TypeError:
+        pass
+    try:
+        return to_jsonable_python(value, fallback=_bson)
+    except (PydanticSerializationError, TypeError):
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(data: Any) -> bytes:
+    return orjson.dumps(data, default=_default)
+
+
+def _nested_model(annotation) -> Tuple[Optional[type], bool]:
+    """Returns (model, is_list) when the annotation is a model, Optional[model] or List[model]."""
+    origin = typing.get_origin(annotation)
+    if origin in (list, List):
+        inner, _ = _nested_model(typing.get_args(annotation)[0])
+        return inner, True
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _nested_model(args[0]) if len(args) == 1 else (None, False)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+def _is_float(annotation) -> bool:
+    if typing.get_origin(annotation) is typing.Union:
+        return float in typing.get_args(annotation)
+    return annotation is float
+
+
+def projection(model: type) -> dict:
+    # Mongo projection for exactly the fields a model declares
+    return {field.alias or name: 1 for name, field in model.model_fields.items()}
+
+
+class _ComputedView:
+    """Attribute access by field name over a shaped document, for evaluating computed properties."""
+
+    __slots__ = ("_data", "_aliases")
+
+    def __init__(self, data: dict, aliases: dict):
+        self._data = data
+        self._aliases = aliases
+
+    def __getattr__(self, name):
+        return self._data[self._aliases.get(name, name)]
+
+
+class DocumentShape:
+    """
+    Shapes raw Mongo documents into a model's JSON output without validating them.
+
+    Built once per model from its fields: only declared fields are kept (with their defaults
+    filled in), float fields are coerced like pydantic would, nested models are shaped
+    recursively and computed fields are evaluated from the model's own property code.
+    The result is what `Model.model_validate(doc).model_dump(by_alias=True)` returns for
+    well-formed documents, at a fraction of the cost; writes still go through the models.
+    A document missing a required field is handed to pydantic instead, so it fails validation
+    exactly as it would under response_model rather than rendering null.
+
+    Only worth it where validation is measurably expensive (`python -m
+    app.core.serialization_benchmark`): orders and users. Product responses validate through
+    pydantic, where this path measured no faster.
+    """
+
+    def __init__(self, model: type):
+        self.model = model
+        self.defaults: List[Tuple[str, Any]] = []
+        self.factories: List[Tuple[str, Callable[[], Any]]] = []
+        self.floats: List[str] = []
+        self.nested: List[Tuple[str, "DocumentShape", bool]] = []
+        self.aliases = {}
+        self.excluded: List[str] = []
+        self.required: List[str] = []
+        for name, field in model.model_fields.items():
+            alias = field.alias or name
+            if alias != name:
+                self.aliases[name] = alias
+            if field.exclude:
+                # Still fetched (computed fields may read it) but never rendered
+                self.excluded.append(alias)
+            if field.default_factory is not None or isinstance(field.default, (list, dict, set)):
+                # Like pydantic, every document gets its own value (datetime.utcnow, a fresh list, ...)
+                self.defaults.append((alias, None))
+                self.factories.append((alias, partial(field.get_default, call_default_factory=True)))
+            elif field.is_required():
+                self.defaults.append((alias, None))
+                self.required.append(alias)
+            else:
+                self.defaults.append((alias, field.default))
+            if _is_float(field.annotation):
+                self.floats.append(alias)
+            nested, is_list = _nested_model(field.annotation)
+            if nested is not None:
+                self.nested.append((alias, DocumentShape(nested), is_list))
+        self.computed: List[Tuple[str, Callable]] = [
+            (name, computed.wrapped_property.fget) for name, computed in model.model_computed_fields.items()
+        ]
+
+    def projection(self) -> dict:
+        return projection(self.model)
+
+    def shape(self, doc: dict) -> dict:
+        for alias in self.required:
+            if alias not in doc:
+                # Malformed document: let pydantic raise its validation error
+                return self.model.model_validate(doc).model_dump(mode="json", by_alias=True)
+        get = doc.get
+        out = {alias: get(alias, default) for alias, default in self.defaults}
+        for alias, factory in self.factories:
+            if alias not in doc:
+                out[alias] = factory()
+        for alias in self.floats:
+            if type(out[alias]) is int:
+                out[alias] = float(out[alias])
+        for alias, nested, is_list in self.nested:
+            value = out[alias]
+            if value is not None:
+                out[alias] = [nested.shape(item) for item in value] if is_list else nested.shape(value)
+        if self.computed:
+            view = _ComputedView(out, self.aliases)
+            for name, getter in self.computed:
+                out[name] = getter(view)
+        for alias in self.excluded:
+            del out[alias]
+        return out
+
+    def shape_many(self, docs: Iterable[dict]) -> list:
+        return [self.shape(doc) for doc in docs]
+
+
+def json_response(data: Any, status_code: int = 200) -> Response:
+    # Returning a Response skips FastAPI's response_model pass; the route still declares it for OpenAPI
+    return Response(content=dumps(data), status_code=status_code, media_type="application/json")
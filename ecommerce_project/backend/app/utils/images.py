@@ -0,0 +1,48 @@
+from typing import Optional, Tuple
+
+# Enough leading bytes to recognise every supported format
+SNIFF_BYTES = 12
+
+
+def sniff_image_type(head: bytes) -> Optional[Tuple[str, str]]:
+    """
+    Identifies an image from its magic bytes and returns (extension, content type),
+    or None for anything that isn't a supported image. Remote content-type headers
+    and file extensions are not trusted.
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg", "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png", "image/png"
+    if len(head) >= 12 and head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp", "image/webp"
+    return None
+
+
+def make_variants(data: bytes, widths: list, quality: int, max_pixels: int) -> dict:
+    """
+    Decodes an image once and returns {width: webp_bytes} for each requested width.
+    Runs inside a worker process, so it must stay a module-level function.
+    Widths larger than the source are capped to the source width (never upscaled).
+    """
+    import io
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = max_pixels
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        image.load()
+
+    variants = {}
+    # Largest first, each step downscaling the previous result, which is cheaper than
+    # resampling every size from the full-resolution source
+    current = image
+    for width in sorted(set(widths), reverse=True):
+        if current.width > width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.LANCZOS)
+        out = io.BytesIO()
+        current.save(out, format="WEBP", quality=quality, method=4)
+        variants[width] = out.getvalue()
+    return variants
@@ -0,0 +1,66 @@
+import base64
+import json
+from typing import Any, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, value: Any, last_id: ObjectId) -> str:
+    """
+    Opaque keyset cursor: the (sort key, _id) pair of the last item on the page.
+    The sort name is embedded so a cursor can't be replayed against another ordering.
+    """
+    payload = json.dumps({"s": sort, "v": value, "id": str(last_id)}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, ObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort:
+            raise InvalidCursor("Cursor does not match the requested sort order")
+        return payload["v"], ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise InvalidCursor(str(e))
+
+
+def keyset_filter(field: str, direction: int, value: Any, last_id: ObjectId) -> dict:
+    """
+    Builds the "strictly after (value, last_id)" predicate for a (field, _id) sort
+    with the same direction on both keys, so a compound (field, _id) index serves
+    every page as a plain range scan.
+    """
+    op = "$gt" if direction == 1 else "$lt"
+    if field == "_id":
+        return {"_id": {op: last_id}}
+    return {
+        "$or": [
+            {field: {op: value}},
+            {field: value, "_id": {op: last_id}},
+        ]
+    }
+
+
+def sort_spec(field: str, direction: int) -> list:
+    if field == "_id":
+        return [("_id", direction)]
+    return [(field, direction), ("_id", direction)]
+
+
+def split_page(sort: str, field: str, docs: list, limit: int) -> Tuple[list, Optional[str]]:
+    """
+    Callers fetch limit + 1 documents; the extra one only signals that another page exists.
+    Returns the page and the cursor for the next one (None on the last page).
+    """
+    if len(docs) <= limit:
+        return docs, None
+    page = docs[:limit]
+    last = page[-1]
+    value = None if field == "_id" else last.get(field)
+    return page, encode_cursor(sort, value, last["_id"])
@@ -1,37 +1,272 @@
-import boto3
-from botocore.exceptions import NoCredentialsError, ClientError
+import asyncio
+import hashlib
+import threading
+from fastapi.concurrency import run_in_threadpool
 from app.core.config import settings
 import logging
 import uuid
 
+MB = 1024 * 1024
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+MIN_PART_SIZE = 5 * MB
+# Bodies still being streamed in, before they move to their content-addressed key
+STAGING_PREFIX = "incoming/"
 
-def upload_file_to_s3(file_obj, filename, content_type):
+
+class S3Uploader:
+    """
+    Process-wide S3 uploader.
+    One boto3 client (and its connection pool) is built lazily and shared by every upload,
+    so files only pay for the transfer itself, not client construction and a fresh TLS handshake.
+    boto3 itself is only imported when the first upload needs it, keeping it off the cold-start path.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._slots = None
+        self._slots_loop = None
+        self._transfer_config = None
+
+    @property
+    def client(self):
+        # boto3 clients are thread-safe once built, but building one is not
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+                    self._client = boto3.client(
+                        's3',
+                        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                        region_name=settings.AWS_S3_REGION,
+                        endpoint_url=settings.AWS_S3_ENDPOINT_URL,
+                        config=Config(
+                            # SigV4 signs the checksum header into presigned grants
+                            signature_version="s3v4",
+                            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                            retries={"max_attempts": 3, "mode": "standard"},
+                        ),
+                    )
+        return self._client
+
+    @property
+    def transfer_config(self):
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            self._transfer_config = TransferConfig(
+                multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+                multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE_MB * MB,
+                max_concurrency=settings.S3_TRANSFER_CONCURRENCY,
+            )
+        return self._transfer_config
+
+    @property
+    def slots(self) -> asyncio.Semaphore:
+        # Process-wide cap on simultaneous uploads, bound to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(settings.S3_MAX_UPLOADS_PER_PROCESS)
+            self._slots_loop = loop
+        return self._slots
+
+    def object_url(self, key):
+        if settings.AWS_S3_ENDPOINT_URL:
+            # Local stand-ins (MinIO, moto) are addressed path-style
+            return f"{settings.AWS_S3_ENDPOINT_URL.rstrip('/')}/{settings.AWS_STORAGE_BUCKET_NAME}/{key}"
+        return f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{key}"
+
+    def unique_key(self, filename):
+        # Generate unique filename
+        ext = filename.split('.')[-1] if '.' in filename else ''
+        return f"{uuid.uuid4()}.{ext}" if ext else f"{uuid.uuid4()}"
+
+    def upload(self, file_obj, filename, content_type, key=None):
+        """
+        Uploads a file to an S3 bucket and returns the public URL.
+        Ensures filename is unique unless an explicit key is given.
+        """
+        from botocore.exceptions import NoCredentialsError, ClientError
+        key = key or self.unique_key(filename)
+
+        try:
+            self.client.upload_fileobj(
+                file_obj,
+                settings.AWS_STORAGE_BUCKET_NAME,
+                key,
+                ExtraArgs={'ContentType': content_type},
+                Config=self.transfer_config,
+            )
+            url = self.object_url(key)
+            logging.info(f"File uploaded successfully to S3: {url}")
+            return url
+        except (NoCredentialsError, ClientError) as e:
+            logging.error(f"S3 Upload Error for {filename}: {e}")
+            return None
+
+    async def upload_async(self, file_obj, filename, content_type, key=None):
+        # Blocking boto3 I/O runs in the threadpool, at most S3_MAX_UPLOADS_PER_PROCESS at a time
+        async with self.slots:
+            return await run_in_threadpool(self.upload, file_obj, filename, content_type, key)
+
+    def presign_post(self, key, content_type, max_bytes, expires_in, checksum_sha256):
+        # Browser form upload; the policy pins the exact key, content type, a size range and the
+        # SHA-256 of the body, which S3 verifies before it stores the object
+        checksum = {"x-amz-checksum-algorithm": "SHA256", "x-amz-checksum-sha256": checksum_sha256}
+        return self.client.generate_presigned_post(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Key=key,
+            Fields={"Content-Type": content_type, **checksum},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_bytes],
+                ["starts-with", "$key", settings.DIRECT_UPLOAD_PREFIX],
+                *({name: value} for name, value in checksum.items()),
+            ],
+            ExpiresIn=expires_in,
+        )
+
+    def presign_put(self, key, content_type, size, expires_in, checksum_sha256):
+        # PUT can't express a size range, so the declared size is signed exactly; so is the
+        # SHA-256 header, which S3 checks against the body
+        return self.client.generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": settings.AWS_STORAGE_BUCKET_NAME,
+                "Key": key,
+                "ContentType": content_type,
+                "ContentLength": size,
+                "ChecksumAlgorithm": "SHA256",
+                "ChecksumSHA256": checksum_sha256,
+            },
+            ExpiresIn=expires_in,
+        )
+
+    def head(self, key):
+        """Object metadata including the checksum S3 verified on upload (ChecksumSHA256), or None."""
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key, ChecksumMode="ENABLED")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    def read_head(self, key, length):
+        # Ranged GET: only the first `length` bytes leave S3
+        response = self.client.get_object(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key, Range=f"bytes=0-{length - 1}"
+        )
+        return response["Body"].read()
+
+    def move(self, key, new_key, content_type):
+        # Server-side copy + delete; the bytes never come back through this process
+        bucket = settings.AWS_STORAGE_BUCKET_NAME
+        self.client.copy_object(
+            Bucket=bucket, Key=new_key, CopySource={"Bucket": bucket, "Key": key},
+            ContentType=content_type, MetadataDirective="REPLACE",
+        )
+        self.client.delete_object(Bucket=bucket, Key=key)
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=key)
+
+    def streaming_upload(self, ext, content_type):
+        # Staged under a temporary key: the content-addressed key is only known once the body is hashed
+        return StreamingUpload(self, f"{STAGING_PREFIX}{self.unique_key(f'image.{ext}')}", content_type)
+
+
+class StreamingUpload:
     """
-    Uploads a file to an S3 bucket and returns the public URL.
-    Ensures filename is unique.
+    Writes a body of unknown length to S3 while holding at most one part in memory.
+    Bodies smaller than one part are sent with a single put_object; larger ones become
+    a multipart upload, one part per buffered chunk. The body is SHA-256 hashed as it
+    streams so callers can pick a content-addressed key (or skip the upload) before
+    committing. Call complete() or abort() exactly once.
     """
-    s3_client = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION
-    )
-
-    # Generate unique filename
-    ext = filename.split('.')[-1] if '.' in filename else ''
-    unique_filename = f"{uuid.uuid4()}.{ext}" if ext else f"{uuid.uuid4()}"
-
-    try:
-        s3_client.upload_fileobj(
-            file_obj,
-            settings.AWS_STORAGE_BUCKET_NAME,
-            unique_filename,
-            ExtraArgs={'ContentType': content_type}
+
+    def __init__(self, uploader: S3Uploader, key, content_type):
+        self.uploader = uploader
+        self.key = key
+        self.content_type = content_type
+        self.part_size = max(MIN_PART_SIZE, settings.S3_MULTIPART_CHUNKSIZE_MB * MB)
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    async def write(self, data: bytes):
+        self._buffer += data
+        self.size += len(data)
+        self.sha256.update(data)
+        if len(self._buffer) >= self.part_size:
+            await self._flush_part()
+
+    async def _flush_part(self):
+        client = self.uploader.client
+        if self._upload_id is None:
+            response = await run_in_threadpool(
+                client.create_multipart_upload,
+                Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=self.key, ContentType=self.content_type,
+            )
+            self._upload_id = response["UploadId"]
+        part_number = len(self._parts) + 1
+        # Hand the buffer itself to boto3 (no copy) and start a fresh one
+        body, self._buffer = self._buffer, bytearray()
+        response = await run_in_threadpool(
+            client.upload_part,
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+            PartNumber=part_number, Body=body,
         )
-        # Construct URL
-        url = f"https://{settings.AWS_STORAGE_BUCKET_NAME}.s3.{settings.AWS_S3_REGION}.amazonaws.com/{unique_filename}"
-        logging.info(f"File uploaded successfully to S3: {url}")
+        self._parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    async def complete(self, final_key=None):
+        """
+        Commits the object and returns its URL. With final_key, a single-part body is written
+        there directly; a multipart one is completed at the staging key and copied server-side.
+        """
+        client = self.uploader.client
+        bucket = settings.AWS_STORAGE_BUCKET_NAME
+        if self._upload_id is None:
+            self.key = final_key or self.key
+            await run_in_threadpool(
+                client.put_object,
+                Bucket=bucket, Key=self.key,
+                Body=self._buffer, ContentType=self.content_type,
+            )
+        else:
+            if self._buffer:
+                await self._flush_part()
+            await run_in_threadpool(
+                client.complete_multipart_upload,
+                Bucket=bucket, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={"Parts": self._parts},
+            )
+            if final_key and final_key != self.key:
+                await run_in_threadpool(self.uploader.move, self.key, final_key, self.content_type)
+                self.key = final_key
+        self._buffer = bytearray()
+        url = self.uploader.object_url(self.key)
+        logging.info(f"File streamed successfully to S3: {url}")
         return url
-    except (NoCredentialsError, ClientError) as e:
-        logging.error(f"S3 Upload Error for {filename}: {e}")
-        return None
+
+    async def abort(self):
+        from botocore.exceptions import ClientError
+        self._buffer.clear()
+        if self._upload_id is not None:
+            try:
+                await run_in_threadpool(
+                    self.uploader.client.abort_multipart_upload,
+                    Bucket=settings.AWS_STORAGE_BUCKET_NAME, Key=self.key, UploadId=self._upload_id,
+                )
+            except ClientError as e:
+                logging.error(f"S3 abort failed for {self.key}: {e}")
+
+
+s3_uploader = S3Uploader()
+
+
+def upload_file_to_s3(file_obj, filename, content_type):
+    return s3_uploader.upload(file_obj, filename, content_type)
@@ -0,0 +1,21 @@
+import re
+import unicodedata
+
+MAX_SEARCH_LENGTH = 100
+MAX_SEARCH_TERMS = 10
+
+# Characters with meaning inside a $text search string: phrases ("), negation (-) and escapes (\)
+_TEXT_OPERATORS = re.compile(r'["\\\-]')
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_search(raw: str) -> str:
+    """
+    Turns free-form user input into a plain $text term list.
+    Operators are stripped so input is always matched as ordinary words, never as
+    phrases or negations, and the term count is capped to bound query cost.
+    """
+    text = unicodedata.normalize("NFKC", raw or "")[:MAX_SEARCH_LENGTH]
+    text = _TEXT_OPERATORS.sub(" ", text)
+    terms = _WHITESPACE.split(text.strip().lower())
+    return " ".join(t for t in terms[:MAX_SEARCH_TERMS] if t)
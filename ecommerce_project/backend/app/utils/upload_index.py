@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Optional
+
+from app.core.database import get_database
+
+
+async def find_upload(digest: str) -> Optional[dict]:
+    """
+    Looks up previously stored content by its SHA-256 digest.
+    The `uploads` collection maps digest -> {url, contentType, size, variants}.
+    """
+    db = get_database()
+    return await db.uploads.find_one({"_id": digest})
+
+
+async def register_upload(digest: str, url: str, content_type: str, size: int, variants: Optional[dict] = None):
+    db = get_database()
+    entry = {"url": url, "contentType": content_type, "size": size, "createdAt": datetime.utcnow()}
+    # Upsert: two identical uploads racing each other both wrote the same content-addressed key
+    update = {"$setOnInsert": entry}
+    if variants:
+        # Also fills in variants for content first registered without them (by /url or /complete)
+        update["$set"] = {"variants": variants}
+    else:
+        entry["variants"] = {}
+    await db.uploads.update_one({"_id": digest}, update, upsert=True)
@@ -0,0 +1,74 @@
+"""
+Shared test setup. Run from the backend directory:
+
+    python -m pytest -q
+
+Tests that need MongoDB use the `mongo` fixture, which points the app at a scratch database on
+TEST_MONGO_URL (default mongodb://localhost:27017), drops it afterwards, and skips when no server
+answers. Everything else runs without external services.
+"""
+import os
+import uuid
+
+import pytest
+
+# Configure the app before anything imports app.core.config; never inherit the real database
+os.environ["MONGO_URL"] = os.getenv("TEST_MONGO_URL", "mongodb://localhost:27017")
+os.environ["DATABASE_NAME"] = "shopsmart_test"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-not-for-production-use")
+os.environ["MONGO_PREWARM"] = "false"
+os.environ["PASSWORD_HASH_POOL"] = "thread"
+os.environ["IMAGE_POOL"] = "thread"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mongo():
+    """A scratch database name on a real server, set as the app's database for the test."""
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    from app.core.config import settings
+    from app.core.database import db
+
+    client = MongoClient(settings.MONGO_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        pytest.skip(f"needs a MongoDB server at {settings.MONGO_URL} (set TEST_MONGO_URL)")
+
+    name = f"shopsmart_test_{uuid.uuid4().hex[:8]}"
+    previous = settings.DATABASE_NAME
+    settings.DATABASE_NAME = name
+    try:
+        yield client[name]
+    finally:
+        db.close()
+        settings.DATABASE_NAME = previous
+        client.drop_database(name)
+        client.close()
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """moto's in-process S3 with an empty bucket; the shared uploader is rebuilt against it."""
+    from moto import mock_aws
+
+    from app.core.config import settings
+    from app.utils.s3_utilities import s3_uploader
+
+    monkeypatch.setattr(settings, "AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setattr(settings, "AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setattr(settings, "AWS_S3_REGION", "us-east-1")
+    monkeypatch.setattr(settings, "AWS_S3_ENDPOINT_URL", None)
+    monkeypatch.setattr(settings, "AWS_STORAGE_BUCKET_NAME", "test-bucket")
+    with mock_aws():
+        s3_uploader._client = None
+        s3_uploader.client.create_bucket(Bucket="test-bucket")
+        yield s3_uploader.client
+    s3_uploader._client = None
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import SingleFlightCache
+
+pytestmark = pytest.mark.anyio
+
+
+def make_loader(release: asyncio.Event, calls: list, value="page"):
+    async def loader():
+        calls.append(1)
+        await release.wait()
+        return value
+    return loader
+
+
+async def test_concurrent_misses_share_one_load():
+    cache, release, calls = SingleFlightCache(16, 60), asyncio.Event(), []
+    tasks = [asyncio.create_task(cache.get_or_load("k", make_loader(release, calls))) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["page"] * 5
+    assert len(calls) == 1
+    assert cache.coalesced == 4
+    assert cache.get("k") == "page"
+
+
+async def test_cancelled_leader_does_not_cancel_waiters():
+    cache, release, calls = SingleFlightCache(16, 60), asyncio.Event(), []
+    leader = asyncio.create_task(cache.get_or_load("k", make_loader(release, calls)))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_load("k", make_loader(release, calls)))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await waiter == "page"
+    assert leader.cancelled()
+    assert len(calls) == 1
+    assert cache.get("k") == "page"
+
+
+async def test_load_error_reaches_every_waiter_and_is_not_cached():
+    cache = SingleFlightCache(16, 60)
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise RuntimeError("database down")
+
+    tasks = [asyncio.create_task(cache.get_or_load("k", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("k") is None
+    assert cache.stats()["inflight"] == 0
+
+
+async def test_invalidation_during_load_serves_but_does_not_keep_result():
+    cache, release, calls = SingleFlightCache(16, 60), asyncio.Event(), []
+    task = asyncio.create_task(cache.get_or_load("k", make_loader(release, calls, "stale")))
+    await asyncio.sleep(0)
+
+    cache.clear()
+    release.set()
+
+    assert await task == "stale"
+    assert cache.get("k") is None
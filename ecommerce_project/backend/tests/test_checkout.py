@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+from app.core import checkout as checkout_module
+from app.core.cache import catalog_cache
+from app.core.checkout import (
+    CheckoutError, OutOfStock, _quantities, place_order, price_order, release_stale_reservations,
+)
+from app.core.config import settings
+from app.core.order_intake import order_intake
+from app.core.workers import PoolSaturated
+from app.models.order import Order
+
+pytestmark = pytest.mark.anyio
+
+ADDRESS = {"address": "1 Load St", "city": "Test", "postalCode": "000000", "country": "India"}
+
+
+def cart(*lines) -> Order:
+    # Client-side names and prices are deliberately wrong; checkout must ignore them
+    return Order(
+        orderItems=[{"name": "?", "qty": qty, "image": "", "price": 0, "product": str(product)} for product, qty in lines],
+        shippingAddress=ADDRESS,
+        paymentMethod="COD",
+    )
+
+
+def product(mongo, stock: int, price: float = 499.0, **extra) -> ObjectId:
+    return mongo.products.insert_one({"name": f"SKU {price}", "price": price, "countInStock": stock, **extra}).inserted_id
+
+
+def test_price_order_uses_catalog_formula():
+    assert price_order(1000) == {"itemsPrice": 1000, "shippingPrice": 0.0, "taxPrice": 180.0, "totalPrice": 1180.0}
+    assert price_order(100)["shippingPrice"] == settings.SHIPPING_FEE
+
+
+def test_cart_lines_for_one_product_are_merged():
+    sku = ObjectId()
+    assert _quantities(cart((sku, 2), (sku, 3))) == {sku: 5}
+    with pytest.raises(CheckoutError, match="Invalid product id"):
+        _quantities(cart(("not-an-id", 1)))
+    with pytest.raises(CheckoutError, match="at least 1"):
+        _quantities(cart((sku, 0)))
+
+
+@pytest.mark.parametrize("group_commit", [False, True])
+async def test_concurrent_checkouts_never_oversell(mongo, monkeypatch, group_commit):
+    monkeypatch.setattr(settings, "ORDER_GROUP_COMMIT", group_commit)
+    checkouts, stock = 300, 40
+    # Every checkout may hold a reservation at once; shedding load is tested on its own below
+    monkeypatch.setattr(settings, "CHECKOUT_MAX_PENDING_RESERVATIONS", checkouts)
+    hot = product(mongo, stock)
+    # Every cart also holds a plentiful SKU, which carts that lose the hot one must give back
+    cold = product(mongo, checkouts, price=49.0)
+
+    results = await asyncio.gather(
+        *(place_order(cart((hot, 1), (cold, 1)), str(ObjectId())) for _ in range(checkouts)),
+        return_exceptions=True,
+    )
+    await order_intake.close()
+
+    placed = [r for r in results if isinstance(r, dict)]
+    assert all(isinstance(r, (dict, OutOfStock)) for r in results)
+    assert len(placed) == stock
+    assert mongo.products.find_one({"_id": hot})["countInStock"] == 0
+    assert mongo.products.find_one({"_id": cold})["countInStock"] == checkouts - stock
+    assert mongo.products.count_documents({"reservations.0": {"$exists": True}}) == 0
+    assert mongo.orders.count_documents({}) == stock
+    assert placed[0]["totalPrice"] == price_order(548.0)["totalPrice"]
+
+
+async def test_cancelled_checkout_still_writes_its_order(mongo, monkeypatch):
+    sku = product(mongo, 5)
+    inserting, release = asyncio.Event(), asyncio.Event()
+    insert_order = checkout_module.insert_order
+
+    async def slow_insert(doc):
+        inserting.set()
+        await release.wait()
+        await insert_order(doc)
+
+    monkeypatch.setattr(checkout_module, "insert_order", slow_insert)
+    checkout = asyncio.create_task(place_order(cart((sku, 2)), str(ObjectId())))
+    await inserting.wait()
+    # The client goes away while its stock is reserved and the order not yet written
+    checkout.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await checkout
+    release.set()
+
+    # The shielded reserve -> insert -> clear runs to the end without its caller
+    for _ in range(100):
+        doc = mongo.products.find_one({"_id": sku})
+        if not doc["reservations"]:
+            break
+        await asyncio.sleep(0.01)
+    doc = mongo.products.find_one({"_id": sku})
+    assert mongo.orders.count_documents({}) == 1
+    assert doc["countInStock"] == 3
+    assert doc["reservations"] == []
+
+
+async def test_order_clears_cached_listings(mongo):
+    sku = product(mongo, 5)
+    catalog_cache.set("page", {"items": []})
+
+    await place_order(cart((sku, 1)), str(ObjectId()))
+
+    assert catalog_cache.get("page") is None
+
+
+async def test_pending_reservations_are_capped(mongo, monkeypatch):
+    monkeypatch.setattr(settings, "CHECKOUT_MAX_PENDING_RESERVATIONS", 2)
+    in_flight = [{"order": ObjectId(), "qty": 1}, {"order": ObjectId(), "qty": 1}]
+    sku = product(mongo, 10, reservations=in_flight)
+
+    with pytest.raises(PoolSaturated):
+        await place_order(cart((sku, 1)), str(ObjectId()))
+
+    doc = mongo.products.find_one({"_id": sku})
+    assert doc["countInStock"] == 10
+    assert doc["reservations"] == in_flight
+
+
+async def test_stale_reservations_are_repaired(mongo):
+    old = datetime.utcnow() - timedelta(hours=1)
+    abandoned, written, live = ObjectId.from_datetime(old), ObjectId.from_datetime(old + timedelta(seconds=1)), ObjectId()
+    mongo.orders.insert_one({"_id": written})
+    sku = product(mongo, 4, reservations=[
+        {"order": abandoned, "qty": 3}, {"order": written, "qty": 2}, {"order": live, "qty": 1},
+    ])
+
+    assert await release_stale_reservations(timedelta(minutes=10)) == {"released": 1, "cleared": 1}
+    assert await release_stale_reservations(timedelta(minutes=10)) == {"released": 0, "cleared": 0}
+
+    doc = mongo.products.find_one({"_id": sku})
+    assert doc["countInStock"] == 7
+    assert doc["reservations"] == [{"order": live, "qty": 1}]
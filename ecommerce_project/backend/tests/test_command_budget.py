@@ -0,0 +1,12 @@
+from app.core.command_budget import BUDGETS, measure, within_budget
+
+
+def test_write_routes_stay_within_command_budgets(mongo):
+    rows = measure(mongo)
+
+    assert [row["label"] for row in rows] == list(BUDGETS)
+    over = [
+        f"{row['label']}: HTTP {row['status']}, {row['commands']} commands (budget {row['budget']}) {row['by_name']}"
+        for row in rows if not within_budget(row)
+    ]
+    assert not over, "\n".join(over)
@@ -0,0 +1,63 @@
+import time
+from datetime import datetime
+
+import orjson
+import pytest
+from bson import Decimal128, ObjectId
+from pydantic import ValidationError
+
+from app.models.order import Order, OrderSummary
+from app.models.user import User
+from app.utils.fast_json import DocumentShape, dumps
+
+ORDER_SHAPE = DocumentShape(Order)
+
+
+def test_default_factory_runs_per_document():
+    first = ORDER_SHAPE.shape({"_id": ObjectId()})
+    time.sleep(0.01)
+    second = ORDER_SHAPE.shape({"_id": ObjectId()})
+
+    # Not the moment the shape was built (import time), and not shared between documents
+    assert first["createdAt"] < second["createdAt"] <= datetime.utcnow()
+
+
+def test_mutable_defaults_are_not_shared():
+    first = ORDER_SHAPE.shape({"_id": ObjectId()})
+    second = ORDER_SHAPE.shape({"_id": ObjectId()})
+    first["orderItems"].append({"name": "leaked"})
+
+    assert second["orderItems"] == []
+    assert ORDER_SHAPE.shape({})["orderItems"] == []
+
+
+def test_stored_values_win_over_defaults():
+    created = datetime(2025, 5, 1, 12, 30)
+    assert ORDER_SHAPE.shape({"createdAt": created})["createdAt"] == created
+
+
+def test_matches_pydantic_output():
+    doc = {
+        "_id": ObjectId(), "user": ObjectId(), "paymentMethod": "COD", "totalPrice": 548, "isPaid": True,
+        "createdAt": datetime(2025, 5, 1, 12, 0),
+        "paidAt": datetime(2025, 5, 1, 12, 30), "shippingAddress": {"address": "1 Main St", "city": "Pune", "postalCode": "411001", "country": "India"},
+        "orderItems": [{"name": "Phone", "qty": 1, "image": "", "price": 499, "product": ObjectId()}],
+    }
+    for model in (Order, OrderSummary):
+        expected = model.model_validate(doc).model_dump(mode="json", by_alias=True)
+        assert orjson.loads(dumps(DocumentShape(model).shape(doc))) == expected
+
+
+def test_document_missing_a_required_field_fails_validation():
+    shape = DocumentShape(User)
+    assert shape.shape({"_id": ObjectId(), "name": "Jo", "email": "jo@example.com", "password": "x"})["name"] == "Jo"
+
+    # Rendering null for `email` would hide the bad document; response_model would reject it
+    with pytest.raises(ValidationError):
+        shape.shape({"_id": ObjectId(), "name": "Jo", "password": "x"})
+
+
+def test_bson_types_beyond_object_id_are_rendered():
+    assert orjson.loads(dumps({"price": Decimal128("19.99"), "ids": {ObjectId("0" * 24)}})) == {
+        "price": 19.99, "ids": ["0" * 24],
+    }
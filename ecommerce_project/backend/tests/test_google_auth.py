@@ -0,0 +1,189 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.core.config import settings
+from app.core.google_auth import GoogleTokenVerifier
+
+pytestmark = pytest.mark.anyio
+
+CLIENT_ID = "shopsmart-test.apps.googleusercontent.com"
+
+
+class SigningKey:
+    def __init__(self, kid: str):
+        self.kid = kid
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.private_pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption(),
+        ).decode()
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        self.jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid, "use": "sig"}
+
+    def token(self, **overrides) -> str:
+        now = int(time.time())
+        claims = {
+            "iss": "https://accounts.google.com", "aud": CLIENT_ID, "sub": "1234567890",
+            "email": "shopper@example.com", "iat": now, "exp": now + 3600, **overrides,
+        }
+        return jwt.encode(claims, self.private_pem, algorithm="RS256", headers={"kid": self.kid})
+
+
+class JWKSServer:
+    """Google's certs endpoint stand-in: serves `keys` with `cache_control`, optionally slowly."""
+
+    def __init__(self):
+        self.keys = []
+        self.cache_control = "public, max-age=3600"
+        self.delay = 0.0
+        self.hits = 0
+        self.up = True
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                time.sleep(server.delay)
+                if not server.up:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = json.dumps({"keys": [key.jwk for key in server.keys]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", server.cache_control)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/oauth2/v3/certs"
+        threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+
+@pytest.fixture(scope="module")
+def signing_keys():
+    return SigningKey("key-1"), SigningKey("key-2")
+
+
+@pytest.fixture
+def google(signing_keys):
+    server = JWKSServer()
+    server.keys = [signing_keys[0]]
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def verifier(google):
+    return GoogleTokenVerifier(google.url, CLIENT_ID)
+
+
+async def test_valid_token_is_verified_from_cached_keys(verifier, google, signing_keys):
+    for _ in range(3):
+        claims = await verifier.verify(signing_keys[0].token())
+        assert claims["email"] == "shopper@example.com"
+
+    assert google.hits == 1
+
+
+async def test_rotated_key_triggers_one_refresh(verifier, google, signing_keys, monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_JWKS_MIN_REFRESH_INTERVAL", 0)
+    await verifier.verify(signing_keys[0].token())
+
+    google.keys = [signing_keys[1]]  # Google rotated: the old key is gone, a new kid is in use
+    claims = await verifier.verify(signing_keys[1].token())
+
+    assert claims["sub"] == "1234567890"
+    assert google.hits == 2
+
+
+async def test_unknown_kid_refresh_is_rate_limited(verifier, google, signing_keys, monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_JWKS_MIN_REFRESH_INTERVAL", 60)
+    await verifier.verify(signing_keys[0].token())
+
+    # Tokens with made-up kids can't force a fetch on every request
+    for _ in range(3):
+        with pytest.raises(ValueError, match="Unknown Google signing key"):
+            await verifier.verify(signing_keys[1].token())
+    assert google.hits == 1
+
+
+async def test_expired_key_set_is_refetched(verifier, google, signing_keys):
+    google.cache_control = "public, max-age=0"
+    await verifier.verify(signing_keys[0].token())
+    await verifier.verify(signing_keys[0].token())
+
+    assert google.hits == 2
+
+
+async def test_key_set_near_expiry_refreshes_in_background(verifier, google, signing_keys, monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_JWKS_REFRESH_MARGIN", 300)
+    google.cache_control = "public, max-age=120"  # valid, but inside the refresh margin
+    await verifier.verify(signing_keys[0].token())
+
+    google.delay = 0.5
+    started = time.monotonic()
+    await verifier.verify(signing_keys[0].token())
+    assert time.monotonic() - started < 0.4  # the login didn't wait for the refresh
+
+    await verifier._refresh
+    assert google.hits == 2
+
+
+async def test_concurrent_cold_logins_share_one_fetch(verifier, google, signing_keys):
+    google.delay = 0.2
+    results = await asyncio.gather(*(verifier.verify(signing_keys[0].token()) for _ in range(20)))
+
+    assert len(results) == 20
+    assert google.hits == 1
+    assert verifier.stats()["fetches"] == 1
+
+
+async def test_previous_keys_are_served_while_google_is_down(verifier, google, signing_keys):
+    google.cache_control = "public, max-age=0"
+    await verifier.verify(signing_keys[0].token())
+
+    google.up = False
+    claims = await verifier.verify(signing_keys[0].token())
+
+    assert claims["aud"] == CLIENT_ID
+    assert google.hits == 2
+
+
+async def test_cold_verifier_fails_when_google_is_down(verifier, google, signing_keys):
+    google.up = False
+    with pytest.raises(Exception):
+        await verifier.verify(signing_keys[0].token())
+
+
+@pytest.mark.parametrize("claims, error", [
+    ({"aud": "someone-else.apps.googleusercontent.com"}, "Invalid Google token"),
+    ({"iss": "https://evil.example.com"}, "Wrong issuer"),
+    ({"iat": int(time.time()) - 7200, "exp": int(time.time()) - 3600}, "Invalid Google token"),
+])
+async def test_bad_claims_are_rejected(verifier, signing_keys, claims, error):
+    with pytest.raises(ValueError, match=error):
+        await verifier.verify(signing_keys[0].token(**claims))
+
+
+async def test_token_signed_by_another_key_is_rejected(verifier, google, signing_keys):
+    forged = jwt.encode(
+        jwt.get_unverified_claims(signing_keys[0].token()), signing_keys[1].private_pem,
+        algorithm="RS256", headers={"kid": "key-1"},
+    )
+    with pytest.raises(ValueError, match="Invalid Google token"):
+        await verifier.verify(forged)
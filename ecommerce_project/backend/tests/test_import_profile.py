@@ -0,0 +1,9 @@
+from app.core.import_profile import DEFERRED_PACKAGES, TARGET, eager_imports, profile_once
+
+
+def test_cold_import_leaves_heavy_packages_deferred():
+    # Fresh interpreter: this test process has imported plenty of these already
+    rows = profile_once(TARGET)
+
+    assert any(name == TARGET for _, _, _, name in rows)
+    assert eager_imports(rows) == [], f"{TARGET} must not import any of {DEFERRED_PACKAGES} at load time"
@@ -0,0 +1,33 @@
+import pytest
+from pymongo import ASCENDING
+
+from app.core.indexes import INDEXES, ensure_indexes, missing_indexes, verify
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_registry_applies_cleanly_and_verifies(mongo):
+    assert await ensure_indexes() == []
+    assert await ensure_indexes() == []  # idempotent
+
+    assert await missing_indexes() == []
+    assert await verify()
+
+
+async def test_duplicate_emails_block_the_unique_index(mongo):
+    mongo.users.insert_many([{"email": "twin@example.com"}, {"email": "twin@example.com"}])
+
+    assert await ensure_indexes() == ["users.email_1"]
+    # Everything else in the registry was still applied
+    assert await missing_indexes() == ["users.email_1"]
+    assert not await verify()
+
+
+async def test_index_without_declared_options_counts_as_missing(mongo):
+    # Same name and keys as the registry's unique index, created by hand without `unique`
+    mongo.users.create_index([("email", ASCENDING)])
+    for collection, models in INDEXES.items():
+        mongo[collection].create_indexes([model for model in models if model.document["name"] != "email_1"])
+
+    assert await missing_indexes() == ["users.email_1"]
+    assert await ensure_indexes() == ["users.email_1"]
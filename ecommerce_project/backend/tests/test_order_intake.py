@@ -0,0 +1,140 @@
+import asyncio
+import gc
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, WriteError
+
+from app.core import order_intake as order_intake_module
+from app.core.order_intake import OrderIntake
+from app.core.workers import PoolSaturated
+
+pytestmark = pytest.mark.anyio
+
+
+class Orders:
+    """Stand-in orders collection: records insert_many batches; `gate` holds writes open when cleared."""
+
+    def __init__(self):
+        self.batches = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.writing = asyncio.Event()
+        self.duplicate = None
+
+    async def insert_many(self, docs, ordered=True):
+        self.writing.set()
+        await self.gate.wait()
+        self.batches.append([doc["_id"] for doc in docs])
+        errors = [{"index": i, "code": 11000, "errmsg": "duplicate key"} for i, doc in enumerate(docs) if doc["_id"] == self.duplicate]
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    @property
+    def written(self):
+        return [order_id for batch in self.batches for order_id in batch]
+
+
+@pytest.fixture
+def orders(monkeypatch):
+    orders = Orders()
+    monkeypatch.setattr(order_intake_module, "get_database", lambda: SimpleNamespace(orders=orders))
+    return orders
+
+
+@pytest.fixture
+async def intake(orders):
+    intake = OrderIntake(max_batch=64, interval_ms=5, max_queue=8)
+    yield intake
+    orders.gate.set()  # close() waits for the batch in flight
+    await intake.close()
+
+
+async def test_concurrent_orders_share_one_write(orders, intake):
+    docs = [{"_id": ObjectId()} for _ in range(5)]
+
+    await asyncio.gather(*(intake.submit(doc) for doc in docs))
+
+    assert orders.batches == [[doc["_id"] for doc in docs]]
+    assert intake.stats()["written"] == 5
+
+
+async def test_write_error_fails_only_its_order(orders, intake):
+    docs = [{"_id": ObjectId()} for _ in range(3)]
+    orders.duplicate = docs[1]["_id"]
+
+    results = await asyncio.gather(*(intake.submit(doc) for doc in docs), return_exceptions=True)
+
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], WriteError)
+
+
+async def test_full_queue_is_rejected(orders, intake):
+    orders.gate.clear()
+    waiting = [asyncio.create_task(intake.submit({"_id": ObjectId()}))]
+    await orders.writing.wait()
+    # One order is being written; the queue behind it holds eight more
+    waiting += [asyncio.create_task(intake.submit({"_id": ObjectId()})) for _ in range(8)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(PoolSaturated):
+        await intake.submit({"_id": ObjectId()})
+    orders.gate.set()
+    await asyncio.gather(*waiting)
+    assert len(orders.written) == 9
+
+
+async def test_order_cancelled_while_queued_is_withdrawn(orders, intake):
+    kept, withdrawn = {"_id": ObjectId()}, {"_id": ObjectId()}
+    submits = [asyncio.create_task(intake.submit(doc)) for doc in (kept, withdrawn)]
+    await asyncio.sleep(0)
+
+    submits[1].cancel()
+    await asyncio.gather(*submits, return_exceptions=True)
+
+    assert orders.written == [kept["_id"]]
+    assert submits[1].cancelled()
+
+
+async def test_order_cancelled_mid_write_waits_for_the_write(orders, intake):
+    doc = {"_id": ObjectId()}
+    orders.gate.clear()
+    submit = asyncio.create_task(intake.submit(doc))
+    await orders.writing.wait()
+
+    submit.cancel()
+    await asyncio.sleep(0.01)
+    assert not submit.done()  # still waiting on the insert it can no longer withdraw from
+
+    orders.gate.set()
+    with pytest.raises(asyncio.CancelledError):
+        await submit
+    assert orders.written == [doc["_id"]]
+
+
+async def test_failed_write_of_cancelled_order_is_retrieved(orders, intake):
+    loop = asyncio.get_running_loop()
+    reported = []
+    loop.set_exception_handler(lambda loop, context: reported.append(context["message"]))
+    doc = {"_id": ObjectId()}
+    orders.duplicate = doc["_id"]
+    orders.gate.clear()
+    submit = asyncio.create_task(intake.submit(doc))
+    await orders.writing.wait()
+
+    submit.cancel()
+    await asyncio.sleep(0)
+    orders.gate.set()
+    try:
+        await submit
+    except asyncio.CancelledError:
+        pass
+    del submit
+    await intake.submit({"_id": ObjectId()})  # the writer holds its last batch until the next one
+    gc.collect()
+    loop.set_exception_handler(None)
+
+    # The write error lands on a future its caller stopped awaiting; it must not be reported as lost
+    assert reported == []
+    assert orders.written[0] == doc["_id"]
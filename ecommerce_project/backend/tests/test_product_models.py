@@ -0,0 +1,52 @@
+import orjson
+import pytest
+from bson import ObjectId
+from pydantic import ValidationError
+
+from app.api.products import PRODUCT_PAGE, serialize
+from app.core.config import settings
+from app.models.product import ImageVariants, Product, ProductPage, ProductSummary, grid_thumbnail
+
+ORIGINAL = "https://bucket/abc.jpg"
+
+
+def variants(*widths):
+    return [ImageVariants(url=ORIGINAL, variants={str(w): f"https://bucket/abc_{w}w.webp" for w in widths})]
+
+
+def test_thumbnail_uses_configured_grid_width(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_GRID_WIDTH", 600)
+    assert grid_thumbnail([ORIGINAL], variants(200, 600, 1200)) == "https://bucket/abc_600w.webp"
+
+
+def test_thumbnail_picks_narrowest_variant_that_fills_the_card(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_GRID_WIDTH", 600)
+    # 600 configured out: the next wider variant, not the full-size original
+    assert grid_thumbnail([ORIGINAL], variants(320, 800, 1600)) == "https://bucket/abc_800w.webp"
+
+
+def test_thumbnail_falls_back_to_widest_variant_then_original(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_GRID_WIDTH", 600)
+    assert grid_thumbnail([ORIGINAL], variants(200, 400)) == "https://bucket/abc_400w.webp"
+    assert grid_thumbnail([ORIGINAL], []) == ORIGINAL
+    assert grid_thumbnail([], []) == ""
+
+
+def test_legacy_url_keyed_variants_are_read_as_a_list(monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_GRID_WIDTH", 600)
+    legacy = {ORIGINAL: {"600": "https://bucket/abc_600w.webp"}}
+    doc = {"name": "Lamp", "brand": "Acme", "description": "", "price": 20, "countInStock": 1, "images": [ORIGINAL]}
+
+    product = Product.model_validate({**doc, "imageVariants": legacy})
+    assert product.model_dump(by_alias=True)["imageVariants"] == [{"url": ORIGINAL, "variants": legacy[ORIGINAL]}]
+    assert ProductSummary.model_validate({**doc, "imageVariants": legacy}).thumbnail == "https://bucket/abc_600w.webp"
+
+
+def test_listing_pages_are_validated_like_response_model():
+    item = {"_id": ObjectId(), "name": "Lamp", "brand": "Acme", "price": 20, "countInStock": 1, "images": [ORIGINAL]}
+    page = {"items": [item], "limit": 24, "nextCursor": None}
+    _, body = serialize(PRODUCT_PAGE, page)
+    assert orjson.loads(body) == ProductPage.model_validate(page).model_dump(mode="json", by_alias=True)
+
+    with pytest.raises(ValidationError):
+        serialize(PRODUCT_PAGE, {**page, "items": [{"_id": ObjectId(), "price": 20}]})
@@ -0,0 +1,50 @@
+import pytest
+from bson import ObjectId
+
+from app.api.products import find_products_page
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+
+pytestmark = pytest.mark.anyio
+
+
+def seed(mongo, matches: int, others: int):
+    mongo.products.insert_many(
+        [{"name": f"Phone {i}", "brand": "Acme", "description": "", "price": i, "countInStock": 1} for i in range(matches)]
+        + [{"name": f"Lamp {i}", "brand": "Acme", "description": "", "price": i, "countInStock": 1} for i in range(others)]
+    )
+
+
+async def walk(search: str, sort, limit: int) -> list:
+    items, cursor = [], None
+    while True:
+        page = await find_products_page(search, "", None, None, sort, limit, cursor, False)
+        items += page["items"]
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("sort", [None, "price_low"])
+async def test_search_sorts_only_the_candidate_set(mongo, monkeypatch, sort):
+    monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 25)
+    seed(mongo, matches=60, others=10)
+    await ensure_indexes()
+
+    items = await walk("phone", sort, limit=10)
+
+    assert len(items) == 25
+    assert len({item["_id"] for item in items}) == 25
+    assert all(item["name"].startswith("Phone") for item in items)
+    if sort == "price_low":
+        assert [item["price"] for item in items] == sorted(item["price"] for item in items)
+
+
+async def test_listing_without_search_is_not_capped(mongo, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_MAX_CANDIDATES", 25)
+    seed(mongo, matches=30, others=10)
+
+    items = await walk("", "newest", limit=10)
+
+    assert len(items) == 40
+    assert all(isinstance(item["_id"], ObjectId) for item in items)
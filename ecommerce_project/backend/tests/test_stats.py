@@ -0,0 +1,43 @@
+import pytest
+
+from app.core import stats
+
+pytestmark = pytest.mark.anyio
+
+
+def seed_history(mongo):
+    mongo.orders.insert_many([
+        {"totalPrice": 100.0, "isPaid": True},
+        {"totalPrice": 40.0, "isPaid": True},
+        {"totalPrice": 25.0, "isPaid": False},
+    ])
+    mongo.users.insert_many([{"email": "a@example.com"}, {"email": "b@example.com"}])
+    mongo.products.insert_one({"name": "Lamp"})
+
+
+async def test_write_before_first_read_keeps_history(mongo):
+    seed_history(mongo)
+
+    # The first write after deploy, before anything has built the rollup
+    await stats.record_order_paid(25.0)
+    mongo.orders.update_one({"isPaid": False}, {"$set": {"isPaid": True}})
+
+    assert await stats.get_rollup() == {
+        "totalRevenue": 165.0, "totalOrders": 3, "paidOrders": 3, "totalProducts": 1, "totalUsers": 2,
+    }
+
+
+async def test_writes_after_startup_are_counted_on_top_of_history(mongo):
+    seed_history(mongo)
+    await stats.ensure_rollup()  # what startup does
+
+    mongo.users.insert_one({"email": "c@example.com"})
+    await stats.record_user_created()
+    mongo.orders.insert_one({"totalPrice": 60.0, "isPaid": True})
+    await stats.record_order_created({"totalPrice": 60.0, "isPaid": True})
+
+    rollup = await stats.get_rollup()
+    assert rollup["totalUsers"] == 3
+    assert rollup["totalRevenue"] == 200.0
+    # Incremental totals agree with a recount of the source collections
+    assert rollup == await stats.rebuild()
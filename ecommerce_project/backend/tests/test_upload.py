@@ -0,0 +1,214 @@
+import base64
+import hashlib
+import io
+
+import httpx
+import pytest
+import requests
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.api import upload
+from app.utils.s3_utilities import StreamingUpload
+
+pytestmark = pytest.mark.anyio
+
+
+def png(width=64, height=48, color=(200, 30, 30)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(out, format="PNG")
+    return out.getvalue()
+
+
+def keys(s3) -> set:
+    return {item["Key"] for item in s3.list_objects_v2(Bucket="test-bucket").get("Contents", [])}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """The uploads collection, kept in memory (these tests are about S3 behaviour)."""
+    entries = {}
+
+    async def find_upload(digest):
+        return entries.get(digest)
+
+    async def register_upload(digest, url, content_type, size, variants=None):
+        entry = entries.setdefault(digest, {"url": url, "contentType": content_type, "size": size, "variants": {}})
+        if variants:
+            entry["variants"] = variants
+
+    monkeypatch.setattr(upload, "find_upload", find_upload)
+    monkeypatch.setattr(upload, "register_upload", register_upload)
+    return entries
+
+
+def serve(monkeypatch, body: bytes):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+    monkeypatch.setattr(upload, "get_http_client", lambda: client)
+
+
+def form_file(body: bytes, filename="photo.png") -> UploadFile:
+    return UploadFile(io.BytesIO(body), filename=filename, headers=Headers({"content-type": "image/png"}))
+
+
+async def test_url_import_keeps_committed_object_when_registering_fails(s3, index, monkeypatch):
+    body = png()
+    serve(monkeypatch, body)
+
+    async def broken_register(*args, **kwargs):
+        raise RuntimeError("index unavailable")
+
+    aborted = []
+    real_abort = StreamingUpload.abort
+
+    async def spy_abort(self):
+        aborted.append(self.key)
+        await real_abort(self)
+
+    monkeypatch.setattr(upload, "register_upload", broken_register)
+    monkeypatch.setattr(StreamingUpload, "abort", spy_abort)
+    with pytest.raises(RuntimeError):
+        await upload.stream_url_to_s3("https://images.example.com/a.png")
+
+    # Not aborted: the content-addressed object is in place for the next import to register
+    assert aborted == []
+    assert keys(s3) == {f"{hashlib.sha256(body).hexdigest()}.png"}
+
+
+async def test_url_import_of_known_content_drops_the_staged_body(s3, index, monkeypatch):
+    body = png()
+    serve(monkeypatch, body)
+    first = await upload.stream_url_to_s3("https://images.example.com/a.png")
+    second = await upload.stream_url_to_s3("https://images.example.com/copy-of-a.png")
+
+    assert first == second
+    assert keys(s3) == {f"{hashlib.sha256(body).hexdigest()}.png"}
+
+
+async def test_form_upload_is_content_addressed_and_deduplicated(s3, index, monkeypatch):
+    monkeypatch.setattr(upload.settings, "IMAGE_VARIANT_WIDTHS", [200, 600])
+    body = png(800, 600)
+    digest = hashlib.sha256(body).hexdigest()
+
+    url, variants = await upload.upload_with_variants(form_file(body))
+    assert url.endswith(f"/{digest}.png")
+    assert set(variants) == {"200", "600"}
+    again, again_variants = await upload.upload_with_variants(form_file(body, "renamed.png"))
+
+    assert (again, again_variants) == (url, variants)
+    assert index[digest]["size"] == len(body)
+    assert keys(s3) == {f"{digest}.png"} | {f"{digest}_{w}w.webp" for w in variants}
+
+
+def checksum(body: bytes) -> str:
+    return base64.b64encode(hashlib.sha256(body).digest()).decode()
+
+
+async def direct_put(s3, body: bytes, name: str) -> str:
+    # What the browser does with a presigned PUT grant
+    grant = await upload.presign_upload(upload.PresignRequest(
+        filename=f"{name}.png", contentType="image/png", size=len(body), checksumSHA256=checksum(body), method="put",
+    ))
+    response = requests.put(grant["url"], data=body, headers=grant["headers"])
+    assert response.status_code == 200
+    return grant["key"]
+
+
+async def test_direct_upload_moves_to_content_addressed_key(s3, index):
+    body = png()
+    digest = hashlib.sha256(body).hexdigest()
+    result = await upload.complete_upload(upload.CompleteUploadRequest(key=await direct_put(s3, body, "a")))
+
+    assert result["url"].endswith(f"/{digest}.png")
+    assert index[digest]["size"] == len(body)
+    assert keys(s3) == {f"{digest}.png"}
+
+
+async def test_duplicate_direct_upload_is_collapsed(s3, index):
+    body = png()
+    first = await upload.complete_upload(upload.CompleteUploadRequest(key=await direct_put(s3, body, "a")))
+    second = await upload.complete_upload(upload.CompleteUploadRequest(key=await direct_put(s3, body, "b")))
+
+    assert second == first
+    assert keys(s3) == {f"{hashlib.sha256(body).hexdigest()}.png"}
+
+
+async def test_direct_upload_deduplicates_against_form_upload(s3, index, monkeypatch):
+    monkeypatch.setattr(upload.settings, "IMAGE_VARIANT_WIDTHS", [])
+    body = png()
+    url, _ = await upload.upload_with_variants(form_file(body))
+    result = await upload.complete_upload(upload.CompleteUploadRequest(key=await direct_put(s3, body, "a")))
+
+    assert result["url"] == url
+    assert keys(s3) == {f"{hashlib.sha256(body).hexdigest()}.png"}
+
+
+async def test_form_upload_adds_variants_to_content_stored_without_them(s3, index, monkeypatch):
+    monkeypatch.setattr(upload.settings, "IMAGE_VARIANT_WIDTHS", [200, 600])
+    body = png(800, 600)
+    digest = hashlib.sha256(body).hexdigest()
+    stored = await upload.complete_upload(upload.CompleteUploadRequest(key=await direct_put(s3, body, "a")))
+    assert index[digest]["variants"] == {}
+
+    url, variants = await upload.upload_with_variants(form_file(body))
+
+    assert url == stored["url"]
+    assert set(variants) == {"200", "600"}
+    assert index[digest]["variants"] == variants
+    assert keys(s3) == {f"{digest}.png"} | {f"{digest}_{w}w.webp" for w in variants}
+    # Later hits are answered from the index without rendering again
+    monkeypatch.setattr(upload, "make_variants", None)
+    assert await upload.upload_with_variants(form_file(body)) == (url, variants)
+
+
+async def test_direct_upload_that_is_not_an_image_is_deleted(s3, index):
+    key = await direct_put(s3, b"<html>not an image</html>", "fake")
+    with pytest.raises(upload.HTTPException) as error:
+        await upload.complete_upload(upload.CompleteUploadRequest(key=key))
+
+    assert error.value.status_code == 400
+    assert keys(s3) == set()
+
+
+async def test_complete_never_reads_the_body_back(s3, index, monkeypatch):
+    body = png(400, 300)
+    key = await direct_put(s3, body, "a")
+    ranges = []
+    get_object = s3.get_object
+
+    def spy(**kwargs):
+        ranges.append(kwargs.get("Range"))
+        return get_object(**kwargs)
+
+    monkeypatch.setattr(s3, "get_object", spy)
+    result = await upload.complete_upload(upload.CompleteUploadRequest(key=key))
+
+    assert result["url"].endswith(f"/{hashlib.sha256(body).hexdigest()}.png")
+    assert ranges == [f"bytes=0-{upload.SNIFF_BYTES - 1}"]
+
+
+async def test_object_uploaded_without_a_grant_is_rejected(s3, index):
+    key = f"{upload.settings.DIRECT_UPLOAD_PREFIX}sneaky.png"
+    s3.put_object(Bucket="test-bucket", Key=key, Body=png(), ContentType="image/png")
+
+    with pytest.raises(upload.HTTPException) as error:
+        await upload.complete_upload(upload.CompleteUploadRequest(key=key))
+
+    assert error.value.status_code == 400
+    assert keys(s3) == set()
+
+
+async def test_presigned_grants_pin_the_checksum(s3):
+    body = png()
+    grant = await upload.presign_upload(upload.PresignRequest(
+        filename="a.png", contentType="image/png", size=len(body), checksumSHA256=checksum(body),
+    ))
+    assert grant["fields"]["x-amz-checksum-sha256"] == checksum(body)
+    assert grant["fields"]["x-amz-checksum-algorithm"] == "SHA256"
+
+    with pytest.raises(upload.HTTPException) as error:
+        await upload.presign_upload(upload.PresignRequest(
+            filename="a.png", contentType="image/png", size=len(body), checksumSHA256=hashlib.sha256(body).hexdigest(),
+        ))
+    assert error.value.status_code == 400
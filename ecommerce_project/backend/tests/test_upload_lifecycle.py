@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+from app.core import upload_lifecycle
+
+
+def test_rules_are_merged_into_existing_configuration(s3):
+    s3.put_bucket_lifecycle_configuration(Bucket="test-bucket", LifecycleConfiguration={"Rules": [
+        {"ID": "archive-logs", "Filter": {"Prefix": "logs/"}, "Status": "Enabled", "Expiration": {"Days": 30}},
+    ]})
+
+    upload_lifecycle.apply_lifecycle()
+    upload_lifecycle.apply_lifecycle()  # idempotent
+
+    rules = s3.get_bucket_lifecycle_configuration(Bucket="test-bucket")["Rules"]
+    assert sorted(rule["ID"] for rule in rules) == [
+        "archive-logs", "shopsmart-expire-direct", "shopsmart-expire-incoming",
+    ]
+
+
+def test_sweep_deletes_only_expired_staging_objects(s3):
+    for key in ("direct/abandoned.png", "incoming/stale.jpg", "abc123.png"):
+        s3.put_object(Bucket="test-bucket", Key=key, Body=b"x")
+    assert upload_lifecycle.sweep() == {"objects": 0, "multipart": 0}
+
+    s3.create_multipart_upload(Bucket="test-bucket", Key="incoming/half.jpg")
+    later = datetime.now(timezone.utc) + timedelta(days=2)
+    assert upload_lifecycle.sweep(now=later) == {"objects": 2, "multipart": 1}
+
+    remaining = {item["Key"] for item in s3.list_objects_v2(Bucket="test-bucket")["Contents"]}
+    assert remaining == {"abc123.png"}
@@ -20,9 +20,8 @@ const ProductCard = ({ product }) => {
     const { addToCart } = useCart();
     const { addToWishlist, isInWishlist } = useWishlist();
 
-    // Set default rating and reviews if not present
-    const rating = product.rating || 4.5;
-    const numReviews = product.numReviews && product.numReviews > 50 ? product.numReviews : "50+";
+    const rating = product.rating || 0;
+    const numReviews = product.numReviews || 0;
 
     const discount = product.originalPrice
         ? Math.round(((product.originalPrice - product.price) / product.originalPrice) * 100)
@@ -42,9 +41,7 @@ const ProductCard = ({ product }) => {
             <div className="relative overflow-hidden">
                 <img
                     src={
-                        product.images && product.images.length > 0
-                            ? getImageUrl(product.images[0])
-                            : getImageUrl(product.image) || 'https://via.placeholder.com/300x300?text=No+Image'
+                        getImageUrl(product.thumbnail || product.image) || 'https://via.placeholder.com/300x300?text=No+Image'
                     }
                     alt={product.name}
                     className="w-full h-48 object-cover"
@@ -86,7 +86,7 @@ const Checkout = () => {
             toast.success('Order placed successfully!');
             navigate('/orders');
         } catch (error) {
-            toast.error('Failed to place order. Please try again.');
+            toast.error(error.response?.data?.detail || 'Failed to place order. Please try again.');
         } finally {
             setIsSubmitting(false);
         }
@@ -1,4 +1,4 @@
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import adminService from '../../services/adminService';
 import { PageLoader } from '../../components/common/Loader';
 import toast from 'react-hot-toast';
@@ -6,10 +6,14 @@ import toast from 'react-hot-toast';
 const AdminOrders = () => {
     const queryClient = useQueryClient();
 
-    const { data: orders, isLoading } = useQuery({
+    // Newest first, one page at a time: { items, limit, nextCursor }
+    const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
         queryKey: ['allOrders'],
-        queryFn: () => adminService.getAllOrders(),
+        queryFn: ({ pageParam }) => adminService.getAllOrders({ cursor: pageParam }),
+        initialPageParam: undefined,
+        getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
     });
+    const orders = data?.pages.flatMap((page) => page.items);
 
     const deliverMutation = useMutation({
         mutationFn: (orderId) => adminService.updateOrderStatus(orderId, 'delivered'),
@@ -214,6 +218,18 @@ const AdminOrders = () => {
                     ))}
                 </div>
             )}
+
+            {hasNextPage && (
+                <div className="text-center mt-8">
+                    <button
+                        onClick={() => fetchNextPage()}
+                        disabled={isFetchingNextPage}
+                        className="btn-secondary"
+                    >
+                        {isFetchingNextPage ? 'Loading...' : 'Load more orders'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
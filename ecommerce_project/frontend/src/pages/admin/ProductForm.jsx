@@ -27,6 +27,7 @@ const ProductForm = () => {
         countInStock: '',
         image: '',
         images: [],
+        imageVariants: [],
         brand: '',
     });
 
@@ -51,6 +52,7 @@ const ProductForm = () => {
                 countInStock: product.countInStock || '',
                 image: product.image || '',
                 images: product.images || [],
+                imageVariants: product.imageVariants || [],
                 brand: product.brand || '',
             });
         }
@@ -208,12 +210,14 @@ const ProductForm = () => {
 
         try {
             let finalImages = [...formData.images];
+            let finalVariants = [...formData.imageVariants];
 
-            // 1. Upload new local files
+            // 1. Upload new local files (the backend also returns resized WebP variants)
             if (selectedFiles.length > 0) {
                 const filesToUpload = selectedFiles.map(f => f.file);
-                const uploadedUrls = await productService.uploadProductImages(filesToUpload);
+                const { images: uploadedUrls, variants } = await productService.uploadProductImages(filesToUpload);
                 finalImages = [...finalImages, ...uploadedUrls];
+                finalVariants = [...finalVariants, ...(variants || [])];
             }
 
             // 2. Upload pending web URLs to S3
@@ -229,6 +233,8 @@ const ProductForm = () => {
             const submissionData = {
                 ...dataWithoutImage,
                 images: finalImages,
+                // Drop variants of images that were removed in the form
+                imageVariants: finalVariants.filter(({ url }) => finalImages.includes(url)),
             };
 
             if (isEdit) {
@@ -1,6 +1,6 @@
 import { useState } from 'react';
 import { Link, useNavigate } from 'react-router-dom';
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { keepPreviousData, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { useCart } from '../../context/CartContext';
 import orderService from '../../services/orderService';
 import { PageLoader } from '../../components/common/Loader';
@@ -43,10 +43,22 @@ const OrderList = () => {
         }
     };
 
-    const { data: orders, isLoading } = useQuery({
-        queryKey: ['myOrders'],
-        queryFn: () => orderService.getMyOrders(),
+    // Status filters run on the server so every page is already filtered
+    const statusParams = {
+        pending: { isPaid: false },
+        processing: { isPaid: true, isDelivered: false },
+        delivered: { isDelivered: true },
+    };
+
+    const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+        queryKey: ['myOrders', filter],
+        queryFn: ({ pageParam }) => orderService.getMyOrders({ ...statusParams[filter], cursor: pageParam }),
+        initialPageParam: undefined,
+        getNextPageParam: (lastPage) => lastPage.nextCursor ?? undefined,
+        // Keep the current list on screen while another status tab loads
+        placeholderData: keepPreviousData,
     });
+    const filteredOrders = data?.pages.flatMap((page) => page.items);
 
     const filters = [
         { value: 'all', label: 'All Orders' },
@@ -68,14 +80,6 @@ const OrderList = () => {
         return 'Pending';
     };
 
-    const filteredOrders = orders?.filter(order => {
-        if (filter === 'all') return true;
-        if (filter === 'pending') return !order.isPaid;
-        if (filter === 'processing') return order.isPaid && !order.isDelivered;
-        if (filter === 'delivered') return order.isDelivered;
-        return true;
-    });
-
     if (isLoading) return <PageLoader />;
 
     return (
@@ -195,6 +199,18 @@ const OrderList = () => {
                     ))}
                 </div>
             )}
+
+            {hasNextPage && (
+                <div className="text-center mt-8">
+                    <button
+                        onClick={() => fetchNextPage()}
+                        disabled={isFetchingNextPage}
+                        className="btn-secondary"
+                    >
+                        {isFetchingNextPage ? 'Loading...' : 'Load more orders'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
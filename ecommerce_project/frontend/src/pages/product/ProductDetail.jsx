@@ -154,7 +154,7 @@ const ProductDetail = () => {
                             ))}
                         </div>
                         <span className="ml-2 text-gray-600">
-                            {(product.rating || 4.8).toFixed(1)} ({product.numReviews && product.numReviews > 50 ? product.numReviews : '50+'} reviews)
+                            {(product.rating || 0).toFixed(1)} ({product.numReviews || 0} {product.numReviews === 1 ? 'review' : 'reviews'})
                         </span>
                     </div>
 
@@ -61,10 +61,8 @@ const ProductList = () => {
         setSearchParams({});
     };
 
+    // Search is matched server-side (name, brand, category, description)
     const filteredProducts = products?.filter(product => {
-        if (filters.search && !product.name.toLowerCase().includes(filters.search.toLowerCase())) {
-            return false;
-        }
         if (filters.category && product.category !== filters.category) {
             return false;
         }
@@ -13,26 +13,10 @@ export const adminService = {
     },
 
     async getDashboardStats() {
-        // This would ideally be a single endpoint, but we'll aggregate
         try {
-            const [products, orders, users] = await Promise.all([
-                api.get('/products'),
-                api.get('/orders'),
-                api.get('/users'),
-            ]);
-
-            const totalRevenue = orders.data.reduce((sum, order) =>
-                order.isPaid ? sum + order.totalPrice : sum, 0
-            );
-
-            return {
-                totalRevenue,
-                totalOrders: orders.data.length,
-                totalProducts: products.data.length,
-                totalUsers: users.data.length,
-                recentOrders: orders.data.slice(0, 5),
-                lowStockProducts: products.data.filter(p => p.countInStock < 10),
-            };
+            // Totals come from server-side rollups; recent orders and low stock are bounded top-N lists
+            const response = await api.get('/admin/stats');
+            return response.data;
         } catch (error) {
             console.error('Error fetching dashboard stats:', error);
             return {
@@ -46,6 +30,22 @@ export const adminService = {
         }
     },
 
+    // Sales analytics; params: { start, end } as YYYY-MM-DD (inclusive, default last 30 days)
+    async getSalesSeries(params = {}) {
+        const response = await api.get('/admin/analytics/sales', { params });
+        return response.data;
+    },
+
+    async getTopProducts(params = {}) {
+        const response = await api.get('/admin/analytics/top-products', { params });
+        return response.data;
+    },
+
+    async getTopCategories(params = {}) {
+        const response = await api.get('/admin/analytics/top-categories', { params });
+        return response.data;
+    },
+
     async getAllUsers() {
         const response = await api.get('/users');
         return response.data;
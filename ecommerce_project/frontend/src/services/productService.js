@@ -18,6 +18,23 @@ const productService = {
         return response.data;
     },
 
+    async getProductReviews(id, { offset = 0, limit = 10 } = {}) {
+        // { items, total, offset, limit } - newest first
+        const response = await api.get(`/products/${id}/reviews`, { params: { offset, limit } });
+        return response.data;
+    },
+
+    async createReview(id, { rating, comment = '' }) {
+        // Returns the product's updated { rating, numReviews }
+        const response = await api.post(`/products/${id}/reviews`, { rating, comment });
+        return response.data;
+    },
+
+    async deleteReview(id) {
+        const response = await api.delete(`/products/${id}/reviews`);
+        return response.data;
+    },
+
     async createProduct(productData) {
         const response = await api.post('/products', productData);
         return response.data;
@@ -44,7 +61,8 @@ const productService = {
                 'Content-Type': 'multipart/form-data',
             },
         });
-        return response.data.images;
+        // { images: [url], variants: [{ url, variants: { '200': url, '600': url, '1200': url } }] }
+        return response.data;
     },
 
     async uploadImageFromUrl(url) {